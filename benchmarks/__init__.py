@@ -0,0 +1,16 @@
+"""
+Benchmarks for the crux_cache client and the collector.
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.client --rows 18000000 --output client.json
+
+See benchmarks/README.md for details.
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Benchmark the client package from this checkout rather than an installed release
+sys.path.insert(0, str(REPO_ROOT / "python"))
@@ -0,0 +1,200 @@
+"""
+Client-side benchmark for crux_cache.
+
+Generates synthetic months, serves them from a local HTTP mirror and
+measures download throughput, cold and warm CruxDataset iteration rate,
+max_rank query latency and peak memory. Results are written as JSON so runs
+of different versions can be compared.
+
+Usage:
+    python -m benchmarks.client [--rows N] [--binary] [--output results.json]
+"""
+import sys
+import shutil
+import argparse
+import statistics
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from . import REPO_ROOT  # noqa: F401  (puts the client package on sys.path)
+from .common import Timer, directory_size, environment, peak_rss_mb, write_results
+from .mirror import LocalMirror
+from .synthetic import generate_tree
+
+import crux_cache
+from crux_cache import CruxCache
+
+DATASET = 'global'
+
+
+def _fresh_cache(work_dir: Path, name: str, source: str, **kwargs) -> CruxCache:
+    """Create a client with an empty cache directory."""
+    cache_dir = work_dir / name
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return CruxCache(cache_dir=str(cache_dir), source=source, **kwargs)
+
+
+def _iterate(cache: CruxCache, month: str, max_rank=None) -> int:
+    """Iterate a dataset to the end and return the row count."""
+    count = 0
+    for _ in cache.get_dataset(DATASET, month=month, max_rank=max_rank):
+        count += 1
+    return count
+
+
+def bench_download(work_dir: Path, source: str, month: str, binary: bool) -> Dict:
+    """Measure raw chunk download throughput from the mirror."""
+    cache = _fresh_cache(work_dir, 'cache-download', source)
+    manifest = cache.cache_manager.get_manifest(DATASET)
+    chunks = manifest['months'][month]['chunks']
+
+    filenames = [c['filename'] for c in chunks]
+    total_bytes = sum(c['size'] for c in chunks)
+    if binary:
+        filenames += [c['binary']['filename'] for c in chunks if 'binary' in c]
+        total_bytes += sum(c['binary']['size'] for c in chunks if 'binary' in c)
+
+    with Timer() as timer:
+        for filename in filenames:
+            cache.cache_manager.get_data_file(DATASET, filename)
+
+    return {
+        'files': len(filenames),
+        'bytes': total_bytes,
+        'seconds': timer.elapsed,
+        'mb_per_s': total_bytes / (1024 * 1024) / timer.elapsed if timer.elapsed else None,
+    }
+
+
+def bench_iteration(work_dir: Path, source: str, month: str, data_format: str) -> Dict:
+    """Measure cold (downloading) and warm (cached) iteration rate."""
+    cache = _fresh_cache(work_dir, f'cache-{data_format}', source, data_format=data_format)
+
+    results = {}
+    for phase in ('cold', 'warm'):
+        with Timer() as timer:
+            rows = _iterate(cache, month)
+        results[phase] = {
+            'rows': rows,
+            'seconds': timer.elapsed,
+            'rows_per_s': rows / timer.elapsed if timer.elapsed else None,
+        }
+    return results
+
+
+def bench_max_rank(work_dir: Path, source: str, month: str, max_ranks: List[int], repeat: int) -> Dict:
+    """Measure max_rank query latency on a warm cache."""
+    cache = CruxCache(cache_dir=str(work_dir / 'cache-csv'), source=source)
+    _iterate(cache, month)  # Make sure the cache is warm
+
+    results = {}
+    for max_rank in max_ranks:
+        iterate_times = []
+        len_times = []
+        rows = 0
+        for _ in range(repeat):
+            with Timer() as timer:
+                rows = _iterate(cache, month, max_rank)
+            iterate_times.append(timer.elapsed)
+
+            with Timer() as timer:
+                len(cache.get_dataset(DATASET, month=month, max_rank=max_rank))
+            len_times.append(timer.elapsed)
+
+        results[str(max_rank)] = {
+            'rows': rows,
+            'iterate_seconds': statistics.median(iterate_times),
+            'len_seconds': statistics.median(len_times),
+        }
+    return results
+
+
+def bench_local(work_dir: Path, data_root: Path, month: str) -> Dict:
+    """Measure iteration rate reading chunks in place from a local checkout."""
+    cache = _fresh_cache(work_dir, 'cache-local', str(data_root))
+    with Timer() as timer:
+        rows = _iterate(cache, month)
+    return {
+        'rows': rows,
+        'seconds': timer.elapsed,
+        'rows_per_s': rows / timer.elapsed if timer.elapsed else None,
+        'cache_dir_bytes': directory_size(work_dir / 'cache-local'),
+    }
+
+
+def bench_memory(work_dir: Path, source: str, month: str) -> Dict:
+    """Measure peak Python memory while iterating a warm month."""
+    cache = CruxCache(cache_dir=str(work_dir / 'cache-csv'), source=source)
+
+    tracemalloc.start()
+    _iterate(cache, month)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'iteration_peak_traced_mb': peak / (1024 * 1024),
+        'process_peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def main(argv=None) -> int:
+    """Run the client benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the crux_cache client against a local mirror")
+    parser.add_argument('--rows', type=int, default=18_000_000, help='Rows per synthetic month (default: 18M)')
+    parser.add_argument('--month', default='202510', help='Synthetic month to generate (default: 202510)')
+    parser.add_argument('--binary', action='store_true', help='Also generate and benchmark binary chunks')
+    parser.add_argument('--max-ranks', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help='max_rank values to measure query latency for')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions for latency measurements')
+    parser.add_argument('--work-dir', type=str, help='Directory for synthetic data and caches (reused between runs)')
+    parser.add_argument('--output', '-o', type=str, help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    work_dir = Path(args.work_dir or Path(tempfile.gettempdir()) / 'crux-bench')
+    mirror_root = work_dir / 'mirror'
+
+    print(f"Generating synthetic data ({args.rows:,} rows) in {mirror_root}...", file=sys.stderr)
+    with Timer() as generate_timer:
+        generate_tree(mirror_root, DATASET, [args.month], rows=args.rows, binary=args.binary)
+
+    results = {}
+    with LocalMirror(mirror_root) as mirror:
+        source = mirror.base_url
+
+        print("Measuring download throughput...", file=sys.stderr)
+        results['download'] = bench_download(work_dir, source, args.month, args.binary)
+
+        print("Measuring iteration rate...", file=sys.stderr)
+        formats = ['csv', 'binary'] if args.binary else ['csv']
+        results['iteration'] = {fmt: bench_iteration(work_dir, source, args.month, fmt) for fmt in formats}
+
+        print("Measuring max_rank latency...", file=sys.stderr)
+        results['max_rank'] = bench_max_rank(work_dir, source, args.month, args.max_ranks, args.repeat)
+
+        print("Measuring memory...", file=sys.stderr)
+        results['memory'] = bench_memory(work_dir, source, args.month)
+
+    print("Measuring local (in place) iteration...", file=sys.stderr)
+    results['local'] = bench_local(work_dir, mirror_root, args.month)
+
+    write_results({
+        'benchmark': 'client',
+        'crux_cache_version': crux_cache.__version__,
+        'environment': environment(),
+        'params': {
+            'rows': args.rows,
+            'month': args.month,
+            'binary': args.binary,
+            'max_ranks': args.max_ranks,
+            'repeat': args.repeat,
+            'generate_seconds': generate_timer.elapsed,
+        },
+        'results': results,
+    }, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Collector pipeline benchmark.
+
+Runs the full ``python -m src`` flow (query, chunking, manifest generation)
+against FakeBackend, a local stand-in for BigQuery serving synthetic months,
+and reports wall time, peak RSS, bytes written and time per stage.
+
+Usage:
+    python -m benchmarks.collector [--rows N] [--months N] [--binary] [--deltas] [--output results.json]
+"""
+import io
+import sys
+import shutil
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from .common import Timer, directory_size, environment, peak_rss_mb, write_results
+
+from src.__main__ import main as collector_main
+from src.backends import FakeBackend
+from src.utils import StageTimer
+
+
+def month_range(start: str, count: int):
+    """List count consecutive months in YYYYMM format starting at start."""
+    year, month = int(start[:4]), int(start[4:])
+    months = []
+    for _ in range(count):
+        months.append(f"{year}{month:02d}")
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return months
+
+
+def main(argv=None) -> int:
+    """Run the collector benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the collector pipeline with a fake BigQuery backend")
+    parser.add_argument('--rows', type=int, default=18_000_000, help='Rows per synthetic month (default: 18M)')
+    parser.add_argument('--months', type=int, default=1, help='Number of months to ingest (default: 1)')
+    parser.add_argument('--start', default='202501', help='First month to ingest (default: 202501)')
+    parser.add_argument('--binary', action='store_true', help='Also write binary chunks')
+    parser.add_argument('--deltas', action='store_true', help='Also write delta files')
+    parser.add_argument('--work-dir', type=str, help='Directory for the data tree (emptied before the run)')
+    parser.add_argument('--verbose', action='store_true', help='Show the collector output')
+    parser.add_argument('--output', '-o', type=str, help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    months = month_range(args.start, args.months)
+    work_dir = Path(args.work_dir or Path(tempfile.gettempdir()) / 'crux-bench-collector')
+    data_dir = work_dir / 'data' / 'global'
+    shutil.rmtree(work_dir / 'data', ignore_errors=True)
+
+    backend = FakeBackend(rows=args.rows, months=months)
+    timer = StageTimer()
+    collector_args = [
+        str(data_dir),
+        '--start-year', args.start[:4],
+        '--start-month', str(int(args.start[4:])),
+    ]
+    if args.binary:
+        collector_args.append('--binary')
+    if args.deltas:
+        collector_args.append('--deltas')
+
+    print(f"Ingesting {len(months)} month(s) of {args.rows:,} rows into {data_dir}...", file=sys.stderr)
+    output = io.StringIO()
+    with Timer() as wall:
+        if args.verbose:
+            status = collector_main(collector_args, backend=backend, timer=timer)
+        else:
+            with redirect_stdout(output):
+                status = collector_main(collector_args, backend=backend, timer=timer)
+
+    if status != 0:
+        print(output.getvalue(), file=sys.stderr)
+        print(f"Collector exited with status {status}", file=sys.stderr)
+        return status
+
+    # Time spent generating synthetic data is not part of the pipeline's own fetch cost
+    stages = dict(timer.timings)
+    stages['fetch_excluding_backend'] = stages.get('fetch', 0.0) - backend.query_seconds
+
+    write_results({
+        'benchmark': 'collector',
+        'environment': environment(),
+        'params': {
+            'rows': args.rows,
+            'months': months,
+            'binary': args.binary,
+            'deltas': args.deltas,
+        },
+        'results': {
+            'wall_seconds': wall.elapsed,
+            'rows_per_s': args.rows * len(months) / wall.elapsed if wall.elapsed else None,
+            'peak_rss_mb': peak_rss_mb(),
+            'bytes_written': directory_size(data_dir),
+            'files_written': sum(1 for path in data_dir.rglob('*') if path.is_file()),
+            'backend_seconds': backend.query_seconds,
+            'stages': stages,
+        },
+    }, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
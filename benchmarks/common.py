@@ -0,0 +1,73 @@
+"""
+Shared helpers for benchmarks: timing, memory and result output.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import resource
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class Timer:
+    """Context manager measuring wall time in seconds."""
+
+    def __enter__(self) -> 'Timer':
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self.start
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def directory_size(path: Path) -> int:
+    """Total size in bytes of all files below a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def environment() -> Dict[str, str]:
+    """Describe the environment the benchmark ran in."""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': str(os.cpu_count()),
+    }
+
+
+def write_results(results: Dict, output: Optional[str]) -> None:
+    """
+    Write benchmark results as JSON.
+
+    Args:
+        results: Results dictionary
+        output: Output path, or None / '-' for stdout
+    """
+    text = json.dumps(results, indent=2)
+    if output in (None, '-'):
+        print(text)
+        return
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        f.write(text + '\n')
+    print(f"✓ Results written to {output}", file=sys.stderr)
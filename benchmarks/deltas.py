@@ -0,0 +1,131 @@
+"""
+Delta reconstruction check and benchmark.
+
+Ingests consecutive synthetic months with the collector (FakeBackend, with
+--deltas and --binary), serves them from a local HTTP mirror and, for every
+month that has a delta, rebuilds it with use_deltas=True from a cache
+holding only the previous month. Each reconstruction is compared row by row
+with a full download of the month, with CSV and binary chunks; mismatches
+and errors fail the run. Reports the time and bytes downloaded for both ways
+of getting the month.
+
+Usage:
+    python -m benchmarks.deltas [--rows N] [--months N] [--output results.json]
+"""
+import io
+import sys
+import shutil
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List
+
+from . import REPO_ROOT  # noqa: F401  (puts the client package on sys.path)
+from .collector import month_range
+from .common import Timer, directory_size, environment, write_results
+from .mirror import LocalMirror
+
+from crux_cache import CruxCache
+
+from src.__main__ import main as collector_main
+from src.backends import FakeBackend
+
+DATASET = 'global'
+
+
+def generate_months(work_dir: Path, months: List[str], rows: int) -> Path:
+    """Ingest synthetic months with deltas and binary chunks into work_dir/mirror/data."""
+    mirror_root = work_dir / 'mirror'
+    shutil.rmtree(mirror_root, ignore_errors=True)
+    data_dir = mirror_root / 'data' / DATASET
+    args = [str(data_dir), '--start-year', months[0][:4], '--start-month', str(int(months[0][4:])),
+            '--deltas', '--binary']
+    output = io.StringIO()
+    with redirect_stdout(output):
+        status = collector_main(args, backend=FakeBackend(rows=rows, months=months))
+    if status != 0:
+        raise RuntimeError(f"Collector exited with status {status}:\n{output.getvalue()[-2000:]}")
+    return mirror_root
+
+
+def check_month(work_dir: Path, base_url: str, month: str, base_month: str, data_format: str) -> Dict:
+    """Rebuild a month from its cached predecessor and compare it with a full download."""
+    delta_dir = work_dir / f'cache-delta-{data_format}'
+    full_dir = work_dir / f'cache-full-{data_format}'
+    for directory in (delta_dir, full_dir):
+        shutil.rmtree(directory, ignore_errors=True)
+
+    cache = CruxCache(cache_dir=str(delta_dir), source=base_url, use_deltas=True, data_format=data_format)
+    list(cache.get_dataset(DATASET, month=base_month))
+    base_bytes = directory_size(delta_dir)
+    with Timer() as delta_timer:
+        reconstructed = list(cache.get_dataset(DATASET, month=month))
+
+    full_cache = CruxCache(cache_dir=str(full_dir), source=base_url, data_format=data_format)
+    with Timer() as full_timer:
+        downloaded = list(full_cache.get_dataset(DATASET, month=month))
+
+    return {
+        'rows': len(downloaded),
+        'matches': reconstructed == downloaded,
+        'delta_seconds': delta_timer.elapsed,
+        'delta_bytes': directory_size(delta_dir) - base_bytes,
+        'full_seconds': full_timer.elapsed,
+        'full_bytes': directory_size(full_dir),
+    }
+
+
+def main(argv=None) -> int:
+    """Run the delta reconstruction check."""
+    parser = argparse.ArgumentParser(description="Check delta reconstruction against full downloads")
+    parser.add_argument('--rows', type=int, default=100_000, help='Rows per synthetic month (default: 100k)')
+    parser.add_argument('--months', type=int, default=3, help='Number of months to ingest (default: 3)')
+    parser.add_argument('--start', default='202501', help='First month to ingest (default: 202501)')
+    parser.add_argument('--work-dir', type=str, help='Directory for the data tree and caches (emptied per run)')
+    parser.add_argument('--output', '-o', type=str, help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    months = month_range(args.start, args.months)
+    work_dir = Path(args.work_dir or Path(tempfile.gettempdir()) / 'crux-bench-deltas')
+
+    print(f"Ingesting {len(months)} month(s) of {args.rows:,} rows with deltas...", file=sys.stderr)
+    mirror_root = generate_months(work_dir, months, args.rows)
+
+    results = {}
+    failures = []
+    with LocalMirror(mirror_root) as mirror:
+        cache = CruxCache(cache_dir=str(work_dir / 'cache-metadata'), source=mirror.base_url)
+        manifest = cache.cache_manager.get_manifest(DATASET)
+        for base_month, month in zip(months, months[1:]):
+            if 'delta' not in manifest['months'].get(month, {}):
+                continue  # Keyframe
+            for data_format in ('csv', 'binary'):
+                name = f'{month}-{data_format}'
+                print(f"Reconstructing {month} from {base_month} ({data_format})...", file=sys.stderr)
+                try:
+                    results[name] = check_month(work_dir, mirror.base_url, month, base_month, data_format)
+                except Exception as e:
+                    failures.append(f"{name}: {type(e).__name__}: {e}")
+                    continue
+                if not results[name]['matches']:
+                    failures.append(f"{name}: reconstructed rows differ from the full download")
+
+    if not results and not failures:
+        failures.append("No month with a delta was ingested (increase --months)")
+
+    write_results({
+        'benchmark': 'deltas',
+        'environment': environment(),
+        'params': {'rows': args.rows, 'months': months},
+        'results': results,
+        'failures': failures,
+    }, args.output)
+
+    for failure in failures:
+        print(f"✗ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Check of `crux-cache download --max-rank` against the rows of the month.
+
+Generates a synthetic month in small chunks and downloads it with the CLI
+from a local source at several max_rank values, once with the manifest as
+ManifestGenerator writes it (per-chunk rank statistics and rank offsets) and
+once with those statistics stripped, as in manifests published before they
+existed. Each merged file is compared row by row with iterating the month;
+mismatches and errors fail the run.
+
+Usage:
+    python -m benchmarks.download [--rows N] [--output results.json]
+"""
+import io
+import csv
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict
+
+from . import REPO_ROOT  # noqa: F401  (puts the client package on sys.path)
+from .common import Timer, environment, write_results
+from .synthetic import generate_tree
+
+from crux_cache import CruxCache
+from crux_cache.cli import main as cli_main
+
+DATASET = 'global'
+MONTH = '202510'
+MAX_RANKS = (1000, 10000, 100000, 1000000)
+
+# Manifest keys of chunks and months before per-chunk statistics were recorded
+CHUNK_KEYS = ('chunk', 'filename', 'size', 'origins')
+MONTH_KEYS = ('year', 'month', 'total_chunks', 'total_size', 'origins', 'chunks')
+
+
+def strip_stats(source: Path, target: Path) -> None:
+    """Copy a data/ tree, keeping only the manifest fields that predate chunk statistics."""
+    shutil.rmtree(target, ignore_errors=True)
+    shutil.copytree(source, target)
+    manifest_path = target / 'data' / DATASET / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text())
+    for month, info in manifest['months'].items():
+        info['chunks'] = [{key: chunk[key] for key in CHUNK_KEYS if key in chunk} for chunk in info['chunks']]
+        manifest['months'][month] = {key: info[key] for key in MONTH_KEYS if key in info}
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+
+def check_download(work_dir: Path, source: Path, shape: str, max_rank: int) -> Dict:
+    """Download a month with the CLI and compare the merged file with the month's rows."""
+    cache_dir = work_dir / f'cache-{shape}'
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    output = work_dir / f'{shape}-{max_rank}.csv'
+
+    with Timer() as timer, redirect_stdout(io.StringIO()):
+        status = cli_main([
+            '--cache-dir', str(cache_dir), '--source', str(source),
+            'download', DATASET, MONTH, '--max-rank', str(max_rank), '-o', str(output)
+        ])
+    with open(output, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        rows = [(origin, int(rank)) for origin, rank in reader]
+
+    cache = CruxCache(cache_dir=str(cache_dir), source=str(source))
+    expected = list(cache.get_dataset(DATASET, month=MONTH, max_rank=max_rank))
+    return {
+        'status': status,
+        'rows': len(rows),
+        'expected_rows': len(expected),
+        'matches': status == 0 and header == ['origin', 'rank'] and rows == expected,
+        'seconds': timer.elapsed,
+    }
+
+
+def main(argv=None) -> int:
+    """Run the download check."""
+    parser = argparse.ArgumentParser(description="Check crux-cache download --max-rank against the month's rows")
+    parser.add_argument('--rows', type=int, default=60_000, help='Rows of the synthetic month (default: 60k)')
+    parser.add_argument('--chunk-size', type=int, default=256 * 1024,
+                        help='Target chunk size in bytes (default: 256 KB)')
+    parser.add_argument('--work-dir', type=str, help='Directory for the data trees and caches')
+    parser.add_argument('--output', '-o', type=str, help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    work_dir = Path(args.work_dir or Path(tempfile.gettempdir()) / 'crux-bench-download')
+    print(f"Generating a month of {args.rows:,} rows...", file=sys.stderr)
+    with redirect_stdout(io.StringIO()):
+        generate_tree(work_dir / 'stats', months=[MONTH], rows=args.rows, chunk_size=args.chunk_size)
+    strip_stats(work_dir / 'stats', work_dir / 'no-stats')
+
+    results = {}
+    failures = []
+    for shape in ('stats', 'no-stats'):
+        for max_rank in MAX_RANKS:
+            name = f'{shape}-{max_rank}'
+            print(f"Downloading with --max-rank {max_rank} ({shape})...", file=sys.stderr)
+            try:
+                results[name] = check_download(work_dir, work_dir / shape, shape, max_rank)
+            except Exception as e:
+                failures.append(f"{name}: {type(e).__name__}: {e}")
+                continue
+            if not results[name]['matches']:
+                failures.append(f"{name}: wrote {results[name]['rows']:,} rows, "
+                                f"expected {results[name]['expected_rows']:,}")
+
+    write_results({
+        'benchmark': 'download',
+        'environment': environment(),
+        'params': {'rows': args.rows, 'chunk_size': args.chunk_size, 'max_ranks': list(MAX_RANKS)},
+        'results': results,
+        'failures': failures,
+    }, args.output)
+
+    for failure in failures:
+        print(f"✗ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Fault-injection benchmark for crux_cache downloads.
+
+Serves a synthetic month from a local mirror that fails a fraction of the
+data file requests (HTTP 503, connection resets mid-body, stalls and slow
+transfers) and syncs the month into fresh caches with different retry
+policies: no retries, retries with backoff, and retries plus hedged
+requests. Reports the success rate, month download time percentiles and
+the retries and hedges the client made.
+
+Usage:
+    python -m benchmarks.faults [--rows N] [--trials N] [--output results.json]
+"""
+import sys
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+from . import REPO_ROOT  # noqa: F401  (puts the client package on sys.path)
+from .common import Timer, environment, write_results
+from .mirror import Faults, FaultyMirror
+from .synthetic import generate_tree
+
+import crux_cache
+from crux_cache import CruxCache, DownloadError, RetryPolicy
+from crux_cache.storage import HTTPStorage
+
+DATASET = 'global'
+
+
+def _percentile(values, fraction: float):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else None
+
+
+def bench_policy(work_dir: Path, source: str, month: str, name: str, policy: RetryPolicy,
+                 trials: int, stall_seconds: float) -> Dict:
+    """Sync the month into a fresh cache per trial and summarize the outcomes."""
+    seconds = []
+    failures = []
+    retries = hedges = hedges_won = 0
+    for _ in range(trials):
+        cache_dir = work_dir / f'cache-{name}'
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        cache = CruxCache(
+            cache_dir=str(cache_dir),
+            storage=HTTPStorage(source, stall_seconds=stall_seconds),
+            retry=policy,
+        )
+        try:
+            with Timer() as timer:
+                cache.sync([DATASET], months=month, max_parallel=4)
+            seconds.append(timer.elapsed)
+        except DownloadError as e:
+            failures.append(str(e))
+
+        totals = cache.stats.totals()
+        retries += totals.retries
+        hedges += totals.hedges
+        hedges_won += totals.hedges_won
+
+    return {
+        'trials': trials,
+        'successes': len(seconds),
+        'seconds_p50': _percentile(seconds, 0.5),
+        'seconds_p99': _percentile(seconds, 0.99),
+        'seconds_max': max(seconds) if seconds else None,
+        'retries': retries,
+        'hedges': hedges,
+        'hedges_won': hedges_won,
+        'errors': failures[:5],
+    }
+
+
+def main(argv=None) -> int:
+    """Run the fault-injection benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark crux_cache downloads against a faulty mirror")
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Rows of the synthetic month (default: 2M)')
+    parser.add_argument('--month', default='202510', help='Synthetic month to generate (default: 202510)')
+    parser.add_argument('--chunk-mb', type=float, default=2.0, help='Chunk size in MB (default: 2)')
+    parser.add_argument('--trials', type=int, default=10, help='Syncs per retry policy (default: 10)')
+    parser.add_argument('--error', type=float, default=0.1, help='Probability of HTTP 503 (default: 0.1)')
+    parser.add_argument('--reset', type=float, default=0.1,
+                        help='Probability of a connection reset mid-body (default: 0.1)')
+    parser.add_argument('--stall', type=float, default=0.05, help='Probability of a stall (default: 0.05)')
+    parser.add_argument('--slow', type=float, default=0.05,
+                        help='Probability of a slow transfer (default: 0.05)')
+    parser.add_argument('--stall-seconds', type=float, default=2.0,
+                        help='Client stall detection window in seconds (default: 2)')
+    parser.add_argument('--hedge-after', type=float, default=1.0,
+                        help='Hedging delay of the hedged policy in seconds (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the fault injection (default: 0)')
+    parser.add_argument('--work-dir', type=str, help='Directory for synthetic data and caches (reused between runs)')
+    parser.add_argument('--output', '-o', type=str, help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    work_dir = Path(args.work_dir or Path(tempfile.gettempdir()) / 'crux-bench-faults')
+    mirror_root = work_dir / 'mirror'
+
+    print(f"Generating synthetic data ({args.rows:,} rows) in {mirror_root}...", file=sys.stderr)
+    generate_tree(mirror_root, DATASET, [args.month], rows=args.rows,
+                  chunk_size=int(args.chunk_mb * 1024 * 1024))
+
+    policies = {
+        'no-retry': RetryPolicy.none(),
+        'retry': RetryPolicy(seed=args.seed),
+        'retry-hedge': RetryPolicy(hedge_after=args.hedge_after, seed=args.seed),
+    }
+
+    results = {}
+    for name, policy in policies.items():
+        faults = Faults(
+            error=args.error, reset=args.reset, stall=args.stall, slow=args.slow,
+            stall_seconds=args.stall_seconds * 5, seed=args.seed,
+        )
+        print(f"Syncing with policy {name}...", file=sys.stderr)
+        with FaultyMirror(mirror_root, faults) as mirror:
+            results[name] = bench_policy(
+                work_dir, mirror.base_url, args.month, name, policy, args.trials, args.stall_seconds
+            )
+        results[name]['injected'] = faults.injected
+
+    write_results({
+        'benchmark': 'faults',
+        'crux_cache_version': crux_cache.__version__,
+        'environment': environment(),
+        'params': {
+            'rows': args.rows,
+            'month': args.month,
+            'chunk_mb': args.chunk_mb,
+            'trials': args.trials,
+            'faults': {'error': args.error, 'reset': args.reset, 'stall': args.stall, 'slow': args.slow},
+            'stall_seconds': args.stall_seconds,
+            'hedge_after': args.hedge_after,
+            'seed': args.seed,
+        },
+        'results': results,
+    }, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
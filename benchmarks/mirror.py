@@ -0,0 +1,138 @@
+"""
+Local HTTP stand-in for GITHUB_RAW_BASE_URL.
+
+Serves a directory that contains data/ over HTTP on localhost, so the
+client downloads from it exactly as it would from raw.githubusercontent.com.
+FaultyMirror additionally injects errors, connection resets, stalls and slow
+transfers into a fraction of the requests.
+"""
+import time
+import random
+import shutil
+import socket
+import threading
+from http import HTTPStatus
+from pathlib import Path
+from typing import Optional
+
+from . import REPO_ROOT  # noqa: F401  (puts the client package on sys.path)
+
+from crux_cache.mirror import MirrorRequestHandler, MirrorServer
+
+
+class LocalMirror(MirrorServer):
+    """
+    HTTP server for a local directory, running in a background thread.
+
+    Example:
+        >>> with LocalMirror('/tmp/bench') as mirror:
+        ...     cache = CruxCache(source=mirror.base_url)
+    """
+
+    def __init__(self, root: Path, host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize the mirror.
+
+        Args:
+            root: Directory containing data/
+            host: Interface to bind to
+            port: Port to bind to (0 picks a free port)
+        """
+        super().__init__(str(root), host=host, port=port)
+
+
+class FaultInjectingHandler(MirrorRequestHandler):
+    """Mirror request handler failing a fraction of data file requests (see FaultyMirror)."""
+
+    def do_GET(self):
+        self.fault = self.server.faults.draw(self.path)
+        if self.fault == 'error':
+            self.send_error(HTTPStatus.SERVICE_UNAVAILABLE, "Injected fault")
+            return
+        super().do_GET()
+
+    def copyfile(self, source, outputfile):
+        faults = self.server.faults
+        if self.fault is None:
+            return super().copyfile(source, outputfile)
+
+        try:
+            # Send part of the body before failing, so resumption is exercised
+            outputfile.write(source.read(faults.partial_bytes))
+            outputfile.flush()
+            if self.fault == 'reset':
+                self.close_connection = True
+                self.connection.shutdown(socket.SHUT_RDWR)
+            elif self.fault == 'stall':
+                time.sleep(faults.stall_seconds)
+                shutil.copyfileobj(source, outputfile)
+            elif self.fault == 'slow':
+                while True:
+                    data = source.read(faults.slow_rate // 10)
+                    if not data:
+                        break
+                    outputfile.write(data)
+                    outputfile.flush()
+                    time.sleep(0.1)
+        except OSError:
+            pass  # The client gave up on the request
+
+
+class Faults:
+    """
+    Fault mix of a FaultyMirror.
+
+    Every request for a data file (not .json metadata) independently fails
+    with the given probabilities:
+
+    - error: HTTP 503
+    - reset: the connection is closed after partial_bytes of the body
+    - stall: no data after partial_bytes for stall_seconds
+    - slow: the body trickles at slow_rate bytes per second (by default
+      below the client's minimum throughput)
+    """
+
+    def __init__(self, error: float = 0.0, reset: float = 0.0, stall: float = 0.0, slow: float = 0.0,
+                 stall_seconds: float = 60.0, slow_rate: int = 4 * 1024, partial_bytes: int = 64 * 1024,
+                 seed: int = 0):
+        self.probabilities = [('error', error), ('reset', reset), ('stall', stall), ('slow', slow)]
+        self.stall_seconds = stall_seconds
+        self.slow_rate = slow_rate
+        self.partial_bytes = partial_bytes
+        self.injected = {name: 0 for name, _ in self.probabilities}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self, path: str) -> Optional[str]:
+        """Choose the fault of a request, or None to serve it normally."""
+        if path.endswith('.json'):
+            return None
+        with self._lock:
+            value = self._random.random()
+            for name, probability in self.probabilities:
+                if value < probability:
+                    self.injected[name] += 1
+                    return name
+                value -= probability
+        return None
+
+
+class FaultyMirror(LocalMirror):
+    """
+    Local mirror injecting transient faults into data file requests.
+
+    Example:
+        >>> with FaultyMirror('/tmp/bench', Faults(error=0.1, stall=0.05)) as mirror:
+        ...     cache = CruxCache(source=mirror.base_url, retry=RetryPolicy(hedge_after=5))
+    """
+
+    handler_class = FaultInjectingHandler
+
+    def __init__(self, root: Path, faults: Faults, host: str = '127.0.0.1', port: int = 0):
+        super().__init__(root, host=host, port=port)
+        self.faults = faults
+
+    def _bind(self):
+        server = super()._bind()
+        server.faults = self.faults
+        return server
@@ -0,0 +1,179 @@
+"""
+Startup benchmark for the client package and the collector CLI.
+
+Runs short-lived commands in fresh interpreters with ``-X importtime`` and
+reports wall time, import time on top of the bare interpreter and the
+heaviest imports. Commands that import a dependency they should defer
+(requests, pandas, numpy, google-cloud, duckdb, pyarrow) or exceed their import-time budget
+fail the run, so this can guard startup time in CI.
+
+Usage:
+    python -m benchmarks.startup [--repeat N] [--output results.json]
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from . import REPO_ROOT
+from .common import Timer, environment, write_results
+
+# Top-level packages that short-lived commands must not import
+DEFERRED_MODULES = ('requests', 'urllib3', 'pandas', 'numpy', 'google', 'duckdb', 'pyarrow')
+
+# Import-time budgets in milliseconds, on top of the bare interpreter
+DEFAULT_BUDGETS_MS = {
+    'import crux_cache': 30,
+    'crux-cache --help': 60,
+    'crux-cache months (cached metadata)': 60,
+    'python -m src --manifest-only': 60,
+}
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    Parse -X importtime output.
+
+    Args:
+        stderr: Standard error of the interpreter
+
+    Returns:
+        Dictionary mapping top-level imports (as listed, e.g. 'crux_cache') to
+        their cumulative import time in microseconds
+    """
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # Header line
+        name = parts[2]
+        # Nested imports are indented by two spaces per level
+        if len(name) - len(name.lstrip(' ')) == 1:
+            imports[name.strip()] = imports.get(name.strip(), 0) + int(parts[1])
+    return imports
+
+
+def imported_modules(stderr: str) -> List[str]:
+    """List every module listed in -X importtime output."""
+    modules = []
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if line.startswith('import time:') and len(parts) == 3 and parts[1].strip().isdigit():
+            modules.append(parts[2].strip())
+    return modules
+
+
+def run_command(args: List[str], cwd: Path, env: Dict[str, str]) -> Tuple[float, str]:
+    """Run a Python command with -X importtime and return (seconds, stderr)."""
+    with Timer() as timer:
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime'] + args,
+            cwd=str(cwd), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr[-2000:]}")
+    return timer.elapsed, result.stderr
+
+
+def measure(name: str, args: List[str], cwd: Path, env: Dict[str, str],
+            baseline: Dict[str, int], repeat: int) -> Dict:
+    """Measure one command."""
+    walls = []
+    import_us = []
+    stderr = ''
+    for _ in range(repeat):
+        seconds, stderr = run_command(args, cwd, env)
+        imports = parse_importtime(stderr)
+        walls.append(seconds)
+        import_us.append(sum(us for module, us in imports.items() if module not in baseline))
+
+    imports = parse_importtime(stderr)
+    heaviest = sorted(
+        ((module, us) for module, us in imports.items() if module not in baseline),
+        key=lambda item: item[1], reverse=True
+    )[:10]
+    deferred = sorted({
+        module.split('.')[0] for module in imported_modules(stderr)
+        if module.split('.')[0] in DEFERRED_MODULES
+    })
+
+    return {
+        'command': ' '.join(args),
+        'wall_ms': statistics.median(walls) * 1000,
+        'import_ms': statistics.median(import_us) / 1000,
+        'heaviest_imports_ms': {module: us / 1000 for module, us in heaviest},
+        'deferred_modules_imported': deferred,
+    }
+
+
+def main(argv=None) -> int:
+    """Run the startup benchmark."""
+    parser = argparse.ArgumentParser(description="Measure startup and import time of short-lived commands")
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per command (default: 5)')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='Multiply the import-time budgets (e.g. 2 on slow CI machines)')
+    parser.add_argument('--work-dir', type=str, help='Directory for the synthetic data tree')
+    parser.add_argument('--output', '-o', type=str, help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    from .synthetic import generate_tree
+
+    work_dir = Path(args.work_dir or Path(tempfile.gettempdir()) / 'crux-bench-startup')
+    with redirect_stdout(sys.stderr):
+        generate_tree(work_dir / 'mirror', 'global', ['202509', '202510'], rows=20_000)
+    data_dir = work_dir / 'mirror' / 'data' / 'global'
+    cache_dir = work_dir / 'cache'
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([str(REPO_ROOT / 'python'), str(REPO_ROOT)])
+    env.pop('CRUX_CACHE_SOURCE', None)
+
+    _, baseline_stderr = run_command(['-c', 'pass'], REPO_ROOT, env)
+    baseline = parse_importtime(baseline_stderr)
+
+    commands = {
+        'import crux_cache': ['-c', 'import crux_cache'],
+        'crux-cache --help': ['-m', 'crux_cache', '--help'],
+        'crux-cache months (cached metadata)': [
+            '-m', 'crux_cache', '--cache-dir', str(cache_dir), '--source', str(work_dir / 'mirror'),
+            'months', 'global'
+        ],
+        'python -m src --manifest-only': ['-m', 'src', str(data_dir), '--manifest-only'],
+    }
+
+    results = {}
+    failures = []
+    for name, command in commands.items():
+        print(f"Measuring {name}...", file=sys.stderr)
+        result = measure(name, command, REPO_ROOT, env, baseline, args.repeat)
+        budget = DEFAULT_BUDGETS_MS[name] * args.budget_scale
+        result['budget_ms'] = budget
+        results[name] = result
+
+        if result['import_ms'] > budget:
+            failures.append(f"{name}: {result['import_ms']:.1f} ms of imports exceeds budget of {budget:.0f} ms")
+        if result['deferred_modules_imported']:
+            failures.append(f"{name}: imports {', '.join(result['deferred_modules_imported'])}")
+
+    write_results({
+        'benchmark': 'startup',
+        'environment': environment(),
+        'params': {'repeat': args.repeat, 'budget_scale': args.budget_scale},
+        'results': results,
+        'failures': failures,
+    }, args.output)
+
+    for failure in failures:
+        print(f"✗ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Synthetic CrUX months with a realistic shape.
+
+Generates a data/ tree with the same layout as the repository: ~25 MB CSV
+chunks sorted by rank then origin, rank buckets matching VALID_RANK_VALUES
+with the proportions of the real global dataset, a long tail of IDN hosts,
+and manifest.json / datasets.json produced by the collector's own
+ManifestGenerator.
+"""
+import json
+import random
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.backends import bucket_sizes
+from src.binfmt import encode_chunk
+from src.manifest import ManifestGenerator, update_datasets_manifest
+
+CHUNK_SIZE_BYTES = 25 * 1024 * 1024  # Same target as ChunkProcessor
+
+_SUBDOMAINS = [('www.', 45), ('', 35), ('m.', 4), ('shop.', 2), ('blog.', 2), ('app.', 2), ('*', 10)]
+_TLDS = [
+    ('com', 40), ('org', 5), ('net', 5), ('de', 5), ('co.uk', 3), ('ru', 4), ('jp', 3),
+    ('com.br', 3), ('in', 2), ('fr', 3), ('it', 2), ('pl', 2), ('nl', 2), ('xn--p1ai', 2),
+    ('io', 2), ('co', 2), ('es', 2), ('vn', 2), ('id', 2), ('com.au', 2), ('cz', 1), ('xyz', 1),
+]
+_SYLLABLES = [
+    'ka', 'lo', 'mi', 'ne', 'ra', 'to', 'shi', 'ba', 'de', 'ver', 'an', 'tech', 'shop', 'news',
+    'go', 'pro', 'net', 'web', 'zen', 'lu', 'mar', 'sol', 'tri', 'qu', 'ix', 'on', 'el', 'fy',
+]
+_PUNYCODE_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+class OriginGenerator:
+    """Generates random but plausible origins."""
+
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self._subdomains, self._subdomain_weights = zip(*_SUBDOMAINS)
+        self._tlds, self._tld_weights = zip(*_TLDS)
+
+    def _word(self) -> str:
+        return ''.join(self.random.choice(_SYLLABLES) for _ in range(self.random.randint(2, 5)))
+
+    def _idn_label(self) -> str:
+        body = ''.join(self.random.choice(_PUNYCODE_CHARS) for _ in range(self.random.randint(6, 28)))
+        return f"xn--{body[:3]}-{body[3:]}"
+
+    def origin(self) -> str:
+        """Generate one origin."""
+        rnd = self.random
+        scheme = 'https://' if rnd.random() < 0.95 else 'http://'
+
+        subdomain = rnd.choices(self._subdomains, self._subdomain_weights)[0]
+        if subdomain == '*':
+            subdomain = self._word() + '.'
+
+        # Long tail of internationalized hosts
+        name = self._idn_label() if rnd.random() < 0.04 else self._word()
+        if rnd.random() < 0.3:
+            name += str(rnd.randint(1, 999))
+
+        tld = rnd.choices(self._tlds, self._tld_weights)[0]
+        port = f":{rnd.choice([8080, 8443, 3000])}" if rnd.random() < 0.002 else ''
+        return f"{scheme}{subdomain}{name}.{tld}{port}"
+
+
+def generate_rows(rows: int, seed: int) -> Iterator[Tuple[str, int]]:
+    """
+    Generate the rows of one synthetic month in rank, origin order.
+
+    Origins are unique within a rank bucket.
+
+    Args:
+        rows: Number of rows
+        seed: Random seed
+
+    Yields:
+        Tuple of (origin, rank)
+    """
+    generator = OriginGenerator(seed)
+    for rank, count in bucket_sizes(rows):
+        origins = set()
+        while len(origins) < count:
+            origins.add(generator.origin())
+        for origin in sorted(origins):
+            yield origin, rank
+
+
+def write_month(
+    dataset_dir: Path,
+    yyyymm: str,
+    rows: int,
+    seed: int,
+    chunk_size: int = CHUNK_SIZE_BYTES,
+    binary: bool = False
+) -> int:
+    """
+    Write one synthetic month as CSV chunks (and optionally binary chunks).
+
+    Args:
+        dataset_dir: Dataset directory (e.g. root/data/global)
+        yyyymm: Month in YYYYMM format
+        rows: Number of rows
+        seed: Random seed
+        chunk_size: Target chunk size in bytes
+        binary: Also write binary chunks
+
+    Returns:
+        Number of chunks written
+    """
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+
+    chunk_num = 0
+    buffer = bytearray()
+    origins: List[str] = []
+    ranks: List[int] = []
+
+    def flush() -> None:
+        nonlocal chunk_num, buffer, origins, ranks
+        chunk_num += 1
+        data = (b'origin,rank\n' if chunk_num == 1 else b'') + bytes(buffer)
+        (dataset_dir / f"{yyyymm}_{chunk_num}.csv").write_bytes(data)
+        if binary:
+            (dataset_dir / f"{yyyymm}_{chunk_num}.bin").write_bytes(encode_chunk(origins, ranks))
+        buffer = bytearray()
+        origins = []
+        ranks = []
+
+    for origin, rank in generate_rows(rows, seed):
+        buffer += f"{origin},{rank}\n".encode('utf-8')
+        if binary:
+            origins.append(origin)
+            ranks.append(rank)
+        if len(buffer) >= chunk_size:
+            flush()
+
+    if buffer or chunk_num == 0:
+        flush()
+
+    return chunk_num
+
+
+def generate_tree(
+    root: Path,
+    dataset: str = 'global',
+    months: Optional[List[str]] = None,
+    rows: int = 18_000_000,
+    chunk_size: int = CHUNK_SIZE_BYTES,
+    binary: bool = False,
+    seed: int = 0
+) -> Dict:
+    """
+    Generate a synthetic data/ tree, reusing it if it was generated with the same parameters.
+
+    Args:
+        root: Directory that will contain data/
+        dataset: Dataset name
+        months: Months to generate (default: ['202510'])
+        rows: Rows per month
+        chunk_size: Target chunk size in bytes
+        binary: Also write binary chunks
+        seed: Random seed
+
+    Returns:
+        The dataset manifest
+    """
+    months = months or ['202510']
+    params = {
+        'dataset': dataset, 'months': months, 'rows': rows,
+        'chunk_size': chunk_size, 'binary': binary, 'seed': seed
+    }
+
+    data_root = Path(root) / 'data'
+    dataset_dir = data_root / dataset
+    params_path = dataset_dir / '.synthetic.json'
+    manifest_path = dataset_dir / 'manifest.json'
+
+    if params_path.exists() and manifest_path.exists():
+        if json.loads(params_path.read_text()) == params:
+            return json.loads(manifest_path.read_text())
+
+    for old_file in list(dataset_dir.glob('*.csv')) + list(dataset_dir.glob('*.bin')):
+        old_file.unlink()
+
+    for index, yyyymm in enumerate(months):
+        write_month(dataset_dir, yyyymm, rows, seed + index, chunk_size, binary)
+
+    manifest = ManifestGenerator(dataset_dir, dataset).update(incremental=False)
+    update_datasets_manifest(data_root)
+    params_path.write_text(json.dumps(params))
+    return manifest
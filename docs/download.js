@@ -2,11 +2,21 @@
  * Streaming Download Engine for CrUX Dataset
  *
  * This module handles efficient streaming downloads by:
- * 1. Fetching chunks sequentially from GitHub
- * 2. Merging them on-the-fly (removing duplicate headers)
- * 3. Streaming directly to download (zero memory overhead)
+ * 1. Fetching a window of chunks in parallel from GitHub
+ * 2. Retrying failed chunks, resuming them with range requests
+ * 3. Merging them on-the-fly in order into a single stream
  */
 
+// Chunks fetched in parallel ahead of the one being streamed
+const FETCH_CONCURRENCY = 4;
+
+// Attempts per chunk, and the base of the exponential backoff between them (ms)
+const FETCH_ATTEMPTS = 4;
+const RETRY_BACKOFF_MS = 1000;
+
+// HTTP statuses worth retrying
+const TRANSIENT_STATUSES = [408, 429, 500, 502, 503, 504];
+
 class StreamingDownloader {
     constructor(dataset = 'global') {
         this.dataset = dataset;
@@ -123,8 +133,68 @@ class StreamingDownloader {
         }
     }
 
+    /**
+     * Fetch one chunk into memory, retrying transient failures
+     *
+     * An interrupted transfer is resumed with a range request from the
+     * bytes already received. Resolves to the list of received byte arrays.
+     */
+    async fetchChunk(chunk, signal, onBytes) {
+        const chunkUrl = `${this.baseUrl}data/${this.dataset}/${chunk.filename}`;
+        const parts = [];
+        let received = 0;
+
+        for (let attempt = 1; ; attempt++) {
+            try {
+                const headers = received ? { Range: `bytes=${received}-` } : {};
+                const response = await fetch(chunkUrl, { signal, headers });
+
+                if (received && response.status !== 206) {
+                    // The server ignored the range: start over
+                    onBytes(-received);
+                    parts.length = 0;
+                    received = 0;
+                }
+
+                if (!response.ok) {
+                    const error = new Error(`Failed to fetch ${chunk.filename}: ${response.status}`);
+                    error.transient = TRANSIENT_STATUSES.includes(response.status);
+                    throw error;
+                }
+
+                const reader = response.body.getReader();
+                while (true) {
+                    const { done, value } = await reader.read();
+
+                    if (done) break;
+
+                    parts.push(value);
+                    received += value.length;
+                    onBytes(value.length);
+                }
+
+                if (chunk.size && received < chunk.size) {
+                    throw new Error(`Incomplete download of ${chunk.filename}: ${received} of ${chunk.size} bytes`);
+                }
+                return parts;
+
+            } catch (error) {
+                if (signal.aborted || error.transient === false || attempt >= FETCH_ATTEMPTS) {
+                    throw error;
+                }
+
+                // Exponential backoff with full jitter
+                const delay = Math.random() * RETRY_BACKOFF_MS * 2 ** (attempt - 1);
+                await new Promise(resolve => setTimeout(resolve, delay));
+            }
+        }
+    }
+
     /**
      * Perform the actual streaming download
+     *
+     * Up to FETCH_CONCURRENCY chunks are fetched at a time; the stream
+     * emits them in order as soon as each one is complete.
      */
     async streamDownload(yyyymm, monthData, onProgress) {
         const chunks = monthData.chunks;
@@ -132,85 +202,83 @@ class StreamingDownloader {
         const totalSize = monthData.total_size;
         const dataset = this.dataset; // Capture dataset for filename
         const self = this; // Preserve context for use inside ReadableStream
+        const signal = this.abortController.signal;
+
+        let bytesDownloaded = 0;
+        let nextToFetch = 0;
+        let nextToEmit = 0;
+        const pending = []; // Promises of chunk contents, by chunk index
+
+        const report = (type) => {
+            onProgress({
+                type: type,
+                chunkIndex: nextToEmit,
+                totalChunks: totalChunks,
+                bytesDownloaded: bytesDownloaded,
+                totalBytes: totalSize
+            });
+        };
+
+        const onBytes = (count) => {
+            bytesDownloaded += count;
+            report('progress');
+        };
+
+        // Keep the window of chunks ahead of the one being emitted in flight
+        const fillWindow = () => {
+            while (nextToFetch < totalChunks && nextToFetch < nextToEmit + FETCH_CONCURRENCY) {
+                const promise = self.fetchChunk(chunks[nextToFetch], signal, onBytes);
+                promise.catch(() => {}); // Errors are raised when the chunk is emitted
+                pending[nextToFetch] = promise;
+                nextToFetch++;
+            }
+        };
 
-        // Create a readable stream that will merge all chunks
+        // Create a readable stream that merges the chunks in order
         const stream = new ReadableStream({
-            async start(controller) {
-                let bytesDownloaded = 0;
-
-                for (let i = 0; i < totalChunks; i++) {
-                    if (self.abortController.signal.aborted) {
-                        controller.close();
-                        return;
-                    }
-
-                    const chunk = chunks[i];
-                    const chunkUrl = `${self.baseUrl}data/${self.dataset}/${chunk.filename}`;
-
-                    onProgress({
-                        type: 'chunk',
-                        chunkIndex: i,
-                        totalChunks: totalChunks,
-                        bytesDownloaded: bytesDownloaded,
-                        totalBytes: totalSize
-                    });
-
-                    try {
-                        const response = await fetch(chunkUrl, {
-                            signal: self.abortController.signal
-                        });
-
-                        if (!response.ok) {
-                            throw new Error(`Failed to fetch chunk ${i + 1}: ${response.status}`);
-                        }
-
-                        const reader = response.body.getReader();
-                        const decoder = new TextDecoder();
-                        let buffer = '';
-
-                        while (true) {
-                            const { done, value } = await reader.read();
-
-                            if (done) break;
-
-                            bytesDownloaded += value.length;
-                            buffer += decoder.decode(value, { stream: true });
-
-                            // Process complete lines
-                            const lines = buffer.split('\n');
-                            buffer = lines.pop(); // Keep incomplete line in buffer
-
-                            for (const line of lines) {
-                                // Enqueue line with newline
-                                controller.enqueue(new TextEncoder().encode(line + '\n'));
-                            }
-
-                            onProgress({
-                                type: 'progress',
-                                chunkIndex: i,
-                                totalChunks: totalChunks,
-                                bytesDownloaded: bytesDownloaded,
-                                totalBytes: totalSize
-                            });
-                        }
-
-                        // Handle remaining buffer
-                        if (buffer) {
-                            controller.enqueue(new TextEncoder().encode(buffer + '\n'));
-                        }
-
-                    } catch (error) {
-                        controller.error(error);
-                        throw error;
-                    }
+            start() {
+                fillWindow();
+                report('chunk');
+            },
+
+            async pull(controller) {
+                if (signal.aborted) {
+                    controller.close();
+                    return;
+                }
+
+                if (nextToEmit === totalChunks) {
+                    controller.close();
+                    report('complete');
+                    return;
                 }
 
-                controller.close();
-                onProgress({
-                    type: 'complete',
-                    bytesDownloaded: bytesDownloaded,
-                    totalBytes: totalSize
-                });
+                let parts;
+                try {
+                    parts = await pending[nextToEmit];
+                } catch (error) {
+                    // Stop the other chunks in flight
+                    self.abortController.abort();
+                    controller.error(error);
+                    throw error;
+                }
+
+                for (const part of parts) {
+                    controller.enqueue(part);
+                }
+
+                // Chunks end with a newline; make sure lines never run together
+                const last = parts.length ? parts[parts.length - 1] : null;
+                if (last && last[last.length - 1] !== 0x0a) {
+                    controller.enqueue(new Uint8Array([0x0a]));
+                }
+
+                delete pending[nextToEmit];
+                nextToEmit++;
+                fillWindow();
+                if (nextToEmit < totalChunks) {
+                    report('chunk');
+                }
             }
         });
 
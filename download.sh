@@ -11,11 +11,19 @@
 #   bash <(curl -sSL https://raw.githubusercontent.com/lonetis/crux-cache/main/download.sh) global
 #   bash <(curl -sSL https://raw.githubusercontent.com/lonetis/crux-cache/main/download.sh) global 202510
 #
+# Environment:
+#   CRUX_JOBS           Chunks downloaded in parallel (default: 4)
+#   CRUX_RETRIES        Retries per chunk; interrupted chunks resume (default: 3)
+#   CRUX_CACHE_SOURCE   Base URL of a mirror of the repository (default: GitHub)
+#
 
 set -e
 
 # Configuration
-REPO_BASE="https://raw.githubusercontent.com/lonetis/crux-cache/main"
+REPO_BASE="${CRUX_CACHE_SOURCE:-https://raw.githubusercontent.com/lonetis/crux-cache/main}"
+REPO_BASE="${REPO_BASE%/}"
+JOBS="${CRUX_JOBS:-4}"
+RETRIES="${CRUX_RETRIES:-3}"
 DATASET="${1:-global}"
 REQUESTED_MONTH="${2:-}"
 
@@ -89,8 +97,19 @@ else
     echo "  Latest month: $TARGET_MONTH"
 fi
 
-# Get chunk information
-CHUNKS=$(echo "$MANIFEST" | grep -A 1000 "\"$TARGET_MONTH\"" | grep -o '"filename": *"[^"]*"' | cut -d'"' -f4)
+# Get the CSV chunks of the month, in order. Chunk entries also list binary
+# encodings and months list delta files, so only YYYYMM_N.csv files are taken.
+if command -v python3 >/dev/null 2>&1; then
+    CHUNKS=$(echo "$MANIFEST" | python3 -c '
+import json, sys
+month = json.load(sys.stdin).get("months", {}).get(sys.argv[1], {})
+for chunk in month.get("chunks", []):
+    print(chunk["filename"])
+' "$TARGET_MONTH")
+else
+    CHUNKS=$(echo "$MANIFEST" | grep -o "\"filename\": *\"${TARGET_MONTH}_[0-9]*\\.csv\"" | cut -d'"' -f4 \
+        | sort -t_ -k2 -n -u)
+fi
 CHUNK_COUNT=$(echo "$CHUNKS" | wc -l | tr -d ' ')
 
 if [ -z "$CHUNKS" ] || [ "$CHUNK_COUNT" -eq 0 ]; then
@@ -109,17 +128,46 @@ if [ -f "$OUTPUT_FILE" ]; then
     rm "$OUTPUT_FILE"
 fi
 
-# Download and concatenate chunks
-echo "→ Downloading chunks..."
-CHUNK_NUM=0
-
-for CHUNK_FILE in $CHUNKS; do
-    CHUNK_NUM=$((CHUNK_NUM + 1))
-    CHUNK_URL="${REPO_BASE}/data/${DATASET}/${CHUNK_FILE}"
-
+# Download a chunk into a file, resuming it on each retry
+# Usage: fetch_chunk <url> <file>
+fetch_chunk() {
+    local attempt=0
+    while true; do
+        curl -sSfL -C - -o "$2" "$1" 2>/dev/null && return 0
+        # Servers without range support cannot resume (curl exit code 33): start over
+        [ $? -eq 33 ] && rm -f "$2"
+        attempt=$((attempt + 1))
+        if [ "$attempt" -gt "$RETRIES" ]; then
+            return 1
+        fi
+        sleep $((attempt * 2))
+    done
+}
+
+# Download up to $JOBS chunks in parallel into a temporary directory and
+# append them to the output file in order as soon as each one is complete
+echo "→ Downloading chunks ($JOBS in parallel)..."
+TMP_DIR=$(mktemp -d)
+PIDS=()
+trap 'kill "${PIDS[@]}" 2>/dev/null || true; rm -rf "$TMP_DIR"' EXIT
+
+CHUNK_FILES=($CHUNKS)
+NEXT=0
+
+for ((CHUNK_NUM = 1; CHUNK_NUM <= CHUNK_COUNT; CHUNK_NUM++)); do
+    # Keep the window of $JOBS chunks ahead of the one being appended in flight
+    while [ "$NEXT" -lt "$CHUNK_COUNT" ] && [ "$NEXT" -lt $((CHUNK_NUM - 1 + JOBS)) ]; do
+        fetch_chunk "${REPO_BASE}/data/${DATASET}/${CHUNK_FILES[$NEXT]}" "$TMP_DIR/$NEXT" &
+        PIDS[$NEXT]=$!
+        NEXT=$((NEXT + 1))
+    done
+
+    INDEX=$((CHUNK_NUM - 1))
+    CHUNK_FILE="${CHUNK_FILES[$INDEX]}"
     echo -n "  [$CHUNK_NUM/$CHUNK_COUNT] $CHUNK_FILE ... "
 
-    if curl -sSL "$CHUNK_URL" >> "$OUTPUT_FILE" 2>/dev/null; then
+    if wait "${PIDS[$INDEX]}" && cat "$TMP_DIR/$INDEX" >> "$OUTPUT_FILE"; then
+        rm -f "$TMP_DIR/$INDEX"
         echo "✓"
     else
         echo "✗"
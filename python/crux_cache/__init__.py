@@ -7,11 +7,28 @@ allowing you to iterate over domain rankings.
 
 from .client import CruxCache
 from .dataset import CruxDataset
+from .table import CruxTable
+from .matrix import RankMatrix
+from .suffix import SuffixIndex
+from .resident import ResidentMonth
+from .sync import SyncDaemon
+from .derived import ArtifactBuilder, ArtifactStore
+from .scan import Reducer, MergeableReducer, Count, CountBy, Collect, WriteCSV
+from .storage import StorageBackend, HTTPStorage, LocalStorage
+from .retry import RetryPolicy
+from .observers import (
+    CacheObserver,
+    CacheStats,
+    ProgressReporter,
+    SpanRecorder,
+    OpenTelemetryObserver,
+)
 from .exceptions import (
     CruxCacheError,
     DatasetNotFoundError,
     MonthNotFoundError,
     DownloadError,
+    TransientDownloadError,
     CacheError,
 )
 
@@ -20,9 +37,32 @@ __author__ = "Louis"
 __all__ = [
     "CruxCache",
     "CruxDataset",
+    "CruxTable",
+    "RankMatrix",
+    "SuffixIndex",
+    "ResidentMonth",
+    "SyncDaemon",
+    "ArtifactBuilder",
+    "ArtifactStore",
+    "Reducer",
+    "MergeableReducer",
+    "Count",
+    "CountBy",
+    "Collect",
+    "WriteCSV",
+    "StorageBackend",
+    "HTTPStorage",
+    "LocalStorage",
+    "RetryPolicy",
+    "CacheObserver",
+    "CacheStats",
+    "ProgressReporter",
+    "SpanRecorder",
+    "OpenTelemetryObserver",
     "CruxCacheError",
     "DatasetNotFoundError",
     "MonthNotFoundError",
     "DownloadError",
+    "TransientDownloadError",
     "CacheError",
 ]
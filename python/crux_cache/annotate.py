@@ -0,0 +1,315 @@
+"""
+Streaming annotation of URL lists with CrUX ranks.
+
+URLs are normalized to origins and hash-joined against one month. When the
+month's lookup table fits in the memory limit it is built once and the URLs
+are streamed through it. Otherwise both sides are split into partitions on
+disk by a hash of the origin, each partition is joined on its own (in
+parallel with several workers), and the partition results are merged back
+into input order. Either way, results are produced incrementally and in the
+order of the input.
+"""
+
+import os
+import re
+import gzip
+import heapq
+import shutil
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from .constants import DEFAULT_ANNOTATE_MEMORY
+from .dataset import CruxDataset
+
+# Approximate memory used per origin by the in-memory lookup table
+TABLE_BYTES_PER_ORIGIN = 128
+
+# Partition files written at a time; joins needing more partitions split each one again
+MAX_PARTITIONS = 256
+
+# Partitions select successive digits of a 32-bit hash
+_HASH_RANGE = 2 ** 32
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Characters of (punycode) host names and IPv6 addresses
+_HOSTNAME = re.compile(r'[a-z0-9_.-]+')
+_IPV6 = re.compile(r'[0-9a-f:.]+')
+
+# (url, origin or None if the URL has no http(s) origin, rank or None if not ranked)
+Annotation = Tuple[str, Optional[str], Optional[int]]
+
+
+def url_to_origin(url: str) -> Optional[str]:
+    """
+    Normalize a URL to an origin as it appears in CrUX (scheme://host[:port]).
+
+    Schemes and hosts are lowercased, internationalized hosts converted to
+    punycode and default ports dropped. URLs without a scheme are assumed to
+    be https.
+
+    Args:
+        url: URL or bare host name
+
+    Returns:
+        Origin, or None if the URL is not an http(s) URL with a valid host
+    """
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url.lstrip('/')
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None  # Invalid port or IPv6 address
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if scheme not in _DEFAULT_PORTS or not host:
+        return None
+
+    if not host.isascii():
+        try:
+            host = host.encode('idna').decode('ascii')
+        except UnicodeError:
+            return None
+    if ':' in host:
+        if not _IPV6.fullmatch(host):
+            return None
+        host = f'[{host}]'
+    elif not _HOSTNAME.fullmatch(host):
+        return None  # e.g. text with spaces taken for a bare host name
+
+    if port is not None and port != _DEFAULT_PORTS[scheme]:
+        return f'{scheme}://{host}:{port}'
+    return f'{scheme}://{host}'
+
+
+def read_urls(urls: Union[str, 'os.PathLike[str]', Iterable[str]]) -> Iterator[str]:
+    """
+    Stream URLs from a file or an iterable.
+
+    Args:
+        urls: Path of a text file with one URL per line (gzip-compressed if it
+              ends with .gz; blank lines are skipped), or an iterable of URLs
+
+    Yields:
+        URLs
+    """
+    if not isinstance(urls, (str, os.PathLike)):
+        yield from urls
+        return
+
+    path = os.fspath(urls)
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def _partition(origin: str, partitions: int, divisor: int = 1) -> int:
+    """
+    Partition of an origin (a hash that is stable across processes).
+
+    Sub-partitions of a partition pass the product of the partition counts
+    above them as divisor, so they split on other digits of the hash.
+    """
+    return zlib.crc32(origin.encode('utf-8')) // divisor % partitions
+
+
+def _write_partitions(paths: List[str], lines: Iterable[Tuple[int, str]]) -> None:
+    """Write (partition, line) pairs to one file per partition."""
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(path, 'w', encoding='utf-8', newline='\n')) for path in paths]
+        for partition, line in lines:
+            files[partition].write(line)
+
+
+def _read_lines(path: str) -> Iterator[str]:
+    with open(path, 'r', encoding='utf-8', newline='\n') as f:
+        yield from f
+
+
+def _line_index(line: str) -> int:
+    return int(line.split('\t', 1)[0])
+
+
+def partition_count(origins: int, memory_limit: int, workers: int = 1) -> int:
+    """
+    Choose the number of partitions for a join.
+
+    Args:
+        origins: Number of origins in the month
+        memory_limit: Memory available for lookup tables in bytes
+        workers: Partitions joined at the same time
+
+    Returns:
+        1 if the lookup table fits in memory, otherwise enough partitions for the
+        tables of all workers to fit
+    """
+    table_bytes = origins * TABLE_BYTES_PER_ORIGIN
+    if table_bytes <= memory_limit:
+        return 1
+    per_worker = max(1, memory_limit // max(1, workers))
+    return max(workers, -(-table_bytes // per_worker))
+
+
+def _partitioned_join(
+    build_lines: Iterable[str],
+    probe_lines: Iterable[str],
+    prefix: str,
+    partitions: int,
+    divisor: int = 1,
+    workers: int = 1
+) -> Iterator[str]:
+    """
+    Hash-join origins and URLs through partition files.
+
+    Both sides are split into at most MAX_PARTITIONS files by a hash of the
+    origin and each partition is joined on its own. Joins needing more
+    partitions split each partition again, on other digits of the hash.
+
+    Args:
+        build_lines: Origins of the month ('origin\\trank' lines)
+        probe_lines: URLs in input order ('index\\torigin\\turl' lines)
+        prefix: Path prefix of the partition files
+        partitions: Partitions needed for each lookup table to fit in memory
+        divisor: Product of the partition counts above this join (see _partition)
+        workers: Processes joining partitions in parallel
+
+    Yields:
+        'index\\trank\\torigin\\turl' lines in input order
+    """
+    fanout = min(partitions, MAX_PARTITIONS)
+    build_paths = [f'{prefix}build_{p}.tsv' for p in range(fanout)]
+    probe_paths = [f'{prefix}probe_{p}.tsv' for p in range(fanout)]
+    output_paths = [f'{prefix}joined_{p}.tsv' for p in range(fanout)]
+
+    def probe_partition(line: str) -> int:
+        index, origin, _ = line.split('\t', 2)
+        # URLs without an origin can go to any partition
+        return _partition(origin, fanout, divisor) if origin else int(index) % fanout
+
+    def build_partition(line: str) -> int:
+        return _partition(line.split('\t', 1)[0], fanout, divisor)
+
+    _write_partitions(build_paths, ((build_partition(line), line) for line in build_lines))
+    _write_partitions(probe_paths, ((probe_partition(line), line) for line in probe_lines))
+
+    subpartitions = [-(-partitions // fanout)] * fanout
+    divisors = [divisor * fanout] * fanout
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_join_partition, build_paths, probe_paths, output_paths, subpartitions, divisors))
+    else:
+        for paths in zip(build_paths, probe_paths, output_paths, subpartitions, divisors):
+            _join_partition(*paths)
+    for path in build_paths + probe_paths:
+        os.remove(path)
+
+    # Every partition is in input order, so merging them by index restores it
+    yield from heapq.merge(*(_read_lines(path) for path in output_paths), key=_line_index)
+    for path in output_paths:
+        os.remove(path)
+
+
+def _join_partition(build_path: str, probe_path: str, output_path: str, subpartitions: int, divisor: int) -> None:
+    """
+    Join one partition.
+
+    Args:
+        build_path: Origins of the month in the partition ('origin\\trank' lines)
+        probe_path: URLs in the partition, in input order ('index\\torigin\\turl' lines)
+        output_path: File to write 'index\\trank\\torigin\\turl' lines to
+        subpartitions: Partitions to split this one into, so each lookup table fits in memory
+        divisor: Product of the partition counts above this partition (see _partition)
+    """
+    if subpartitions > 1 and divisor < _HASH_RANGE:
+        with open(output_path, 'w', encoding='utf-8', newline='\n') as out:
+            out.writelines(_partitioned_join(
+                _read_lines(build_path), _read_lines(probe_path), os.path.splitext(output_path)[0] + '.',
+                subpartitions, divisor
+            ))
+        return
+
+    table: Dict[str, str] = {}
+    ranks: Dict[str, str] = {}
+    with open(build_path, 'r', encoding='utf-8', newline='\n') as f:
+        for line in f:
+            origin, rank = line.rstrip('\n').split('\t')
+            table[origin] = ranks.setdefault(rank, rank)
+
+    with open(probe_path, 'r', encoding='utf-8', newline='\n') as f, \
+            open(output_path, 'w', encoding='utf-8', newline='\n') as out:
+        for line in f:
+            index, origin, url = line.rstrip('\n').split('\t', 2)
+            out.write(f"{index}\t{table.get(origin, '')}\t{origin}\t{url}\n")
+
+
+def _annotate_in_memory(dataset: CruxDataset, urls: Iterable[str]) -> Iterator[Annotation]:
+    """Annotate URLs with a lookup table of the whole month."""
+    table: Dict[str, int] = {}
+    ranks: Dict[int, int] = {}
+    for origin, rank in dataset:
+        table[origin] = ranks.setdefault(rank, rank)
+
+    for url in urls:
+        origin = url_to_origin(url)
+        yield url, origin, table.get(origin) if origin else None
+
+
+def _annotate_partitioned(
+    dataset: CruxDataset,
+    urls: Iterable[str],
+    partitions: int,
+    workers: int,
+    spill_dir: Optional[str]
+) -> Iterator[Annotation]:
+    """Annotate URLs with a partitioned join through temporary files."""
+    tmp_dir = tempfile.mkdtemp(prefix='crux-annotate-', dir=spill_dir)
+    try:
+        build_lines = (f"{origin}\t{rank}\n" for origin, rank in dataset)
+        probe_lines = (f"{index}\t{url_to_origin(url) or ''}\t{url}\n" for index, url in enumerate(urls))
+        joined = _partitioned_join(build_lines, probe_lines, tmp_dir + os.sep, partitions, workers=workers)
+        for line in joined:
+            _, rank, origin, url = line.rstrip('\n').split('\t', 3)
+            yield url, origin or None, int(rank) if rank else None
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def annotate(
+    dataset: CruxDataset,
+    urls: Union[str, 'os.PathLike[str]', Iterable[str]],
+    memory_limit: int = DEFAULT_ANNOTATE_MEMORY,
+    workers: int = 1,
+    spill_dir: Optional[str] = None
+) -> Iterator[Annotation]:
+    """
+    Annotate URLs with the rank of their origin in a month.
+
+    Args:
+        dataset: Month to look origins up in (origins beyond its max_rank are unranked)
+        urls: Path of a text file with one URL per line (optionally .gz), or an
+              iterable of URLs
+        memory_limit: Memory for the month's lookup table in bytes. Larger months
+                      are joined in partitions spilled to disk.
+        workers: Processes joining partitions in parallel (partitioned joins only)
+        spill_dir: Directory for temporary partition files (default: system temp dir)
+
+    Yields:
+        Tuple of (url, origin, rank) in input order. origin is None for URLs
+        without an http(s) origin, rank is None for origins not in the month.
+    """
+    partitions = partition_count(len(dataset), memory_limit, workers)
+    if partitions == 1:
+        yield from _annotate_in_memory(dataset, read_urls(urls))
+    else:
+        yield from _annotate_partitioned(dataset, read_urls(urls), partitions, workers, spill_dir)
@@ -0,0 +1,184 @@
+"""Reader for the compact binary chunk format (YYYYMM_N.bin)."""
+
+import sys
+import zlib
+import struct
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterator, List, Optional, Tuple
+
+from .exceptions import CacheError
+
+MAGIC = b'CRUXBIN1'
+FLAG_ZLIB = 0x1
+
+HEADER = struct.Struct('<8sIIIII')
+RUN = struct.Struct('<II')
+
+
+class BinaryChunk:
+    """
+    Random-access reader for one binary chunk.
+
+    Ranks are stored as runs of (rank, count) and origins as front-coded
+    blocks with an index of block offsets, so any row can be decoded by
+    reading a single block.
+    """
+
+    def __init__(self, path: str, data: Optional[bytes] = None):
+        """
+        Open a binary chunk.
+
+        Args:
+            path: Path to the .bin file
+            data: Contents of the file, if already read
+
+        Raises:
+            CacheError: If the file is not a valid binary chunk
+        """
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        self._data = data
+
+        try:
+            magic, flags, rows, run_count, block_size, block_count = HEADER.unpack_from(self._data, 0)
+        except struct.error as e:
+            raise CacheError(f"Invalid binary chunk {path}: {e}")
+        if magic != MAGIC:
+            raise CacheError(f"Invalid binary chunk {path}: bad magic {magic!r}")
+
+        self.path = path
+        self.rows = rows
+        self.block_size = block_size
+        self.block_count = block_count
+        self._compressed = bool(flags & FLAG_ZLIB)
+
+        offset = HEADER.size
+        self.runs: List[Tuple[int, int]] = [
+            RUN.unpack_from(self._data, offset + i * RUN.size) for i in range(run_count)
+        ]
+        offset += run_count * RUN.size
+
+        self._block_offsets = struct.unpack_from(f'<{block_count + 1}Q', self._data, offset)
+        self._blocks_start = offset + (block_count + 1) * 8
+
+        # Row index at which each rank run ends
+        self._run_ends = list(accumulate(count for _, count in self.runs))
+
+    def __len__(self) -> int:
+        """Number of rows in the chunk."""
+        return self.rows
+
+    def rank_at(self, index: int) -> int:
+        """
+        Get the rank of a row.
+
+        Args:
+            index: Row index within the chunk
+
+        Returns:
+            Rank of the row
+        """
+        if not 0 <= index < self.rows:
+            raise IndexError(f"row index {index} out of range")
+        return self.runs[bisect_right(self._run_ends, index)][0]
+
+    def count_up_to(self, max_rank: Optional[int]) -> int:
+        """
+        Count the leading rows with rank <= max_rank.
+
+        Args:
+            max_rank: Maximum rank, or None for all rows
+
+        Returns:
+            Number of matching rows
+        """
+        if max_rank is None:
+            return self.rows
+        return sum(count for rank, count in self.runs if rank <= max_rank)
+
+    def block(self, block_idx: int) -> List[str]:
+        """
+        Decode all origins of a block.
+
+        Args:
+            block_idx: Block index
+
+        Returns:
+            List of origins in the block
+        """
+        start = self._blocks_start + self._block_offsets[block_idx]
+        end = self._blocks_start + self._block_offsets[block_idx + 1]
+        raw = self._data[start:end]
+        if self._compressed:
+            raw = zlib.decompress(raw)
+
+        n = min(self.block_size, self.rows - block_idx * self.block_size)
+        prefix_lengths = raw[:n]
+        suffix_lengths = array('H')
+        suffix_lengths.frombytes(raw[n:3 * n])
+        if sys.byteorder == 'big':
+            suffix_lengths.byteswap()
+        text = raw[3 * n:].decode('utf-8')
+
+        origins = []
+        previous = ''
+        pos = 0
+        for shared, length in zip(prefix_lengths, suffix_lengths):
+            previous = previous[:shared] + text[pos:pos + length]
+            pos += length
+            origins.append(previous)
+        return origins
+
+    def origin_at(self, index: int) -> str:
+        """
+        Get the origin of a row.
+
+        Args:
+            index: Row index within the chunk
+
+        Returns:
+            Origin of the row
+        """
+        if not 0 <= index < self.rows:
+            raise IndexError(f"row index {index} out of range")
+        block_idx, offset = divmod(index, self.block_size)
+        return self.block(block_idx)[offset]
+
+    def iter_rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+        """
+        Iterate over a range of rows.
+
+        Args:
+            start: First row index
+            stop: Row index to stop before (default: end of chunk)
+
+        Yields:
+            Tuple of (origin, rank)
+        """
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if start >= stop:
+            return
+
+        # Expand rank runs lazily alongside the decoded blocks
+        run_idx = bisect_right(self._run_ends, start)
+        run_rank = self.runs[run_idx][0]
+        run_end = self._run_ends[run_idx]
+
+        index = start
+        for block_idx in range(start // self.block_size, (stop - 1) // self.block_size + 1):
+            block_start = block_idx * self.block_size
+            origins = self.block(block_idx)
+            for origin in origins[index - block_start:stop - block_start]:
+                while index >= run_end:
+                    run_idx += 1
+                    run_rank = self.runs[run_idx][0]
+                    run_end = self._run_ends[run_idx]
+                yield (origin, run_rank)
+                index += 1
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        """Iterate over all rows as (origin, rank) tuples."""
+        return self.iter_rows()
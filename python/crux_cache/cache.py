@@ -4,37 +4,62 @@ import os
 import time
 import json
 import shutil
-from typing import Dict, Any
-
-try:
-    import requests
-except ImportError:
-    raise ImportError(
-        "The 'requests' library is required. Install it with: pip install requests"
-    )
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, Optional, Tuple
 
 from .constants import (
-    GITHUB_RAW_BASE_URL,
     DATASETS_JSON_PATH,
     MANIFEST_JSON_PATH,
     CSV_CHUNK_PATH,
 )
-from .exceptions import DownloadError, CacheError
+from .exceptions import DownloadError, CacheError, TransientDownloadError
+from .locks import FileLock
+from .observers import CacheObserver
+from .retry import RetryPolicy
+from .storage import StorageBackend, HTTPStorage
+
+# Suffixes of the lock file, in-progress download, hedged duplicate download and HTTP
+# validators next to a cached file
+LOCK_SUFFIX = ".lock"
+PART_SUFFIX = ".part"
+HEDGE_SUFFIX = ".hedge"
+VALIDATORS_SUFFIX = ".validators"
+
+# Waits for another process's download shorter than this are not reported
+LOCK_WAIT_REPORT_SECONDS = 0.001
 
 
 class CacheManager:
     """Manages local cache for downloaded files."""
 
-    def __init__(self, cache_dir: str, metadata_ttl: int):
+    def __init__(
+        self,
+        cache_dir: str,
+        metadata_ttl: int,
+        observer: Optional[CacheObserver] = None,
+        storage: Optional[StorageBackend] = None,
+        retry: Optional[RetryPolicy] = None
+    ):
         """
         Initialize the cache manager.
 
         Args:
             cache_dir: Directory to store cached files
             metadata_ttl: Time-to-live for metadata files in seconds
+            observer: Observer notified of cache hits, misses and downloads
+            storage: Backend files are fetched from (default: GitHub over HTTPS)
+            retry: Retry and hedging policy for downloads (default: RetryPolicy())
         """
         self.cache_dir = cache_dir
         self.metadata_ttl = metadata_ttl
+        self.observer = observer or CacheObserver()
+        self.storage = storage or HTTPStorage()
+        self.retry = retry or RetryPolicy()
+
+        # Parsed JSON files by path, with the (mtime, size) they were parsed at
+        self._json_memo: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
         self._ensure_cache_dir()
 
     def _ensure_cache_dir(self) -> None:
@@ -56,13 +81,14 @@ class CacheManager:
         """
         return os.path.join(self.cache_dir, relative_path)
 
-    def _is_cache_valid(self, cache_path: str, is_metadata: bool) -> bool:
+    def _is_cache_valid(self, cache_path: str, is_metadata: bool, size: Optional[int] = None) -> bool:
         """
         Check if a cached file is still valid.
 
         Args:
             cache_path: Path to the cached file
             is_metadata: Whether this is a metadata file (subject to TTL)
+            size: Expected size of a data file from the manifest, if known
 
         Returns:
             True if cache is valid, False otherwise
@@ -70,51 +96,265 @@ class CacheManager:
         if not os.path.exists(cache_path):
             return False
 
-        # CSV chunks are cached indefinitely
+        # CSV chunks are cached indefinitely, unless a newer manifest lists a different size
         if not is_metadata:
-            return True
+            return size is None or os.path.getsize(cache_path) == size
 
         # Metadata files are subject to TTL
         mtime = os.path.getmtime(cache_path)
         age = time.time() - mtime
         return age < self.metadata_ttl
 
-    def _download_file(self, url: str, destination: str) -> None:
+    def _fetch(self, relative_path: str, is_metadata: bool,
+               dataset_type: Optional[str], filename: str, size: Optional[int] = None,
+               revalidate: bool = False) -> str:
         """
-        Download a file from GitHub to local cache.
+        Get a readable path for a file, fetching it into the cache unless a valid copy exists.
+
+        Files of a local storage backend are read in place and never copied.
 
         Args:
-            url: Full URL to download from
-            destination: Local path to save the file
+            relative_path: Relative path in the repository
+            is_metadata: Whether this is a metadata file (subject to TTL)
+            dataset_type: Dataset the file belongs to (None for datasets.json)
+            filename: Filename reported to the observer
+            size: Expected size of the file in bytes, checked after downloading
+            revalidate: Revalidate metadata even if its TTL has not expired
+
+        Returns:
+            Local path of the file
 
         Raises:
-            DownloadError: If download fails
+            DownloadError: If the file cannot be fetched
+        """
+        local_path = self.storage.local_path(relative_path)
+        if local_path is not None:
+            self.observer.on_cache_hit(dataset_type, filename)
+            return local_path
+
+        cache_path = self._get_cache_path(relative_path)
+        if not revalidate and self._is_cache_valid(cache_path, is_metadata, size):
+            self.observer.on_cache_hit(dataset_type, filename)
+            return cache_path
+
+        # Single flight: one process downloads, the others wait for the lock and
+        # then find a valid file
+        with FileLock(cache_path + LOCK_SUFFIX) as lock:
+            if lock.wait_seconds >= LOCK_WAIT_REPORT_SECONDS:
+                self.observer.on_lock_wait(dataset_type, filename, lock.wait_seconds)
+
+            if not revalidate and self._is_cache_valid(cache_path, is_metadata, size):
+                self.observer.on_cache_hit(dataset_type, filename)
+                return cache_path
+
+            self.observer.on_cache_miss(dataset_type, filename)
+            self._download(relative_path, cache_path, is_metadata, dataset_type, filename, size)
+        return cache_path
+
+    def _download(
+        self,
+        relative_path: str,
+        cache_path: str,
+        is_metadata: bool,
+        dataset_type: Optional[str],
+        filename: str,
+        size: Optional[int] = None
+    ) -> None:
+        """
+        Download a file into the cache. Must be called with the file's lock held.
+
+        The file is written to a .part file and renamed into place, so other
+        processes never read a partially downloaded file. Data files are
+        immutable, so the .part file of an interrupted download is kept and
+        the next download resumes from it. Expired metadata is revalidated
+        with the validators (ETag, Last-Modified) of the cached copy; if it
+        is unchanged, only its TTL is renewed. Transient failures are retried
+        according to the retry policy.
+        """
+        validators = None
+        part_path = cache_path + PART_SUFFIX
+        if is_metadata:
+            validators = self._load_validators(cache_path)
+            self._remove(part_path)
+
+        url = self.storage.url(relative_path)
+        with self.observer.span('crux.download', url=url, dataset=dataset_type, filename=filename):
+            start = time.perf_counter()
+            try:
+                result = self._fetch_with_retries(
+                    relative_path, part_path, validators, is_metadata, dataset_type, filename
+                )
+                if result is not None:
+                    self._check_size(part_path, filename, size)
+                    os.replace(part_path, cache_path)
+            except BaseException:
+                # Partial data files are kept to resume from
+                if is_metadata:
+                    self._remove(part_path)
+                raise
+
+            if result is None:
+                self._renew(cache_path)
+                self.observer.on_not_modified(dataset_type, filename, time.perf_counter() - start)
+                return
+
+            if is_metadata:
+                self._save_validators(cache_path, result)
+            self.observer.on_download(dataset_type, filename, result['size'], time.perf_counter() - start)
+
+    def _fetch_with_retries(
+        self,
+        relative_path: str,
+        part_path: str,
+        validators: Optional[Dict[str, str]],
+        is_metadata: bool,
+        dataset_type: Optional[str],
+        filename: str
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch a file into part_path, retrying transient failures with jittered exponential backoff."""
+        policy = self.retry
+        attempt = 1
+        while True:
+            try:
+                if policy.hedge_after is not None and not is_metadata:
+                    return self._fetch_hedged(relative_path, part_path, dataset_type, filename)
+                return self.storage.fetch(relative_path, part_path, validators)
+            except TransientDownloadError as e:
+                if attempt >= policy.attempts:
+                    raise
+                # Data files resume from the partial download, metadata starts over
+                if is_metadata:
+                    self._remove(part_path)
+                delay = policy.delay(attempt)
+                self.observer.on_retry(dataset_type, filename, attempt, e, delay)
+                time.sleep(delay)
+                attempt += 1
+
+    def _fetch_hedged(
+        self,
+        relative_path: str,
+        part_path: str,
+        dataset_type: Optional[str],
+        filename: str
+    ) -> Dict[str, Any]:
+        """
+        Fetch a data file, racing a duplicate request against it if it takes longer than hedge_after.
+
+        The duplicate downloads the whole file into a .hedge file. The first
+        request to finish wins and the other one is cancelled; if the
+        duplicate wins, its file replaces the partial download.
         """
+        cancel = {'primary': threading.Event(), 'hedge': threading.Event()}
+        hedge_path = part_path + HEDGE_SUFFIX
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='crux-hedge')
         try:
-            # Ensure parent directory exists
-            os.makedirs(os.path.dirname(destination), exist_ok=True)
-
-            # Download with streaming to handle large files
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-
-            # Write to file
-            with open(destination, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-        except requests.RequestException as e:
-            raise DownloadError(f"Failed to download {url}: {e}")
-        except Exception as e:
-            raise DownloadError(f"Failed to save file to {destination}: {e}")
+            primary = executor.submit(self.storage.fetch, relative_path, part_path, None, cancel['primary'])
+            done, _ = wait([primary], timeout=self.retry.hedge_after)
+            if done:
+                return primary.result()
+
+            self._remove(hedge_path)
+            hedge = executor.submit(self.storage.fetch, relative_path, hedge_path, None, cancel['hedge'])
+            futures = {primary: 'primary', hedge: 'hedge'}
+
+            winner = None
+            pending = set(futures)
+            while pending and winner is None:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        winner = future
+                        break
+
+            # Stop the other request without waiting for it: a stuck request only
+            # notices at its next chunk or read timeout, and writes to a file
+            # that is replaced or removed below
+            for future, name in futures.items():
+                if future is not winner:
+                    cancel[name].set()
+        finally:
+            executor.shutdown(wait=False)
+
+        self.observer.on_hedge(dataset_type, filename, winner is hedge)
+        if winner is hedge:
+            os.replace(hedge_path, part_path)
+            return hedge.result()
+        self._remove(hedge_path)
+        return primary.result()
+
+    @classmethod
+    def _check_size(cls, path: str, filename: str, size: Optional[int]) -> None:
+        """Discard a downloaded file and raise DownloadError if it does not have the expected size."""
+        if size is None:
+            return
+        actual = os.path.getsize(path)
+        if actual != size:
+            cls._remove(path)
+            raise DownloadError(f"Downloaded {filename} has {actual} bytes, expected {size}")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Remove a file if it exists."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
-    def get_json(self, relative_path: str, is_metadata: bool = True) -> Dict[str, Any]:
+    def _load_validators(self, cache_path: str) -> Optional[Dict[str, str]]:
+        """Load the HTTP validators of a cached file, if it still exists."""
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path + VALIDATORS_SUFFIX, 'r', encoding='utf-8') as f:
+                return json.load(f) or None
+        except (OSError, ValueError):
+            return None
+
+    def _save_validators(self, cache_path: str, result: Dict[str, Any]) -> None:
+        """Store the HTTP validators of a freshly downloaded file."""
+        validators = {k: result[k] for k in ('etag', 'last_modified') if result.get(k)}
+        validators_path = cache_path + VALIDATORS_SUFFIX
+        try:
+            if validators:
+                with open(validators_path, 'w', encoding='utf-8') as f:
+                    json.dump(validators, f)
+            elif os.path.exists(validators_path):
+                os.remove(validators_path)
+        except OSError:
+            pass  # Revalidation falls back to a full download
+
+    def _renew(self, cache_path: str) -> None:
+        """Restart the TTL of an unchanged cached file, keeping its parsed copy."""
+        memo = self._json_memo.get(cache_path)
+        os.utime(cache_path)
+        if memo is not None:
+            self._json_memo[cache_path] = (self._file_key(cache_path), memo[1])
+
+    @staticmethod
+    def _file_key(path: str) -> Tuple[int, int]:
+        """Identify a version of a file by its modification time and size."""
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def get_json(
+        self,
+        relative_path: str,
+        is_metadata: bool = True,
+        dataset_type: Optional[str] = None,
+        revalidate: bool = False
+    ) -> Dict[str, Any]:
         """
         Get a JSON file, using cache if valid or downloading if needed.
 
+        Parsed files are memoized in memory until the file on disk changes, so
+        callers must not modify the returned data.
+
         Args:
             relative_path: Relative path in the GitHub repo
             is_metadata: Whether this is a metadata file (subject to TTL)
+            dataset_type: Dataset the file belongs to, for observers
+            revalidate: Revalidate the file even if its TTL has not expired (a
+                        conditional request, cheap if it is unchanged)
 
         Returns:
             Parsed JSON data
@@ -122,20 +362,51 @@ class CacheManager:
         Raises:
             DownloadError: If download fails
         """
-        cache_path = self._get_cache_path(relative_path)
-
         # Download if cache is invalid
-        if not self._is_cache_valid(cache_path, is_metadata):
-            url = f"{GITHUB_RAW_BASE_URL}/{relative_path}"
-            self._download_file(url, cache_path)
+        cache_path = self._fetch(relative_path, is_metadata, dataset_type, os.path.basename(relative_path),
+                                 revalidate=revalidate)
 
-        # Load and return JSON
+        # Load and return JSON, reusing the parsed copy if the file is unchanged
         try:
+            key = self._file_key(cache_path)
+            memo = self._json_memo.get(cache_path)
+            if memo is not None and memo[0] == key:
+                return memo[1]
+
             with open(cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
         except Exception as e:
             raise CacheError(f"Failed to read JSON from {cache_path}: {e}")
 
+        self._json_memo[cache_path] = (key, data)
+        return data
+
+    def get_data_file(self, dataset_type: str, filename: str, size: Optional[int] = None) -> str:
+        """
+        Get a data file path, downloading if not cached.
+
+        Data files (CSV chunks, delta files) are immutable and cached indefinitely.
+        Interrupted downloads are resumed. A cached file whose size differs from
+        size (the chunk was rewritten upstream) is downloaded again.
+
+        Args:
+            dataset_type: Dataset type (e.g., 'global', 'us')
+            filename: Filename relative to the dataset directory (e.g., '202510_1.csv')
+            size: Expected size in bytes from the manifest, checked after downloading
+
+        Returns:
+            Local path to the cached file
+
+        Raises:
+            DownloadError: If download fails
+        """
+        relative_path = CSV_CHUNK_PATH.format(
+            dataset_type=dataset_type,
+            filename=filename
+        )
+        # Download if not cached
+        return self._fetch(relative_path, False, dataset_type, filename, size)
+
     def get_csv_chunk(self, dataset_type: str, filename: str) -> str:
         """
         Get a CSV chunk file path, downloading if not cached.
@@ -150,18 +421,46 @@ class CacheManager:
         Raises:
             DownloadError: If download fails
         """
+        return self.get_data_file(dataset_type, filename)
+
+    def get_delta_file(self, dataset_type: str, filename: str) -> str:
+        """
+        Get a delta file path, downloading if not cached.
+
+        Args:
+            dataset_type: Dataset type (e.g., 'global', 'us')
+            filename: Delta filename from the manifest (e.g., 'deltas/202510.csv.gz')
+
+        Returns:
+            Local path to the cached delta file
+
+        Raises:
+            DownloadError: If download fails
+        """
+        return self.get_data_file(dataset_type, filename)
+
+    def is_cached(self, dataset_type: str, filename: str, size: Optional[int] = None) -> bool:
+        """
+        Check whether a data file is available in the cache without downloading it.
+
+        Args:
+            dataset_type: Dataset type (e.g., 'global', 'us')
+            filename: Filename relative to the dataset directory
+            size: Expected size in bytes from the manifest; cached copies of another size do not count
+
+        Returns:
+            True if the file is cached (or readable in place from a local storage backend)
+        """
         relative_path = CSV_CHUNK_PATH.format(
             dataset_type=dataset_type,
             filename=filename
         )
-        cache_path = self._get_cache_path(relative_path)
-
-        # Download if not cached (CSV chunks are cached indefinitely)
-        if not self._is_cache_valid(cache_path, is_metadata=False):
-            url = f"{GITHUB_RAW_BASE_URL}/{relative_path}"
-            self._download_file(url, cache_path)
-
-        return cache_path
+        try:
+            if self.storage.local_path(relative_path) is not None:
+                return True
+        except DownloadError:
+            return False
+        return self._is_cache_valid(self._get_cache_path(relative_path), is_metadata=False, size=size)
 
     def clear_cache(self) -> None:
         """
@@ -170,6 +469,7 @@ class CacheManager:
         Raises:
             CacheError: If clearing cache fails
         """
+        self._json_memo.clear()
         try:
             if os.path.exists(self.cache_dir):
                 shutil.rmtree(self.cache_dir)
@@ -177,24 +477,28 @@ class CacheManager:
         except Exception as e:
             raise CacheError(f"Failed to clear cache: {e}")
 
-    def get_datasets_metadata(self) -> Dict[str, Any]:
+    def get_datasets_metadata(self, revalidate: bool = False) -> Dict[str, Any]:
         """
         Get the datasets.json metadata.
 
+        Args:
+            revalidate: Revalidate the cached copy even if its TTL has not expired
+
         Returns:
             Parsed datasets.json data
         """
-        return self.get_json(DATASETS_JSON_PATH, is_metadata=True)
+        return self.get_json(DATASETS_JSON_PATH, is_metadata=True, revalidate=revalidate)
 
-    def get_manifest(self, dataset_type: str) -> Dict[str, Any]:
+    def get_manifest(self, dataset_type: str, revalidate: bool = False) -> Dict[str, Any]:
         """
         Get the manifest.json for a specific dataset.
 
         Args:
             dataset_type: Dataset type (e.g., 'global', 'us')
+            revalidate: Revalidate the cached copy even if its TTL has not expired
 
         Returns:
             Parsed manifest.json data
         """
         relative_path = MANIFEST_JSON_PATH.format(dataset_type=dataset_type)
-        return self.get_json(relative_path, is_metadata=True)
+        return self.get_json(relative_path, is_metadata=True, dataset_type=dataset_type, revalidate=revalidate)
@@ -0,0 +1,558 @@
+"""
+Command-line interface for crux_cache.
+
+Usage:
+    crux-cache datasets
+    crux-cache months global
+    crux-cache download global 202510 --max-rank 100000 -o top100k.csv
+    crux-cache download global --output - | head
+    crux-cache sync global us --months 202401- --bandwidth-limit 50
+    crux-cache sync --watch --interval 600
+    crux-cache sync global --watch --publish
+    crux-cache publish global --max-rank 1000000
+    crux-cache export global 202510 -o global-202510 --format parquet --partition-by rank
+    crux-cache annotate global -i urls.txt.gz -o ranked.csv --workers 4
+    crux-cache matrix 202510 --datasets global us de jp -o 202510.matrix
+    crux-cache matrix --load 202510.matrix --include de:10000 --exclude us:10000
+    crux-cache query "SELECT month, count(*) FROM crux WHERE dataset = 'global' GROUP BY month"
+    crux-cache serve --root .crux --host 0.0.0.0
+"""
+
+import os
+import csv
+import sys
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Optional, Tuple
+
+from .client import CruxCache
+from .constants import (
+    DEFAULT_ANNOTATE_MEMORY, DEFAULT_CACHE_DIR, DEFAULT_JOBS, DEFAULT_METADATA_TTL, DEFAULT_MIRROR_PORT,
+    DEFAULT_RETRY_ATTEMPTS, DEFAULT_SYNC_INTERVAL, VALID_RANK_VALUES
+)
+from .exceptions import CruxCacheError
+from .observers import CacheObserver, ProgressReporter, month_of
+from .retry import RetryPolicy
+from .sync import SyncDaemon
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class _DownloadProgress(CacheObserver):
+    """Reports finished downloads of the CLI on stderr."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self._lock = threading.Lock()
+
+    def on_download(self, dataset_type, filename, size, seconds):
+        if month_of(filename) is None:
+            return  # Metadata
+        rate = size / (1024 * 1024) / seconds if seconds else 0.0
+        with self._lock:
+            self.done += 1
+            sys.stderr.write(f"  ✓ {filename} ({size / (1024 * 1024):.1f} MB, {rate:.1f} MB/s) "
+                             f"[{self.done}/{self.total}]\n")
+
+
+def _copy_prefix(path: str, out: BinaryIO, limit: Optional[int]) -> int:
+    """
+    Copy the leading bytes of a file to a stream.
+
+    Args:
+        path: File to copy from
+        out: Binary stream to write to
+        limit: Number of bytes to copy, or None for the whole file
+
+    Returns:
+        Number of bytes copied
+    """
+    copied = 0
+    with open(path, 'rb') as f:
+        while limit is None or copied < limit:
+            size = COPY_BUFFER_SIZE if limit is None else min(COPY_BUFFER_SIZE, limit - copied)
+            data = f.read(size)
+            if not data:
+                break
+            out.write(data)
+            copied += len(data)
+    return copied
+
+
+def _copy_rows(path: str, out: BinaryIO, max_rank: int) -> bool:
+    """
+    Copy the rows of a CSV chunk up to the first row with rank > max_rank.
+
+    Used for chunks without rank offsets, whose rows within max_rank cannot
+    be located without reading them. A header row is copied as is.
+
+    Args:
+        path: CSV chunk to copy from
+        out: Binary stream to write to
+        max_rank: Highest rank to copy
+
+    Returns:
+        True if a row beyond max_rank was reached (rows are sorted by rank,
+        so no later chunk has rows within max_rank)
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            rank = line.rstrip(b'\r\n').rsplit(b',', 1)[-1]
+            if rank.isdigit() and int(rank) > max_rank:
+                return True
+            if not line.endswith(b'\n'):
+                line += b'\n'
+            out.write(line)
+    return False
+
+
+def _make_cache(args: argparse.Namespace, observers: Optional[List[CacheObserver]] = None) -> CruxCache:
+    """Create the client for the global command-line options."""
+    metadata_ttl = float('inf') if args.offline else args.metadata_ttl
+    return CruxCache(
+        cache_dir=args.cache_dir,
+        metadata_ttl=metadata_ttl,
+        source=args.source,
+        observers=observers,
+        retry=RetryPolicy(attempts=args.retries + 1, hedge_after=args.hedge_after)
+    )
+
+
+def cmd_datasets(args: argparse.Namespace) -> int:
+    """List available datasets."""
+    cache = _make_cache(args)
+    for ds in cache.list_datasets():
+        size_mb = ds.get('total_size', 0) / (1024 * 1024)
+        print(f"{ds['id']:<8} {ds.get('total_months', 0):>4} months  "
+              f"{ds.get('earliest_month', '?')}-{ds.get('latest_month', '?')}  "
+              f"{ds.get('latest_origins', 0):>12,} origins  {size_mb:>10,.1f} MB")
+    return 0
+
+
+def cmd_months(args: argparse.Namespace) -> int:
+    """List available months of a dataset."""
+    cache = _make_cache(args)
+    months = cache.cache_manager.get_manifest(args.dataset).get('months', {})
+    for month in cache.list_months(args.dataset):
+        info = months[month]
+        print(f"{month}  {info.get('origins', 0):>12,} origins  {len(info.get('chunks', [])):>3} chunks")
+    return 0
+
+
+def cmd_download(args: argparse.Namespace) -> int:
+    """Download the chunks of a month in parallel and optionally merge them."""
+    progress = _DownloadProgress(total=0)
+    cache = _make_cache(args, observers=[progress])
+    dataset = cache.get_dataset(args.dataset, month=args.month, max_rank=args.max_rank)
+    extents = dataset.chunk_extents()
+    progress.total = len(extents)
+
+    label = f" (max_rank {args.max_rank:,})" if args.max_rank else ""
+    print(f"{args.dataset} {dataset.month}: {len(extents)} of {len(dataset.chunks)} chunks{label}, "
+          f"{args.jobs} parallel downloads", file=sys.stderr)
+
+    out: Optional[BinaryIO] = None
+    part_path = None
+    if args.output == '-':
+        out = sys.stdout.buffer
+    elif args.output:
+        part_path = args.output + '.part'
+        out = open(part_path, 'wb')
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            futures = [
+                executor.submit(cache.cache_manager.get_data_file, args.dataset, info['filename'], info.get('size'))
+                for info, _ in extents
+            ]
+            try:
+                # Chunks are written in order as soon as they and all earlier chunks are available
+                for future, (info, end) in zip(futures, extents):
+                    path = future.result()
+                    if out is None:
+                        if not args.quiet:
+                            print(path)
+                        continue
+                    # Chunks without rank offsets that may extend beyond max_rank are cut row by row
+                    needs_filter = (
+                        args.max_rank is not None and end is None
+                        and (info.get('max_rank') is None or info['max_rank'] > args.max_rank)
+                    )
+                    if not needs_filter:
+                        _copy_prefix(path, out, end)
+                    elif _copy_rows(path, out, args.max_rank):
+                        for later in futures:
+                            later.cancel()
+                        break
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    except BaseException:
+        if part_path is not None:
+            out.close()
+            os.remove(part_path)
+        raise
+
+    if part_path is not None:
+        out.close()
+        os.replace(part_path, args.output)
+        print(f"✓ Wrote {args.output}", file=sys.stderr)
+    elif out is not None:
+        out.flush()
+    return 0
+
+
+def cmd_sync(args: argparse.Namespace) -> int:
+    """Prefetch months into the cache, once or whenever they change."""
+    cache = _make_cache(args, observers=[ProgressReporter()])
+    bandwidth_limit = args.bandwidth_limit * 1024 * 1024 if args.bandwidth_limit else None
+    options = {'max_rank': args.max_rank, 'max_parallel': args.jobs, 'bandwidth_limit': bandwidth_limit}
+
+    if args.watch:
+        daemon = SyncDaemon(cache, args.datasets or None, args.months, args.interval, publish=args.publish, **options)
+        print(f"Syncing {', '.join(args.datasets) or 'all datasets'} ({args.months}) "
+              f"every {args.interval:g}s (Ctrl+C to stop)", file=sys.stderr)
+        daemon.run_forever()
+        return 0
+
+    report = cache.sync(args.datasets or None, args.months, **options)
+    synced = sum(len(months) for months in report['months'].values())
+    print(f"✓ Synced {synced} months: {report['files']} files downloaded "
+          f"({report['bytes'] / (1024 * 1024):.1f} MB), {report['cached']} already cached, "
+          f"{report['seconds']:.1f}s", file=sys.stderr)
+    if args.publish:
+        for dataset_type, months in report['months'].items():
+            if months:
+                _print_published(cache.publish_month(dataset_type, months[-1], max_rank=args.max_rank))
+    return 0
+
+
+def _print_published(pointer: dict) -> None:
+    print(f"✓ Published {pointer['dataset_type']} {pointer['month']} (version {pointer['version']}): "
+          f"{pointer['path']}", file=sys.stderr)
+
+
+def cmd_publish(args: argparse.Namespace) -> int:
+    """Publish months for processes attached with CruxCache.attach_month()."""
+    cache = _make_cache(args)
+    for dataset_type in args.datasets:
+        _print_published(cache.publish_month(dataset_type, month=args.month, max_rank=args.max_rank))
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Export a month to CSV, JSON Lines or Parquet."""
+    cache = _make_cache(args)
+    dataset = cache.get_dataset(args.dataset, month=args.month, max_rank=args.max_rank)
+    rows = dataset.export(args.output, format=args.format, compression=args.compression,
+                          partition_by=args.partition_by, jobs=args.jobs)
+    print(f"✓ Exported {rows:,} rows of {args.dataset} {dataset.month} to {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_annotate(args: argparse.Namespace) -> int:
+    """Annotate a list of URLs with CrUX ranks and write them as CSV."""
+    cache = _make_cache(args)
+    urls = (line.strip() for line in sys.stdin if line.strip()) if args.input == '-' else args.input
+    annotations = cache.annotate(
+        urls, args.dataset, month=args.month, max_rank=args.max_rank,
+        memory_limit=args.memory_limit * 1024 * 1024, workers=args.workers, spill_dir=args.spill_dir
+    )
+
+    part_path = None
+    if args.output == '-':
+        out = sys.stdout
+    else:
+        part_path = args.output + '.part'
+        out = open(part_path, 'w', encoding='utf-8', newline='')
+
+    try:
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(['url', 'origin', 'rank'])
+        ranked = total = 0
+        for url, origin, rank in annotations:
+            writer.writerow([url, origin or '', '' if rank is None else rank])
+            total += 1
+            ranked += rank is not None
+    except BaseException:
+        if part_path is not None:
+            out.close()
+            os.remove(part_path)
+        raise
+
+    if part_path is not None:
+        out.close()
+        os.replace(part_path, args.output)
+    print(f"✓ Annotated {total:,} URLs, {ranked:,} ranked", file=sys.stderr)
+    return 0
+
+
+def _condition(value: str) -> Tuple[str, Optional[int]]:
+    """Parse a DATASET[:RANK] matrix condition."""
+    name, _, rank = value.partition(':')
+    if not rank:
+        return name, None
+    if not rank.isdigit() or int(rank) not in VALID_RANK_VALUES:
+        raise argparse.ArgumentTypeError(f"invalid rank in '{value}' (one of {VALID_RANK_VALUES})")
+    return name, int(rank)
+
+
+def cmd_matrix(args: argparse.Namespace) -> int:
+    """Build or load an origin × country matrix and optionally select origins from it."""
+    if args.load:
+        from .matrix import RankMatrix
+        matrix = RankMatrix.open(args.load)
+    else:
+        cache = _make_cache(args)
+        matrix = cache.load_matrix(month=args.month, dataset_types=args.datasets, max_rank=args.max_rank)
+        print(f"✓ Built {matrix.month} matrix: {len(matrix):,} origins x {len(matrix.columns)} datasets "
+              f"({', '.join(matrix.columns)}), {matrix.nbytes / (1024 * 1024):.1f} MB", file=sys.stderr)
+    if args.output:
+        matrix.save(args.output)
+        print(f"✓ Saved matrix to {args.output}", file=sys.stderr)
+
+    if not (args.include or args.exclude or args.count):
+        return 0
+    unknown = [name for name, _ in args.include + args.exclude if name not in matrix.columns]
+    if unknown:
+        print(f"✗ Not in the matrix: {', '.join(unknown)} (datasets: {', '.join(matrix.columns)})", file=sys.stderr)
+        return 1
+
+    include, exclude = dict(args.include), dict(args.exclude)
+    if args.count:
+        print(matrix.count(include, exclude))
+    else:
+        for origin in matrix.select(include, exclude):
+            sys.stdout.write(origin + '\n')
+    return 0
+
+
+def cmd_domains(args: argparse.Namespace) -> int:
+    """Print the origins of domains and their subdomains with their ranks."""
+    if args.load:
+        from .suffix import SuffixIndex
+        index = SuffixIndex.open(args.load)
+    else:
+        cache = _make_cache(args)
+        index = cache.load_suffix_index(args.dataset, month=args.month, persist=args.persist)
+
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    for suffix in args.suffixes:
+        if args.count:
+            writer.writerow([suffix, index.count(suffix, max_rank=args.max_rank)])
+        else:
+            writer.writerows(index.by_suffix(suffix, max_rank=args.max_rank))
+    return 0
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    """Run a SQL query over the crux table and write the result as CSV."""
+    cache = _make_cache(args)
+    relation = cache.query(args.sql, jobs=args.jobs)
+
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    writer.writerow(relation.columns)
+    while True:
+        rows = relation.fetchmany(10000)
+        if not rows:
+            break
+        writer.writerows(rows)
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    """Serve a cache directory to other hosts."""
+    # http.server is only imported by this command
+    from .mirror import MirrorServer
+
+    root = args.root or args.cache_dir
+    server = MirrorServer(root, host=args.host, port=args.port, verbose=args.verbose)
+    print(f"Serving {root} on http://{args.host}:{args.port} (Ctrl+C to stop)", file=sys.stderr)
+    server.serve_forever()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog='crux-cache',
+        description="Access cached Chrome User Experience Report datasets"
+    )
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--source',
+                        help='Data source: mirror URL, file:// URL or local directory (default: GitHub)')
+    parser.add_argument('--metadata-ttl', type=int, default=DEFAULT_METADATA_TTL,
+                        help=f'Metadata cache TTL in seconds (default: {DEFAULT_METADATA_TTL})')
+    parser.add_argument('--offline', action='store_true',
+                        help='Use cached metadata regardless of its age')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRY_ATTEMPTS - 1,
+                        help=f'Retries of failed downloads, with jittered exponential backoff '
+                             f'(default: {DEFAULT_RETRY_ATTEMPTS - 1})')
+    parser.add_argument('--hedge-after', type=float, metavar='SECONDS',
+                        help='Send a duplicate request for chunks still downloading after SECONDS '
+                             'and use whichever finishes first (default: off)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    datasets = subparsers.add_parser('datasets', help='List available datasets')
+    datasets.set_defaults(func=cmd_datasets)
+
+    months = subparsers.add_parser('months', help='List available months of a dataset')
+    months.add_argument('dataset', help='Dataset (e.g., global, us)')
+    months.set_defaults(func=cmd_months)
+
+    download = subparsers.add_parser(
+        'download',
+        help='Download a month in parallel, optionally merged into one CSV file'
+    )
+    download.add_argument('dataset', help='Dataset (e.g., global, us)')
+    download.add_argument('month', nargs='?', help='Month in YYYYMM format (default: latest)')
+    download.add_argument('--max-rank', type=int, choices=VALID_RANK_VALUES, metavar='RANK',
+                          help='Only download and output origins with rank <= RANK (e.g., 100000)')
+    download.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                          help=f'Parallel downloads (default: {DEFAULT_JOBS})')
+    download.add_argument('--output', '-o',
+                          help="Merge the chunks into this CSV file, or '-' for stdout "
+                               "(default: only download into the cache and print the paths)")
+    download.add_argument('--quiet', '-q', action='store_true', help='Do not print chunk paths')
+    download.set_defaults(func=cmd_download)
+
+    sync = subparsers.add_parser(
+        'sync',
+        help='Prefetch months into the cache, once or (with --watch) whenever datasets change'
+    )
+    sync.add_argument('datasets', nargs='*', metavar='DATASET', help='Datasets to sync (default: all)')
+    sync.add_argument('--months', default='latest',
+                      help="'latest' (default), 'all', YYYYMM or a range YYYYMM-YYYYMM (either end optional)")
+    sync.add_argument('--max-rank', type=int, choices=VALID_RANK_VALUES, metavar='RANK',
+                      help='Only sync the chunks holding origins with rank <= RANK')
+    sync.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                      help=f'Parallel downloads (default: {DEFAULT_JOBS})')
+    sync.add_argument('--bandwidth-limit', type=float, metavar='MB',
+                      help='Average download rate limit in MB/s (default: unlimited)')
+    sync.add_argument('--watch', action='store_true',
+                      help='Keep running and sync datasets whenever datasets.json changes')
+    sync.add_argument('--interval', type=float, default=DEFAULT_SYNC_INTERVAL,
+                      help=f'Seconds between polls with --watch (default: {DEFAULT_SYNC_INTERVAL})')
+    sync.add_argument('--publish', action='store_true',
+                      help='Publish the latest synced month of each dataset for attached processes')
+    sync.set_defaults(func=cmd_sync)
+
+    publish = subparsers.add_parser(
+        'publish',
+        help='Build the lookup table of a month once and publish it to processes sharing the cache directory'
+    )
+    publish.add_argument('datasets', nargs='+', metavar='DATASET', help='Datasets to publish')
+    publish.add_argument('--month', help='Month in YYYYMM format (default: latest)')
+    publish.add_argument('--max-rank', type=int, choices=VALID_RANK_VALUES, metavar='RANK',
+                         help='Only include origins with rank <= RANK')
+    publish.set_defaults(func=cmd_publish)
+
+    export = subparsers.add_parser('export', help='Export a month to CSV, JSON Lines or Parquet')
+    export.add_argument('dataset', help='Dataset (e.g., global, us)')
+    export.add_argument('month', nargs='?', help='Month in YYYYMM format (default: latest)')
+    export.add_argument('--output', '-o', required=True,
+                        help='Output file, or output directory with --partition-by')
+    export.add_argument('--format', '-f', choices=['csv', 'jsonl', 'parquet'], default='csv',
+                        help='Output format (default: csv)')
+    export.add_argument('--compression', '-c',
+                        help='none, gzip, bz2 or xz for csv/jsonl (default: none); '
+                             'none, snappy, gzip, zstd, brotli or lz4 for parquet (default: snappy)')
+    export.add_argument('--max-rank', type=int, choices=VALID_RANK_VALUES, metavar='RANK',
+                        help='Only export origins with rank <= RANK')
+    export.add_argument('--partition-by', choices=['rank', 'tld'],
+                        help='Write a Hive-partitioned directory (e.g. rank=1000/part-00000.parquet)')
+    export.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f'Chunks fetched and parsed in parallel (default: {DEFAULT_JOBS})')
+    export.set_defaults(func=cmd_export)
+
+    annotate = subparsers.add_parser(
+        'annotate',
+        help='Annotate a list of URLs with the CrUX rank of their origin (CSV: url,origin,rank)'
+    )
+    annotate.add_argument('dataset', help='Dataset (e.g., global, us)')
+    annotate.add_argument('month', nargs='?', help='Month in YYYYMM format (default: latest)')
+    annotate.add_argument('--input', '-i', default='-',
+                          help="File with one URL per line, optionally .gz, or '-' for stdin (default: -)")
+    annotate.add_argument('--output', '-o', default='-', help="CSV file to write, or '-' for stdout (default: -)")
+    annotate.add_argument('--max-rank', type=int, choices=VALID_RANK_VALUES, metavar='RANK',
+                          help='Only annotate origins with rank <= RANK')
+    annotate.add_argument('--memory-limit', type=int, default=DEFAULT_ANNOTATE_MEMORY // (1024 * 1024),
+                          metavar='MB',
+                          help=f'Memory for the lookup table before spilling to disk '
+                               f'(default: {DEFAULT_ANNOTATE_MEMORY // (1024 * 1024)})')
+    annotate.add_argument('--workers', type=int, default=1,
+                          help='Processes joining spilled partitions in parallel (default: 1)')
+    annotate.add_argument('--spill-dir', help='Directory for temporary partition files (default: system temp dir)')
+    annotate.set_defaults(func=cmd_annotate)
+
+    matrix = subparsers.add_parser(
+        'matrix',
+        help='Build an origin x country rank matrix of a month and select origins by their ranks'
+    )
+    matrix.add_argument('month', nargs='?', help='Month in YYYYMM format (default: latest in all datasets)')
+    matrix.add_argument('--datasets', nargs='+', metavar='DATASET', help='Datasets to include (default: all)')
+    matrix.add_argument('--max-rank', type=int, choices=VALID_RANK_VALUES, metavar='RANK',
+                        help='Only include origins with rank <= RANK')
+    matrix.add_argument('--load', metavar='FILE', help='Use a saved matrix instead of building one')
+    matrix.add_argument('--output', '-o', metavar='FILE', help='Save the matrix to FILE')
+    matrix.add_argument('--include', type=_condition, action='append', default=[], metavar='DATASET[:RANK]',
+                        help='Print origins with rank <= RANK (or any rank) in DATASET; repeatable')
+    matrix.add_argument('--exclude', type=_condition, action='append', default=[], metavar='DATASET[:RANK]',
+                        help='Skip origins with rank <= RANK (or any rank) in DATASET; repeatable')
+    matrix.add_argument('--count', action='store_true', help='Print the number of matching origins instead')
+    matrix.set_defaults(func=cmd_matrix)
+
+    domains = subparsers.add_parser(
+        'domains',
+        help='Print the origins of domains and all their subdomains with their ranks (CSV: origin,rank)'
+    )
+    domains.add_argument('dataset', help='Dataset type (e.g., global, us)')
+    domains.add_argument('suffixes', nargs='+', metavar='DOMAIN',
+                         help='Domain, e.g. example.co.uk (with subdomains) or *.example.co.uk (subdomains only)')
+    domains.add_argument('--month', help='Month in YYYYMM format (default: latest)')
+    domains.add_argument('--max-rank', type=int, choices=VALID_RANK_VALUES, metavar='RANK',
+                         help='Only print origins with rank <= RANK')
+    domains.add_argument('--persist', action='store_true',
+                         help='Keep the index in the cache directory for later runs')
+    domains.add_argument('--load', metavar='FILE', help='Use a saved index instead of building one')
+    domains.add_argument('--count', action='store_true', help='Print the number of origins per domain instead')
+    domains.set_defaults(func=cmd_domains)
+
+    query = subparsers.add_parser(
+        'query',
+        help='Run a SQL query over crux(dataset, month, origin, rank) with DuckDB and print CSV'
+    )
+    query.add_argument('sql', help='SELECT query over the crux table')
+    query.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                       help=f'Parallel downloads (default: {DEFAULT_JOBS})')
+    query.set_defaults(func=cmd_query)
+
+    serve = subparsers.add_parser('serve', help='Serve the cache directory to other hosts over HTTP')
+    serve.add_argument('--root', help='Directory containing data/ (default: --cache-dir)')
+    serve.add_argument('--host', default='127.0.0.1', help='Interface to bind to (default: 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=DEFAULT_MIRROR_PORT,
+                       help=f'Port to bind to (default: {DEFAULT_MIRROR_PORT})')
+    serve.add_argument('--verbose', action='store_true', help='Log every request')
+    serve.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """Run the command-line interface."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except CruxCacheError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Output piped into e.g. head, which exited early
+        sys.stderr.close()
+        return 0
+    except KeyboardInterrupt:
+        return 130
@@ -1,11 +1,26 @@
 """Main client for the crux_cache package."""
 
-from typing import List, Optional, Dict, Any
+import os
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Dict, Any, Tuple, Union
 
 from .cache import CacheManager
 from .dataset import CruxDataset
-from .constants import DEFAULT_CACHE_DIR, DEFAULT_METADATA_TTL, VALID_RANK_VALUES
+from .derived import ArtifactStore, MatrixBuilder, SuffixIndexBuilder, TableBuilder
+from .constants import (
+    DATA_FORMATS, DEFAULT_ANNOTATE_MEMORY, DEFAULT_CACHE_DIR, DEFAULT_JOBS, DEFAULT_METADATA_TTL,
+    DEFAULT_RESIDENT_CHECK_INTERVAL, DEFAULT_SYNC_INTERVAL, SOURCE_ENV_VAR, VALID_RANK_VALUES
+)
 from .exceptions import DatasetNotFoundError, MonthNotFoundError
+from .observers import CacheObserver, CacheStats, ObserverGroup, ProgressReporter
+from .retry import RetryPolicy
+from .storage import StorageBackend, storage_from_source
+
+if TYPE_CHECKING:
+    from .matrix import RankMatrix
+    from .suffix import SuffixIndex
+    from .sync import MonthSelection, SyncDaemon
+    from .resident import ResidentMonth
+    from .table import CruxTable
 
 
 class CruxCache:
@@ -16,19 +31,69 @@ class CruxCache:
     iterate over domain rankings.
     """
 
-    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, metadata_ttl: int = DEFAULT_METADATA_TTL):
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        metadata_ttl: int = DEFAULT_METADATA_TTL,
+        use_deltas: bool = False,
+        data_format: str = 'csv',
+        observers: Optional[List[CacheObserver]] = None,
+        progress: bool = False,
+        source: Optional[str] = None,
+        storage: Optional[StorageBackend] = None,
+        retry: Optional[RetryPolicy] = None,
+        derived_max_size: Optional[int] = None
+    ):
         """
         Initialize the CruxCache client.
 
         Args:
             cache_dir: Directory to store cached files (default: '.crux' in current directory)
             metadata_ttl: Time-to-live for metadata files in seconds (default: 86400 = 1 day)
+            use_deltas: Reconstruct uncached months from the nearest cached month or keyframe
+                        plus delta files, where the dataset provides them (default: False)
+            data_format: Chunk format to read, 'csv' or 'binary' (default: 'csv'). Chunks
+                         without a binary encoding are read from CSV.
+            observers: Observers notified of cache hits, downloads and iteration progress
+                       (e.g. SpanRecorder, OpenTelemetryObserver or a custom CacheObserver)
+            progress: Print download and iteration progress to stderr (default: False)
+            source: Where data is read from: an HTTP(S) base URL of a mirror, a file:// URL
+                    or a local directory containing data/, which is read in place without
+                    copying (default: $CRUX_CACHE_SOURCE, else GitHub)
+            storage: Storage backend to use instead of source
+            retry: Retry and hedging policy for downloads (default: 4 attempts with
+                   jittered exponential backoff, no hedging)
+            derived_max_size: Size budget in bytes of the derived artifacts (persisted
+                              tables and matrices) in the cache directory; least recently
+                              used ones are evicted beyond it (default: unlimited)
 
         Example:
             >>> cache = CruxCache()
             >>> cache = CruxCache(cache_dir='/tmp/crux', metadata_ttl=3600)
+            >>> cache = CruxCache(use_deltas=True)
+            >>> cache = CruxCache(data_format='binary')
+            >>> cache = CruxCache(progress=True)
+            >>> cache = CruxCache(source='/mnt/nfs/crux-cache')
+            >>> cache = CruxCache(source='http://mirror.internal:8080')
+            >>> cache = CruxCache(retry=RetryPolicy(attempts=6, hedge_after=20))
         """
-        self.cache_manager = CacheManager(cache_dir, metadata_ttl)
+        if data_format not in DATA_FORMATS:
+            raise ValueError(f"data_format must be one of {DATA_FORMATS}, got {data_format!r}")
+
+        # Counters per dataset month, always collected
+        self.stats = CacheStats()
+        self.observers = ObserverGroup([self.stats] + list(observers or []))
+        if progress:
+            self.observers.add(ProgressReporter())
+
+        if storage is None:
+            storage = storage_from_source(source or os.environ.get(SOURCE_ENV_VAR) or None)
+
+        self.cache_manager = CacheManager(cache_dir, metadata_ttl, observer=self.observers, storage=storage,
+                                          retry=retry)
+        self.artifacts = ArtifactStore(self.cache_manager, max_size=derived_max_size)
+        self.use_deltas = use_deltas
+        self.data_format = data_format
 
     def list_datasets(self) -> List[Dict[str, Any]]:
         """
@@ -155,9 +220,371 @@ class CruxCache:
             dataset_type=dataset_type,
             month=month,
             manifest=manifest,
-            max_rank=max_rank
+            max_rank=max_rank,
+            use_deltas=self.use_deltas,
+            data_format=self.data_format
         )
 
+    def load_month(
+        self,
+        dataset_type: str,
+        month: Optional[str] = None,
+        max_rank: Optional[int] = None,
+        index: bool = False,
+        persist: bool = False
+    ) -> 'CruxTable':
+        """
+        Load a month into a compact in-memory table.
+
+        Origins are packed into one buffer with an offsets array and ranks are
+        stored as one byte per row, which takes a fraction of the memory of a
+        dict or a list of tuples. Lookups use binary search within the rank
+        buckets, or the hash index with index=True.
+
+        Args:
+            dataset_type: Dataset type (e.g., 'global', 'us', 'de', 'jp')
+            month: Month in YYYYMM format. If None, uses the latest month.
+            max_rank: Only load origins with rank <= max_rank
+            index: Build a hash index for O(1) rank lookups
+            persist: Save the table in the cache directory and memory-map it. It is
+                     built once and reused by later calls and other processes until
+                     the month changes upstream.
+
+        Returns:
+            CruxTable of the month
+
+        Raises:
+            DatasetNotFoundError: If the dataset type does not exist
+            MonthNotFoundError: If the specified month is not available
+
+        Example:
+            >>> cache = CruxCache()
+            >>> table = cache.load_month('global', index=True)
+            >>> table.rank('https://www.google.com')
+            1000
+        """
+        from .table import CruxTable
+
+        dataset = self.get_dataset(dataset_type, month=month, max_rank=max_rank)
+        if persist:
+            return self.artifacts.get(TableBuilder(index=index), dataset)
+        return CruxTable.from_dataset(dataset, index=index)
+
+    def load_matrix(
+        self,
+        month: Optional[str] = None,
+        dataset_types: Optional[List[str]] = None,
+        max_rank: Optional[int] = None,
+        persist: bool = False
+    ) -> 'RankMatrix':
+        """
+        Load the ranks of one month in several datasets into an origin × country matrix.
+
+        Each dataset is read once; origins are dictionary-encoded and every
+        dataset becomes a column of one byte per origin.
+
+        Args:
+            month: Month in YYYYMM format. If None, uses the latest month available
+                   in all datasets.
+            dataset_types: Datasets to include (default: all datasets)
+            max_rank: Only include origins with rank <= max_rank in each dataset
+            persist: Save the matrix in the cache directory and memory-map it (see load_month)
+
+        Returns:
+            RankMatrix of the month
+
+        Raises:
+            DatasetNotFoundError: If a dataset type does not exist
+            MonthNotFoundError: If the month is not available in all datasets
+
+        Example:
+            >>> cache = CruxCache()
+            >>> matrix = cache.load_matrix('202510', ['global', 'us', 'de', 'jp'])
+            >>> top_de_only = list(matrix.select(include={'de': 10000}, exclude={'us': 10000}))
+        """
+        from .matrix import RankMatrix
+
+        if dataset_types is None:
+            dataset_types = [ds['id'] for ds in self.list_datasets()]
+
+        if month is None:
+            common = set.intersection(*(set(self.list_months(dt)) for dt in dataset_types))
+            if not common:
+                raise MonthNotFoundError(f"No month is available in all of {', '.join(dataset_types)}")
+            month = max(common)
+
+        if persist:
+            datasets = [self.get_dataset(dt, month=month, max_rank=max_rank) for dt in dataset_types]
+            return self.artifacts.get(MatrixBuilder(), datasets)
+
+        tables = {dt: self.load_month(dt, month=month, max_rank=max_rank) for dt in dataset_types}
+        return RankMatrix.from_tables(tables)
+
+    def load_suffix_index(
+        self,
+        dataset_type: str,
+        month: Optional[str] = None,
+        max_rank: Optional[int] = None,
+        persist: bool = False
+    ) -> 'SuffixIndex':
+        """
+        Load a month into an index of origins by reversed hostname.
+
+        The index answers "every origin under example.co.uk" with two binary
+        searches instead of a scan of the month.
+
+        Args:
+            dataset_type: Dataset type (e.g., 'global', 'us', 'de', 'jp')
+            month: Month in YYYYMM format. If None, uses the latest month.
+            max_rank: Only index origins with rank <= max_rank
+            persist: Save the index in the cache directory and memory-map it (see load_month)
+
+        Returns:
+            SuffixIndex of the month
+
+        Raises:
+            DatasetNotFoundError: If the dataset type does not exist
+            MonthNotFoundError: If the specified month is not available
+
+        Example:
+            >>> cache = CruxCache()
+            >>> index = cache.load_suffix_index('global', persist=True)
+            >>> list(index.by_suffix('*.example.co.uk', max_rank=100000))
+        """
+        from .suffix import SuffixIndex
+
+        if persist:
+            dataset = self.get_dataset(dataset_type, month=month, max_rank=max_rank)
+            return self.artifacts.get(SuffixIndexBuilder(), dataset)
+        return SuffixIndex.from_table(self.load_month(dataset_type, month=month, max_rank=max_rank))
+
+    def publish_month(
+        self,
+        dataset_type: str,
+        month: Optional[str] = None,
+        max_rank: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Publish a month for processes that attach to it with attach_month().
+
+        The month's indexed table is built once in the cache directory (or
+        reused if it is already there) and becomes the published version of the
+        dataset. Attached processes map the same file, so the month is held in
+        memory once however many processes use it, and they swap to a newly
+        published month within their check interval.
+
+        Args:
+            dataset_type: Dataset type (e.g., 'global', 'us', 'de', 'jp')
+            month: Month in YYYYMM format. If None, uses the latest month.
+            max_rank: Only include origins with rank <= max_rank
+
+        Returns:
+            Dictionary with 'dataset_type', 'month', 'max_rank', 'path' of the table,
+            'version' (increased whenever the published table changes) and 'published'
+
+        Raises:
+            DatasetNotFoundError: If the dataset type does not exist
+            MonthNotFoundError: If the specified month is not available
+
+        Example:
+            >>> cache = CruxCache(cache_dir='/var/cache/crux')
+            >>> cache.publish_month('global')['version']
+            1
+        """
+        from .resident import publish
+
+        return publish(self, dataset_type, month=month, max_rank=max_rank)
+
+    def attach_month(self, dataset_type: str, check_interval: float = DEFAULT_RESIDENT_CHECK_INTERVAL) -> 'ResidentMonth':
+        """
+        Attach read-only to the month published for a dataset with publish_month().
+
+        Args:
+            dataset_type: Dataset type (e.g., 'global', 'us', 'de', 'jp')
+            check_interval: Seconds between checks for a newly published version (default: 1)
+
+        Returns:
+            ResidentMonth with rank(), get(), `in`, len() and iteration over the
+            published month
+
+        Raises:
+            CacheError: On first use, if no month is published for the dataset
+
+        Example:
+            >>> resident = CruxCache(cache_dir='/var/cache/crux').attach_month('global')
+            >>> resident.rank('https://www.google.com')
+            1000
+        """
+        from .resident import ResidentMonth
+
+        return ResidentMonth(self.cache_manager.cache_dir, dataset_type, check_interval=check_interval)
+
+    def query(self, sql: str, connection=None, jobs: int = DEFAULT_JOBS):
+        """
+        Run a SQL query over all datasets and months with DuckDB.
+
+        The query reads the table crux(dataset, month, origin, rank). Constant
+        predicates on dataset, month and rank in its WHERE clauses are matched
+        against the manifests first, so only the chunks that can contain matching
+        rows are downloaded. Chunks are always read from CSV.
+
+        Requires the 'duckdb' package.
+
+        Args:
+            sql: SELECT query over the crux table
+            connection: DuckDB connection to run the query on, e.g. to join your own
+                        tables (default: a new in-memory database)
+            jobs: Parallel chunk downloads (default: 8)
+
+        Returns:
+            DuckDB relation with the result (e.g. .fetchall(), .df(), .arrow())
+
+        Raises:
+            ValueError: If the query is not a SELECT query
+
+        Example:
+            >>> cache = CruxCache()
+            >>> cache.query('''
+            ...     SELECT month, regexp_extract(origin, '\\.([^.:/]+)(:\\d+)?$', 1) AS tld, count(*) AS origins
+            ...     FROM crux
+            ...     WHERE dataset = 'global' AND month >= '202411' AND rank <= 1000000
+            ...     GROUP BY ALL ORDER BY month, origins DESC
+            ... ''').df()
+        """
+        from .query import query
+
+        return query(self.cache_manager, sql, connection=connection, jobs=jobs)
+
+    def annotate(
+        self,
+        urls: Union[str, Iterable[str]],
+        dataset_type: str,
+        month: Optional[str] = None,
+        max_rank: Optional[int] = None,
+        memory_limit: int = DEFAULT_ANNOTATE_MEMORY,
+        workers: int = 1,
+        spill_dir: Optional[str] = None
+    ) -> Iterator[Tuple[str, Optional[str], Optional[int]]]:
+        """
+        Annotate URLs with the rank of their origin, streaming.
+
+        URLs are normalized to origins (scheme://host[:port], lowercased, punycode,
+        without default ports) and joined against the month. If the month's lookup
+        table does not fit in memory_limit, both sides are partitioned to disk and
+        joined partition by partition, in parallel with workers > 1. Results are
+        produced incrementally, in input order.
+
+        Args:
+            urls: Path of a text file with one URL per line (optionally .gz), or an
+                  iterable of URLs
+            dataset_type: Dataset type (e.g., 'global', 'us', 'de', 'jp')
+            month: Month in YYYYMM format. If None, uses the latest month.
+            max_rank: Only annotate origins with rank <= max_rank (others get no rank)
+            memory_limit: Memory for the lookup table in bytes (default: 1 GiB)
+            workers: Processes joining partitions in parallel (default: 1)
+            spill_dir: Directory for temporary partition files (default: system temp dir)
+
+        Returns:
+            Iterator of (url, origin, rank) tuples. origin is None for URLs without an
+            http(s) origin, rank is None for origins not in the month.
+
+        Raises:
+            DatasetNotFoundError: If the dataset type does not exist
+            MonthNotFoundError: If the specified month is not available
+
+        Example:
+            >>> cache = CruxCache()
+            >>> for url, origin, rank in cache.annotate('urls.txt.gz', 'global', workers=4):
+            ...     print(url, rank)
+        """
+        from .annotate import annotate
+
+        dataset = self.get_dataset(dataset_type, month=month, max_rank=max_rank)
+        return annotate(dataset, urls, memory_limit=memory_limit, workers=workers, spill_dir=spill_dir)
+
+    def sync(
+        self,
+        dataset_types: Optional[List[str]] = None,
+        months: 'MonthSelection' = 'latest',
+        max_rank: Optional[int] = None,
+        max_parallel: int = DEFAULT_JOBS,
+        bandwidth_limit: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Prefetch months into the cache, so later get_dataset() calls do not download.
+
+        Downloads the CSV chunks of the selected months (plus binary encodings with
+        data_format='binary' and delta files with use_deltas=True) that are not
+        cached yet, or whose cached copy no longer matches the manifest.
+
+        Args:
+            dataset_types: Datasets to sync (default: all datasets)
+            months: 'latest', 'all', a month 'YYYYMM', a range 'YYYYMM-YYYYMM'
+                    (either end optional), or a list of months
+            max_rank: Only sync the chunks holding origins with rank <= max_rank
+            max_parallel: Parallel downloads (default: 8)
+            bandwidth_limit: Average download rate limit in bytes per second
+
+        Returns:
+            Dictionary with 'months' (dataset -> synced months), 'files' and 'bytes'
+            downloaded, 'cached' (files already cached) and 'seconds'
+
+        Raises:
+            DatasetNotFoundError: If a dataset type does not exist
+            MonthNotFoundError: If an explicitly selected month is not available
+
+        Example:
+            >>> cache = CruxCache()
+            >>> cache.sync(['global', 'us'], months='202401-', bandwidth_limit=50 * 1024 * 1024)
+        """
+        from .sync import sync
+
+        if dataset_types is None:
+            dataset_types = [ds['id'] for ds in self.list_datasets()]
+        return sync(self, dataset_types, months, max_rank=max_rank,
+                    max_parallel=max_parallel, bandwidth_limit=bandwidth_limit)
+
+    def start_sync(
+        self,
+        dataset_types: Optional[List[str]] = None,
+        months: 'MonthSelection' = 'latest',
+        interval: float = DEFAULT_SYNC_INTERVAL,
+        max_rank: Optional[int] = None,
+        max_parallel: int = DEFAULT_JOBS,
+        bandwidth_limit: Optional[float] = None,
+        publish: bool = False
+    ) -> 'SyncDaemon':
+        """
+        Keep the cache warm in a background thread.
+
+        Every interval seconds, datasets.json is revalidated with a conditional
+        request; datasets whose entry changed (a new month or rewritten chunks)
+        are synced as with sync(). Failures are reported to the observers'
+        on_sync_error and retried at the next poll.
+
+        Args:
+            dataset_types: Datasets to sync (default: all datasets, including new ones)
+            months: Months to sync per dataset, as for sync()
+            interval: Seconds between polls (default: 3600)
+            max_rank: Only sync the chunks holding origins with rank <= max_rank
+            max_parallel: Parallel downloads (default: 8)
+            bandwidth_limit: Average download rate limit in bytes per second
+            publish: Publish the latest synced month of every changed dataset, so
+                     processes attached with attach_month() swap to it
+
+        Returns:
+            The started SyncDaemon; call stop() to end it
+
+        Example:
+            >>> daemon = CruxCache().start_sync(['global'], interval=600)
+            >>> daemon.stop()
+        """
+        from .sync import SyncDaemon
+
+        daemon = SyncDaemon(self, dataset_types, months, interval, publish=publish, max_rank=max_rank,
+                            max_parallel=max_parallel, bandwidth_limit=bandwidth_limit)
+        return daemon.start()
+
     def clear_cache(self) -> None:
         """
         Clear all cached files.
@@ -173,4 +600,4 @@ class CruxCache:
 
     def __repr__(self) -> str:
         """String representation of the CruxCache instance."""
-        return f"CruxCache(cache_dir='{self.cache_manager.cache_dir}')"
+        return f"CruxCache(cache_dir='{self.cache_manager.cache_dir}', storage={self.cache_manager.storage!r})"
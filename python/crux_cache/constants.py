@@ -3,18 +3,60 @@
 # GitHub repository base URL for raw file access
 GITHUB_RAW_BASE_URL = "https://raw.githubusercontent.com/lonetis/crux-cache/main"
 
+# Environment variable overriding the data source (mirror URL, file:// URL or local directory)
+SOURCE_ENV_VAR = "CRUX_CACHE_SOURCE"
+
 # Data directory paths
 DATASETS_JSON_PATH = "data/datasets.json"
 MANIFEST_JSON_PATH = "data/{dataset_type}/manifest.json"
 CSV_CHUNK_PATH = "data/{dataset_type}/{filename}"
 
+# Directory of derived artifacts (tables, matrices) within the cache directory
+DERIVED_DIR = "derived"
+
+# Directory of the pointers to published months (CruxCache.publish_month) within the cache directory
+RESIDENT_DIR = "resident"
+
+# Seconds between checks for a newly published month by attached processes (CruxCache.attach_month)
+DEFAULT_RESIDENT_CHECK_INTERVAL = 1.0
+
 # Cache settings
 DEFAULT_CACHE_DIR = ".crux"
 DEFAULT_METADATA_TTL = 86400  # 1 day in seconds
 
+# HTTP downloads: connection timeout, and the window over which a download must reach
+# a minimum throughput before it is considered stalled and retried
+DEFAULT_CONNECT_TIMEOUT = 30
+DEFAULT_STALL_SECONDS = 10.0
+DEFAULT_MIN_THROUGHPUT = 16 * 1024  # bytes per second
+
+# Retries of failed downloads (RetryPolicy): attempts per file, and the backoff before the
+# first retry, doubled for every further retry up to the maximum (with full jitter)
+DEFAULT_RETRY_ATTEMPTS = 4
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_RETRY_MAX_BACKOFF = 30.0
+
+# Parallel chunk downloads (crux-cache download, CruxCache.query)
+DEFAULT_JOBS = 8
+
+# Seconds between polls of datasets.json by the sync daemon (crux-cache sync --watch)
+DEFAULT_SYNC_INTERVAL = 3600
+
+# Memory for the lookup table of CruxCache.annotate() before it spills to disk
+DEFAULT_ANNOTATE_MEMORY = 1024 * 1024 * 1024  # 1 GiB
+
+# Mirror server (crux-cache serve)
+DEFAULT_MIRROR_PORT = 8080
+
 # CSV format
 CSV_HEADER = ["origin", "rank"]
 
+# Read buffer of CSV chunks parsed while they are read
+CSV_READ_BUFFER = 1024 * 1024
+
+# Chunk formats CruxDataset can read
+DATA_FORMATS = ("csv", "binary")
+
 # Valid rank values (log10 scale with half steps)
 # Pattern: 1k, 5k, 10k, 50k, 100k, 500k, 1M, 5M, 10M, etc.
 VALID_RANK_VALUES = [
@@ -1,11 +1,112 @@
-"""Dataset iterator for streaming CSV data."""
+"""Dataset iterator for streaming CSV or binary chunk data."""
 
+import io
 import csv
-from typing import Iterator, Tuple, Optional, List, Dict, Any
+import time
+import random
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import IO, Iterable, Iterator, Tuple, Optional, List, Dict, Any, Sequence, Union
 
 from .cache import CacheManager
-from .constants import VALID_RANK_VALUES
+from .binfmt import BinaryChunk
+from .constants import CSV_READ_BUFFER, DATA_FORMATS, DEFAULT_JOBS, VALID_RANK_VALUES
+from .delta import apply_delta, resolve_chain
 from .exceptions import MonthNotFoundError
+from .observers import timed_batches
+
+
+class TimedReader(io.RawIOBase):
+    """
+    Unbuffered reader over the first bytes of a file that times its reads.
+
+    CSV chunks are parsed while they are read instead of being loaded whole,
+    and the time spent reading is reported apart from the time spent parsing.
+    """
+
+    def __init__(self, path: str, end: Optional[int] = None):
+        """
+        Open a file.
+
+        Args:
+            path: File to read
+            end: Byte offset to stop reading at (default: end of file)
+        """
+        super().__init__()
+        self._file = open(path, 'rb', buffering=0)
+        self._remaining = end
+        self.size = 0
+        self.seconds = 0.0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer)
+        if self._remaining is not None:
+            view = view[:self._remaining]
+        start = time.perf_counter()
+        count = self._file.readinto(view) or 0
+        self.seconds += time.perf_counter() - start
+        self.size += count
+        if self._remaining is not None:
+            self._remaining -= count
+        return count
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def open_csv_chunk(path: str, end: Optional[int] = None) -> Tuple[IO[str], TimedReader]:
+    """
+    Open a CSV chunk for streaming parsing.
+
+    Args:
+        path: Chunk file
+        end: Byte offset to stop reading at (default: end of file)
+
+    Returns:
+        Tuple of (text stream for parse_csv_chunk, the underlying TimedReader)
+    """
+    reader = TimedReader(path, end)
+    return io.TextIOWrapper(io.BufferedReader(reader, CSV_READ_BUFFER), encoding='utf-8', newline=''), reader
+
+
+def parse_csv_chunk(lines: Iterable[str], skip_header: bool, max_rank: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+    """
+    Parse the rows of a CSV chunk.
+
+    Args:
+        lines: Lines of the chunk, e.g. a text stream from open_csv_chunk()
+        skip_header: Whether the chunk starts with a header row (first chunk only)
+        max_rank: Skip rows with rank > max_rank
+
+    Yields:
+        Tuple of (origin, rank) for domains where rank <= max_rank
+    """
+    reader = csv.reader(lines)
+
+    # Skip header only for the first chunk
+    if skip_header:
+        next(reader, None)  # Skip header row
+
+    # Yield rows that match the rank filter
+    for row in reader:
+        if len(row) < 2:
+            continue  # Skip malformed rows
+
+        origin = row[0]
+        try:
+            rank = int(row[1])
+        except (ValueError, IndexError):
+            continue  # Skip rows with invalid rank
+
+        # Filter by max_rank if specified
+        if max_rank is not None and rank > max_rank:
+            continue
+
+        yield (origin, rank)
 
 
 class CruxDataset:
@@ -17,7 +118,9 @@ class CruxDataset:
         dataset_type: str,
         month: str,
         manifest: Dict[str, Any],
-        max_rank: Optional[int] = None
+        max_rank: Optional[int] = None,
+        use_deltas: bool = False,
+        data_format: str = 'csv'
     ):
         """
         Initialize the dataset iterator.
@@ -29,12 +132,18 @@ class CruxDataset:
             manifest: Manifest data for the dataset
             max_rank: Optional maximum rank value to filter by (e.g., 1000 for top 1k).
                       Must be one of: 1000, 5000, 10000, 50000, 100000, 500000, 1000000, etc.
+            use_deltas: If True and the month is not cached, reconstruct it from the nearest
+                        cached month or keyframe plus delta files instead of downloading it
+            data_format: Chunk format to read, 'csv' or 'binary'. Chunks without a binary
+                         encoding are always read from CSV.
         """
         self.cache_manager = cache_manager
         self.dataset_type = dataset_type
         self.month = month
         self.manifest = manifest
         self.max_rank = max_rank
+        self.use_deltas = use_deltas
+        self.data_format = data_format
 
         # Validate max_rank if specified
         if max_rank is not None and max_rank not in VALID_RANK_VALUES:
@@ -42,6 +151,9 @@ class CruxDataset:
                 f"max_rank must be one of {VALID_RANK_VALUES}, got {max_rank}"
             )
 
+        if data_format not in DATA_FORMATS:
+            raise ValueError(f"data_format must be one of {DATA_FORMATS}, got {data_format!r}")
+
         # Validate month exists in manifest
         if month not in manifest.get('months', {}):
             available_months = sorted(manifest.get('months', {}).keys())
@@ -55,6 +167,64 @@ class CruxDataset:
         self.chunks: List[Dict[str, Any]] = self.month_data.get('chunks', [])
         self.total_origins = self.month_data.get('origins', 0)
 
+        # Rank histogram ({rank: count}), only present in newer manifests
+        self.rank_counts: Optional[Dict[str, int]] = self.month_data.get('ranks')
+
+        # First row of each chunk within the month (older manifests only have row counts)
+        self._chunk_starts: List[int] = []
+        self._chunk_ends: List[int] = []
+        row = 0
+        for chunk_info in self.chunks:
+            row = chunk_info.get('start_row', row)
+            self._chunk_starts.append(row)
+            row = chunk_info.get('end_row', row + chunk_info.get('origins', 0))
+            self._chunk_ends.append(row)
+
+    def _planned_chunks(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Select the chunks that can contain rows matching max_rank.
+
+        Chunks are sorted by rank, so once a chunk's minimum rank exceeds
+        max_rank no later chunk can match. Chunks without statistics are
+        always read.
+
+        Yields:
+            Tuple of (chunk index, chunk info)
+        """
+        for chunk_idx, chunk_info in enumerate(self.chunks):
+            min_rank = chunk_info.get('min_rank')
+            if self.max_rank is not None and min_rank is not None and min_rank > self.max_rank:
+                break
+            yield chunk_idx, chunk_info
+
+    def chunk_extents(self) -> List[Tuple[Dict[str, Any], Optional[int]]]:
+        """
+        Get the CSV chunks needed for max_rank and how much of each to read.
+
+        Rows are sorted by rank and the manifest records the byte offset of each
+        rank bucket within a chunk, so the rows within max_rank are a prefix of
+        the chunk that can be copied without parsing.
+
+        Returns:
+            List of (chunk info, number of leading bytes to read or None for the whole chunk)
+        """
+        return [(chunk_info, self._prefix_end(chunk_info)) for _, chunk_info in self._planned_chunks()]
+
+    def _prefix_end(self, chunk_info: Dict[str, Any]) -> Optional[int]:
+        """Get the byte offset after the last row within max_rank, or None for the whole chunk."""
+        if self.max_rank is None:
+            return None
+        offsets = chunk_info.get('rank_offsets') or {}
+        later = [offset for rank, offset in offsets.items() if int(rank) > self.max_rank]
+        return min(later) if later else None
+
+    def _is_month_cached(self, month: str) -> bool:
+        """Check whether all chunks of a month are in the local cache."""
+        chunks = self.manifest['months'].get(month, {}).get('chunks', [])
+        return bool(chunks) and all(
+            self.cache_manager.is_cached(self.dataset_type, c['filename'], c.get('size')) for c in chunks
+        )
+
     def __iter__(self) -> Iterator[Tuple[str, int]]:
         """
         Iterate over the dataset rows, filtering by max_rank if specified.
@@ -62,47 +232,417 @@ class CruxDataset:
         Yields:
             Tuple of (origin, rank) for domains where rank <= max_rank
         """
-        for chunk_idx, chunk_info in enumerate(self.chunks):
-            # Download chunk file
-            filename = chunk_info['filename']
-            csv_path = self.cache_manager.get_csv_chunk(self.dataset_type, filename)
+        observer = self.cache_manager.observer
+        observer.on_iteration_start(self.dataset_type, self.month, sum(1 for _ in self._planned_chunks()))
 
-            # Read and yield rows
-            with open(csv_path, 'r', encoding='utf-8', newline='') as f:
-                reader = csv.reader(f)
+        start = time.perf_counter()
+        rows = 0
+        try:
+            for batch in self._iter_batches():
+                rows += len(batch)
+                yield from batch
+        finally:
+            observer.on_iteration_end(self.dataset_type, self.month, rows, time.perf_counter() - start)
 
-                # Skip header only for the first chunk
-                if chunk_idx == 0:
-                    next(reader, None)  # Skip header row
+    def _iter_batches(self) -> Iterator[List[Tuple[str, int]]]:
+        """
+        Stream the month in batches of rows.
 
-                # Yield rows that match the rank filter
-                for row in reader:
-                    if len(row) < 2:
-                        continue  # Skip malformed rows
+        Yields:
+            Lists of (origin, rank) tuples for domains where rank <= max_rank
+        """
+        if self.use_deltas:
+            base_month, delta_months = resolve_chain(self.manifest, self.month, self._is_month_cached)
+            if delta_months:
+                yield from self._iter_reconstructed(base_month, delta_months)
+                return
 
-                    origin = row[0]
-                    try:
-                        rank = int(row[1])
-                    except (ValueError, IndexError):
-                        continue  # Skip rows with invalid rank
+        yield from self._iter_chunks()
 
-                    # Filter by max_rank if specified
-                    if self.max_rank is not None and rank > self.max_rank:
-                        continue
+    def _iter_reconstructed(self, base_month: str, delta_months: List[str]) -> Iterator[List[Tuple[str, int]]]:
+        """
+        Stream the month by applying deltas to a base month.
+
+        Args:
+            base_month: Cached month or keyframe to start from
+            delta_months: Months whose deltas are applied in order
+
+        Yields:
+            Lists of (origin, rank) tuples for domains where rank <= max_rank
+        """
+        base = CruxDataset(
+            cache_manager=self.cache_manager,
+            dataset_type=self.dataset_type,
+            month=base_month,
+            manifest=self.manifest,
+            max_rank=self.max_rank,
+            data_format=self.data_format
+        )
+
+        rows: Iterator[Tuple[str, int]] = chain.from_iterable(base._iter_batches())
+        for month in delta_months:
+            delta_info = self.manifest['months'][month]['delta']
+            delta_path = self.cache_manager.get_delta_file(self.dataset_type, delta_info['filename'])
+            rows = apply_delta(rows, delta_path, self.max_rank)
+
+        yield from self._observe_batches(rows)
+
+    def _observe_batches(self, rows: Iterator[Tuple[str, int]]) -> Iterator[List[Tuple[str, int]]]:
+        """Batch rows and report the time spent producing them as parse time."""
+        observer = self.cache_manager.observer
+        for batch, seconds in timed_batches(rows):
+            observer.on_rows_parsed(self.dataset_type, self.month, len(batch), seconds)
+            yield batch
+
+    def _read_chunk(
+        self,
+        filename: str,
+        size: Optional[int] = None,
+        offset: int = 0,
+        end: Optional[int] = None
+    ) -> bytes:
+        """
+        Read a (downloaded if needed) chunk file and report the disk read.
+
+        Args:
+            filename: Chunk filename
+            size: Expected file size from the manifest
+            offset: Byte offset to start reading at
+            end: Byte offset to stop reading at (default: end of file)
 
-                    yield (origin, rank)
+        Returns:
+            Contents of the file between offset and end
+        """
+        path = self.cache_manager.get_data_file(self.dataset_type, filename, size)
+
+        observer = self.cache_manager.observer
+        with observer.span('crux.read_chunk', dataset=self.dataset_type, filename=filename):
+            start = time.perf_counter()
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(-1 if end is None else end - offset)
+            observer.on_chunk_read(self.dataset_type, self.month, filename, len(data), time.perf_counter() - start)
+        return data
+
+    def _iter_chunks(self) -> Iterator[List[Tuple[str, int]]]:
+        """
+        Stream the month from its chunks.
+
+        Yields:
+            Lists of (origin, rank) tuples for domains where rank <= max_rank
+        """
+        for chunk_idx, chunk_info in self._planned_chunks():
+            if self.data_format == 'binary' and 'binary' in chunk_info:
+                yield from self._iter_binary_chunk(chunk_info)
+                continue
+
+            # Rows beyond max_rank are not read at all when the chunk has rank offsets
+            yield from self._iter_csv_chunk(chunk_info, self._prefix_end(chunk_info), skip_header=chunk_idx == 0)
+
+    def _iter_csv_chunk(
+        self,
+        chunk_info: Dict[str, Any],
+        end: Optional[int],
+        skip_header: bool
+    ) -> Iterator[List[Tuple[str, int]]]:
+        """
+        Stream one CSV chunk, parsing it while it is read.
+
+        Args:
+            chunk_info: Chunk entry from the manifest
+            end: Byte offset to stop reading at (default: end of file)
+            skip_header: Whether the chunk starts with a header row
+
+        Yields:
+            Lists of (origin, rank) tuples for domains where rank <= max_rank
+        """
+        filename = chunk_info['filename']
+        path = self.cache_manager.get_data_file(self.dataset_type, filename, chunk_info.get('size'))
+
+        observer = self.cache_manager.observer
+        stream, reader = open_csv_chunk(path, end)
+        read_seconds = 0.0
+        try:
+            for batch, seconds in timed_batches(parse_csv_chunk(stream, skip_header, self.max_rank)):
+                # Reads happen while a batch is parsed; report them as disk time only
+                observer.on_rows_parsed(self.dataset_type, self.month, len(batch),
+                                        seconds - (reader.seconds - read_seconds))
+                read_seconds = reader.seconds
+                yield batch
+        finally:
+            stream.close()
+            observer.on_chunk_read(self.dataset_type, self.month, filename, reader.size, reader.seconds)
+
+    def _iter_binary_chunk(self, chunk_info: Dict[str, Any]) -> Iterator[List[Tuple[str, int]]]:
+        """
+        Stream one chunk from its binary encoding.
+
+        Rows are sorted by rank, so only the leading rows within max_rank are decoded.
+
+        Args:
+            chunk_info: Chunk entry from the manifest
+
+        Yields:
+            Lists of (origin, rank) tuples for domains where rank <= max_rank
+        """
+        data = self._read_chunk(chunk_info['binary']['filename'], chunk_info['binary'].get('size'))
+        chunk = BinaryChunk(chunk_info['binary']['filename'], data=data)
+        yield from self._observe_batches(chunk.iter_rows(0, chunk.count_up_to(self.max_rank)))
+
+    def _count_up_to(self, max_rank: Optional[int]) -> int:
+        """Count the origins with rank <= max_rank using the rank histogram."""
+        if max_rank is None or self.rank_counts is None:
+            return self.total_origins
+
+        return sum(
+            count for rank, count in self.rank_counts.items()
+            if int(rank) <= max_rank
+        )
 
     def __len__(self) -> int:
         """
-        Get the total number of origins in this dataset.
+        Get the number of origins in this dataset.
 
-        Note: When max_rank is specified, this returns the total origins in the dataset,
-        not the filtered count (which can only be determined by iterating).
+        When max_rank is specified, the filtered count is taken from the rank
+        histogram in the manifest. Older manifests without a histogram fall back
+        to the total number of origins in the dataset.
 
         Returns:
-            Total number of origins in the dataset
+            Number of origins with rank <= max_rank (or all origins)
+        """
+        return self._count_up_to(self.max_rank)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Tuple[str, int], List[Tuple[str, int]]]:
+        """
+        Get rows by position, in iteration order (by rank, then origin).
+
+        Rows within max_rank are a prefix of the month, so row i of a filtered
+        dataset is row i of the month. Only the chunks containing the rows are
+        downloaded and read: binary chunks decode just the blocks holding them,
+        CSV chunks are read from the byte offset of the rank bucket containing
+        the first row. Rows are always read from the month's own chunks, also
+        with use_deltas.
+
+        Args:
+            key: Row index (negative indices count from the end) or slice
+
+        Returns:
+            Tuple of (origin, rank), or a list of them for a slice
+
+        Raises:
+            IndexError: If the index is out of range
+        """
+        rows = range(len(self))[key]
+        if isinstance(rows, int):
+            return self._rows_at([rows])[0]
+
+        if rows.step < 0:
+            return self._rows_at(rows[::-1])[::-1]
+        return self._rows_at(rows)
+
+    def sample(self, n: int, seed: Optional[int] = None, max_rank: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Draw a uniform random sample of rows without replacement.
+
+        Row positions are drawn from the rank histogram and only the chunks
+        containing sampled rows are read (see __getitem__), so sampling the long
+        tail does not require iterating the whole month. Sampling works best with
+        data_format='binary', which decodes only the blocks holding sampled rows.
+
+        Args:
+            n: Number of rows to draw
+            seed: Seed for the random number generator, for reproducible samples
+            max_rank: Only sample rows with rank <= max_rank (default: the dataset's
+                      max_rank). Must be one of VALID_RANK_VALUES.
+
+        Returns:
+            List of (origin, rank) tuples in iteration order
+
+        Raises:
+            ValueError: If max_rank is invalid or n is larger than the number of rows
+        """
+        if max_rank is not None and max_rank not in VALID_RANK_VALUES:
+            raise ValueError(f"max_rank must be one of {VALID_RANK_VALUES}, got {max_rank}")
+
+        population = len(self)
+        if max_rank is not None:
+            population = min(population, self._count_up_to(max_rank))
+
+        return self._rows_at(sorted(random.Random(seed).sample(range(population), n)))
+
+    def _rows_at(self, indices: Sequence[int]) -> List[Tuple[str, int]]:
+        """
+        Read rows of the month by position.
+
+        Args:
+            indices: Ascending row indices within the month
+
+        Returns:
+            List of (origin, rank) tuples, in the order of indices
+        """
+        rows: List[Tuple[str, int]] = []
+        i = 0
+        while i < len(indices):
+            chunk_idx = bisect_right(self._chunk_starts, indices[i]) - 1
+            if chunk_idx < 0 or indices[i] >= self._chunk_ends[chunk_idx]:
+                raise IndexError(f"row {indices[i]} is not in any chunk of {self.dataset_type} {self.month}")
+
+            j = bisect_left(indices, self._chunk_ends[chunk_idx], i)
+            chunk_start = self._chunk_starts[chunk_idx]
+            rows.extend(self._chunk_rows(chunk_idx, [index - chunk_start for index in indices[i:j]]))
+            i = j
+        return rows
+
+    def _chunk_rows(self, chunk_idx: int, indices: List[int]) -> List[Tuple[str, int]]:
         """
-        return self.total_origins
+        Read rows of one chunk by position.
+
+        Args:
+            chunk_idx: Index of the chunk in the month
+            indices: Ascending row indices within the chunk
+
+        Returns:
+            List of (origin, rank) tuples, in the order of indices
+        """
+        chunk_info = self.chunks[chunk_idx]
+
+        if self.data_format == 'binary' and 'binary' in chunk_info:
+            data = self._read_chunk(chunk_info['binary']['filename'], chunk_info['binary'].get('size'))
+            chunk = BinaryChunk(chunk_info['binary']['filename'], data=data)
+            rows = []
+            block_idx = None
+            origins: List[str] = []
+            for index in indices:
+                if index // chunk.block_size != block_idx:
+                    block_idx = index // chunk.block_size
+                    origins = chunk.block(block_idx)
+                rows.append((origins[index % chunk.block_size], chunk.rank_at(index)))
+            return rows
+
+        offset, first_row, end = self._byte_range(chunk_info, indices[0], indices[-1] + 1)
+        data = self._read_chunk(chunk_info['filename'], chunk_info.get('size'), offset, end)
+        if offset == 0 and chunk_idx == 0:
+            data = data[data.find(b'\n') + 1:]  # Header
+
+        lines = data.split(b'\n', indices[-1] - first_row + 1)
+        selected = [lines[index - first_row].decode('utf-8') for index in indices]
+        return list(parse_csv_chunk(selected, skip_header=False, max_rank=self.max_rank))
+
+    @staticmethod
+    def _byte_range(chunk_info: Dict[str, Any], start: int, stop: int) -> Tuple[int, int, Optional[int]]:
+        """
+        Locate the bytes of a CSV chunk holding a range of rows.
+
+        Each rank bucket of a chunk is a contiguous run of lines whose byte offset
+        is recorded in the manifest, so the range starts at the bucket containing
+        the first row and ends at the first bucket after the last row.
+
+        Args:
+            chunk_info: Chunk entry from the manifest
+            start: First row index within the chunk
+            stop: Row index to stop before
+
+        Returns:
+            Tuple of (byte offset, row index at that offset, end offset or None for
+            the end of the file). Chunks without rank offsets are read from the start
+            of the file, including the header of the first chunk.
+        """
+        offsets = chunk_info.get('rank_offsets')
+        counts = chunk_info.get('ranks')
+        if not offsets or not counts:
+            return 0, 0, None
+
+        offset, first_row = 0, 0
+        row = 0
+        for rank in sorted(offsets, key=int):
+            if row >= stop:
+                return offset, first_row, offsets[rank]
+            if row <= start:
+                offset, first_row = offsets[rank], row
+            row += counts.get(rank, 0)
+        return offset, first_row, None
+
+    def export(
+        self,
+        path: str,
+        format: str = 'csv',
+        compression: Optional[str] = None,
+        max_rank: Optional[int] = None,
+        partition_by: Optional[str] = None,
+        jobs: int = DEFAULT_JOBS
+    ) -> int:
+        """
+        Export the month to a CSV, JSON Lines or Parquet file.
+
+        Chunks are fetched and parsed by `jobs` threads ahead of the writer, so
+        downloading, parsing and encoding overlap. Parquet export requires the
+        'pyarrow' package. The CSV chunks are always read.
+
+        Args:
+            path: Output file, or output directory if partitioned
+            format: 'csv', 'jsonl' or 'parquet'
+            compression: 'none', 'gzip', 'bz2' or 'xz' for CSV and JSON Lines (default:
+                         'none'); 'none', 'snappy', 'gzip', 'zstd', 'brotli' or 'lz4' for
+                         Parquet (default: 'snappy')
+            max_rank: Only export rows with rank <= max_rank (default: the dataset's max_rank)
+            partition_by: Write a directory partitioned by 'rank' or 'tld' in the Hive
+                          layout (e.g. rank=1000/part-00000.parquet), with the partition
+                          column only in the directory names
+            jobs: Chunks fetched and parsed in parallel (default: 8)
+
+        Returns:
+            Number of rows exported
+
+        Raises:
+            ValueError: If format, compression, max_rank or partition_by is invalid
+            FileExistsError: If the output directory of a partitioned export exists
+
+        Example:
+            >>> dataset = cache.get_dataset('global', month='202510')
+            >>> dataset.export('global-202510', format='parquet', partition_by='rank')
+            >>> dataset.export('top1m.csv.gz', compression='gzip', max_rank=1000000)
+        """
+        from .export import export_dataset
+
+        dataset = self
+        if max_rank is not None and max_rank != self.max_rank:
+            dataset = CruxDataset(
+                cache_manager=self.cache_manager,
+                dataset_type=self.dataset_type,
+                month=self.month,
+                manifest=self.manifest,
+                max_rank=max_rank,
+                data_format=self.data_format
+            )
+        return export_dataset(dataset, path, format=format, compression=compression,
+                              partition_by=partition_by, jobs=jobs)
+
+    def scan(self, reducers: Union[Dict[str, Any], Sequence[Any]], workers: int = 1) -> Union[Dict[str, Any], List[Any]]:
+        """
+        Compute several aggregations in a single pass over the month.
+
+        Every batch of rows is fed to all reducers, so the month is parsed once
+        however many results are computed. With workers > 1 and only mergeable
+        reducers (Count, CountBy, Collect), chunks are parsed in worker processes.
+
+        Args:
+            reducers: Reducers by name (see crux_cache.scan), or a list of reducers
+            workers: Processes parsing chunks in parallel (default: 1)
+
+        Returns:
+            Results of the reducers, by name or in list order
+
+        Example:
+            >>> from crux_cache import Count, CountBy, Collect
+            >>> results = dataset.scan({
+            ...     'total': Count(),
+            ...     'per_tld': CountBy('tld'),
+            ...     'top_100': Collect(limit=100),
+            ... }, workers=4)
+        """
+        from .scan import scan
+
+        return scan(self, reducers, workers=workers)
 
     def __repr__(self) -> str:
         """String representation of the dataset."""
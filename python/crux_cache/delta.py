@@ -0,0 +1,109 @@
+"""Reconstruction of months from a keyframe plus delta files."""
+
+import csv
+import gzip
+import heapq
+import io
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def _sort_key(row: Tuple[str, int]) -> Tuple[int, str]:
+    """Sort key matching the order of the source data (rank, then origin)."""
+    return (row[1], row[0])
+
+
+def resolve_chain(
+    manifest: Dict[str, Any],
+    month: str,
+    is_month_cached: Callable[[str], bool]
+) -> Tuple[str, List[str]]:
+    """
+    Find the month to start from and the deltas needed to reach a month.
+
+    The chain is walked backwards until a month that is already cached or a
+    keyframe (a month without delta) is reached.
+
+    Args:
+        manifest: Manifest data for the dataset
+        month: Month to reconstruct (YYYYMM)
+        is_month_cached: Callback returning True if all chunks of a month are cached
+
+    Returns:
+        Tuple of (base month, months whose deltas are applied in order)
+    """
+    months = manifest.get('months', {})
+    chain: List[str] = []
+    current = month
+
+    while len(chain) < len(months):
+        delta = months.get(current, {}).get('delta')
+        if is_month_cached(current) or not delta or delta.get('base') not in months:
+            break
+        chain.append(current)
+        current = delta['base']
+
+    chain.reverse()
+    return current, chain
+
+
+def read_delta(
+    path: str,
+    max_rank: Optional[int] = None
+) -> Tuple[Set[str], List[Tuple[str, int]]]:
+    """
+    Read a delta file.
+
+    Args:
+        path: Path to a gzip-compressed delta CSV
+        max_rank: Optional maximum rank; inserted rows above it are dropped
+
+    Returns:
+        Tuple of (origins to drop from the base month, rows to insert sorted by rank)
+    """
+    drop: Set[str] = set()
+    inserts: List[Tuple[str, int]] = []
+
+    with gzip.open(path, 'rb') as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+        next(reader, None)  # Skip header row
+
+        for row in reader:
+            if len(row) < 3:
+                continue  # Skip malformed rows
+
+            op, origin = row[0], row[1]
+            drop.add(origin)
+            if op == '-':
+                continue
+
+            try:
+                rank = int(row[2])
+            except ValueError:
+                continue  # Skip rows with invalid rank
+
+            if max_rank is None or rank <= max_rank:
+                inserts.append((origin, rank))
+
+    inserts.sort(key=_sort_key)
+    return drop, inserts
+
+
+def apply_delta(
+    rows: Iterable[Tuple[str, int]],
+    path: str,
+    max_rank: Optional[int] = None
+) -> Iterator[Tuple[str, int]]:
+    """
+    Apply a delta to a stream of rows of the base month.
+
+    Args:
+        rows: (origin, rank) rows of the base month, sorted by rank then origin
+        path: Path to the delta file
+        max_rank: Optional maximum rank the base rows were filtered by
+
+    Returns:
+        Iterator over (origin, rank) rows of the resulting month in the same order
+    """
+    drop, inserts = read_delta(path, max_rank)
+    kept = (row for row in rows if row[0] not in drop)
+    return heapq.merge(kept, inserts, key=_sort_key)
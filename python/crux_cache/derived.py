@@ -0,0 +1,381 @@
+"""
+Derived artifacts built from cached dataset months.
+
+Structures computed from the chunks of a month (compact tables, rank
+matrices, custom indexes) are saved below derived/ in the cache directory,
+so each one is built once and then reused by every process sharing the
+cache. An artifact is keyed by a hash of its builder (name, version and
+parameters) and of the identity of the source chunks in the manifest
+(filename, size, row range, first and last origin, and the part of the
+chunk read for max_rank). When a month is rewritten upstream its manifest
+changes, so the key changes and the artifact is rebuilt; the stale file, built
+by the same builder with the same parameters from the old chunks, is removed.
+Builds are serialized across processes with a file lock per artifact, and
+least recently used artifacts are evicted when the derived/ directory
+exceeds its size budget.
+"""
+
+import os
+import json
+import hashlib
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from .constants import DERIVED_DIR
+from .dataset import CruxDataset
+from .exceptions import CacheError
+from .locks import FileLock
+
+if TYPE_CHECKING:
+    from .cache import CacheManager
+
+# Fields of a manifest chunk entry that identify its content ('sha256' where the manifest lists one)
+CHUNK_IDENTITY_FIELDS = ('filename', 'size', 'sha256', 'origins', 'start_row', 'end_row',
+                         'first_origin', 'last_origin')
+
+# Hex digits of the key in artifact filenames
+KEY_LENGTH = 16
+
+# Hex digits of the builder identity (name, version and parameters) in artifact filenames
+BUILDER_ID_LENGTH = 8
+
+LOCK_SUFFIX = ".lock"
+PART_SUFFIX = ".part"
+
+
+class ArtifactBuilder(ABC):
+    """
+    Builds one kind of derived artifact from dataset months.
+
+    Subclasses set name (the directory below derived/), suffix and version,
+    and implement build() and load(). Increase version whenever the output
+    of build() changes, so artifacts built by older code are rebuilt.
+    """
+
+    name = ''
+    suffix = ''
+    version = 1
+
+    def params(self) -> Dict[str, Any]:
+        """Parameters that change the artifact (part of its key)."""
+        return {}
+
+    @abstractmethod
+    def build(self, datasets: List[CruxDataset], path: str) -> None:
+        """
+        Build the artifact from the datasets and write it to path.
+
+        Args:
+            datasets: Source dataset months
+            path: File to write
+        """
+
+    def load(self, path: str) -> Any:
+        """Load a built artifact (default: return its path)."""
+        return path
+
+    def __repr__(self) -> str:
+        params = ', '.join(f'{key}={value!r}' for key, value in self.params().items())
+        return f"{type(self).__name__}({params})"
+
+
+class TableBuilder(ArtifactBuilder):
+    """Builds the CruxTable of a month; loads it memory-mapped."""
+
+    name = 'table'
+    suffix = '.crtbl'
+    version = 1
+
+    def __init__(self, index: bool = False):
+        self.index = index
+
+    def params(self):
+        return {'index': self.index}
+
+    def build(self, datasets, path):
+        from .table import CruxTable
+
+        dataset, = datasets
+        CruxTable.from_dataset(dataset, index=self.index).save(path)
+
+    def load(self, path):
+        from .table import CruxTable
+
+        return CruxTable.open(path)
+
+
+class MatrixBuilder(ArtifactBuilder):
+    """Builds the RankMatrix of the same month in several datasets; loads it memory-mapped."""
+
+    name = 'matrix'
+    suffix = '.crmtx'
+    version = 1
+
+    def build(self, datasets, path):
+        from .matrix import RankMatrix
+        from .table import CruxTable
+
+        tables = {dataset.dataset_type: CruxTable.from_dataset(dataset) for dataset in datasets}
+        RankMatrix.from_tables(tables).save(path)
+
+    def load(self, path):
+        from .matrix import RankMatrix
+
+        return RankMatrix.open(path)
+
+
+class SuffixIndexBuilder(ArtifactBuilder):
+    """Builds the SuffixIndex of a month; loads it memory-mapped."""
+
+    name = 'suffix'
+    suffix = '.crsfx'
+    version = 1
+
+    def build(self, datasets, path):
+        from .suffix import SuffixIndex
+        from .table import CruxTable
+
+        dataset, = datasets
+        SuffixIndex.from_table(CruxTable.from_dataset(dataset)).save(path)
+
+    def load(self, path):
+        from .suffix import SuffixIndex
+
+        return SuffixIndex.open(path)
+
+
+class ArtifactStore:
+    """
+    Builds derived artifacts once and keeps them in the cache directory.
+
+    Example:
+        >>> store = cache.artifacts
+        >>> table = store.get(TableBuilder(index=True), cache.get_dataset('global'))
+        >>> # Later calls, in this or another process, map the saved table
+        >>> table = store.get(TableBuilder(index=True), cache.get_dataset('global'))
+    """
+
+    def __init__(self, cache_manager: 'CacheManager', max_size: Optional[int] = None):
+        """
+        Initialize the store.
+
+        Args:
+            cache_manager: Cache whose directory holds the artifacts
+            max_size: Size budget of the derived/ directory in bytes; least recently
+                      used artifacts are evicted when it is exceeded (None: unlimited)
+        """
+        self.cache_manager = cache_manager
+        self.max_size = max_size
+
+    @property
+    def root(self) -> str:
+        return os.path.join(self.cache_manager.cache_dir, DERIVED_DIR)
+
+    @staticmethod
+    def _datasets(datasets: Union[CruxDataset, Sequence[CruxDataset]]) -> List[CruxDataset]:
+        if isinstance(datasets, CruxDataset):
+            return [datasets]
+        if not datasets:
+            raise ValueError("At least one dataset is required")
+        return list(datasets)
+
+    def key(self, builder: ArtifactBuilder, datasets: Union[CruxDataset, Sequence[CruxDataset]]) -> str:
+        """
+        Get the key of an artifact.
+
+        Args:
+            builder: Builder of the artifact
+            datasets: Source dataset month(s)
+
+        Returns:
+            Hex digest identifying the builder and the source chunks
+        """
+        identity = {
+            'builder': builder.name,
+            'version': builder.version,
+            'params': builder.params(),
+            'datasets': [
+                {
+                    'dataset': dataset.dataset_type,
+                    'month': dataset.month,
+                    'max_rank': dataset.max_rank,
+                    'chunks': [
+                        [{field: chunk_info.get(field) for field in CHUNK_IDENTITY_FIELDS}, extent]
+                        for chunk_info, extent in dataset.chunk_extents()
+                    ],
+                }
+                for dataset in self._datasets(datasets)
+            ],
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def builder_id(builder: ArtifactBuilder) -> str:
+        """Hex digest identifying a builder's name, version and parameters (part of artifact filenames)."""
+        identity = {'builder': builder.name, 'version': builder.version, 'params': builder.params()}
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _label(cls, datasets: Iterable[CruxDataset]) -> str:
+        """Readable part of artifact filenames, e.g. 'global-202510' or 'global-202510-top10000+us-202510'."""
+        return '+'.join(
+            f"{dataset.dataset_type}-{dataset.month}" + (f"-top{dataset.max_rank}" if dataset.max_rank else '')
+            for dataset in datasets
+        )
+
+    def _prefix(self, builder: ArtifactBuilder, datasets: List[CruxDataset]) -> str:
+        """Start of the filenames of every build of a builder from the same months, e.g. 'global-202510.1a2b3c4d.'"""
+        return f"{self._label(datasets)}.{self.builder_id(builder)[:BUILDER_ID_LENGTH]}."
+
+    def path(self, builder: ArtifactBuilder, datasets: Union[CruxDataset, Sequence[CruxDataset]]) -> str:
+        """Get the path an artifact is stored at (whether or not it is built)."""
+        datasets = self._datasets(datasets)
+        filename = f"{self._prefix(builder, datasets)}{self.key(builder, datasets)[:KEY_LENGTH]}{builder.suffix}"
+        return os.path.join(self.root, builder.name, filename)
+
+    def get(self, builder: ArtifactBuilder, datasets: Union[CruxDataset, Sequence[CruxDataset]]) -> Any:
+        """
+        Get an artifact, building it if it is not in the cache.
+
+        Concurrent calls for the same artifact, in any process sharing the
+        cache directory, build it once; the others wait and load the result.
+
+        Args:
+            builder: Builder of the artifact
+            datasets: Source dataset month(s)
+
+        Returns:
+            The artifact as loaded by builder.load()
+
+        Raises:
+            CacheError: If the artifact cannot be written
+        """
+        datasets = self._datasets(datasets)
+        path = self.path(builder, datasets)
+        observer = self.cache_manager.observer
+        filename = os.path.relpath(path, self.root)
+
+        with FileLock(path + LOCK_SUFFIX):
+            if os.path.exists(path):
+                observer.on_cache_hit(None, filename)
+                self._touch(path)
+            else:
+                observer.on_cache_miss(None, filename)
+                with observer.span('crux.derive', builder=builder.name, filename=filename):
+                    self._build(builder, datasets, path)
+                self._remove_stale(path, self._prefix(builder, datasets), keep=self._published())
+                if self.max_size is not None:
+                    self.prune(self.max_size, keep=[path])
+            return builder.load(path)
+
+    @staticmethod
+    def _build(builder: ArtifactBuilder, datasets: List[CruxDataset], path: str) -> None:
+        part_path = path + PART_SUFFIX
+        try:
+            builder.build(datasets, part_path)
+            os.replace(part_path, path)
+        except OSError as e:
+            raise CacheError(f"Failed to write {path}: {e}")
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        """Mark an artifact as used, for least recently used eviction."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _published(self) -> Set[str]:
+        """Paths of published months (see CruxCache.publish_month), which are never removed."""
+        from .resident import published_paths
+
+        return published_paths(self.cache_manager.cache_dir)
+
+    @staticmethod
+    def _remove_stale(path: str, prefix: str, keep: Iterable[str] = ()) -> None:
+        """
+        Remove artifacts of the same builder, parameters and source months with another key.
+
+        Args:
+            path: Artifact just built
+            prefix: Filename prefix of its builder and months (see _prefix); artifacts
+                    of the same months built with other parameters (e.g. a table with
+                    and without index) do not share it and are kept
+            keep: Paths never to remove
+        """
+        directory, filename = os.path.split(path)
+        keep = set(keep)
+        for other in os.listdir(directory):
+            if (other.startswith(prefix) and other != filename
+                    and not other.endswith((LOCK_SUFFIX, PART_SUFFIX))
+                    and os.path.join(directory, other) not in keep):
+                ArtifactStore._remove(os.path.join(directory, other))
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        """
+        Remove an artifact and its lock file, unless another process holds the lock.
+
+        Returns:
+            True if the artifact was removed
+        """
+        lock = FileLock(path + LOCK_SUFFIX)
+        try:
+            if not lock.try_acquire():
+                return False  # Being loaded or rebuilt
+        except CacheError:
+            return False
+        try:
+            os.remove(path)
+        except OSError:
+            lock.release()
+            return False  # Still mapped by a process on a platform that forbids removal
+        lock.remove()
+        return True
+
+    def _artifacts(self) -> List[Tuple[float, int, str]]:
+        """(last use, size, path) of all artifacts, least recently used first."""
+        artifacts = []
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith((LOCK_SUFFIX, PART_SUFFIX)):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                artifacts.append((stat.st_mtime, stat.st_size, path))
+        return sorted(artifacts)
+
+    def size(self) -> int:
+        """Total size of the artifacts in bytes."""
+        return sum(size for _, size, _ in self._artifacts())
+
+    def prune(self, max_size: int, keep: Iterable[str] = ()) -> int:
+        """
+        Evict least recently used artifacts until the total size is at most max_size.
+
+        Args:
+            max_size: Size budget in bytes
+            keep: Paths of artifacts never to evict, in addition to published months
+
+        Returns:
+            Bytes removed
+        """
+        keep = set(keep) | self._published()
+        artifacts = self._artifacts()
+        excess = sum(size for _, size, _ in artifacts) - max_size
+        removed = 0
+        for _, size, path in artifacts:
+            if removed >= excess:
+                break
+            if path not in keep and self._remove(path):
+                removed += size
+        return removed
+
+    def __repr__(self) -> str:
+        return f"ArtifactStore(root='{self.root}', max_size={self.max_size})"
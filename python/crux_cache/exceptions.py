@@ -21,6 +21,11 @@ class DownloadError(CruxCacheError):
     pass
 
 
+class TransientDownloadError(DownloadError):
+    """Raised when a download fails in a way that may succeed if retried (connection error, stall, HTTP 5xx)."""
+    pass
+
+
 class CacheError(CruxCacheError):
     """Raised when cache operations fail."""
     pass
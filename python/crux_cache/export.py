@@ -0,0 +1,362 @@
+"""
+Export of dataset months to CSV, JSON Lines and Parquet files.
+
+Chunks are downloaded, read and parsed by a pool of threads a few chunks
+ahead of the writer, so fetching, parsing and encoding overlap. Parquet
+output is parsed and encoded by pyarrow without converting rows to Python
+objects, and unpartitioned CSV output is copied from the chunks as-is.
+
+Partitioned exports write a directory in the Hive layout read by Spark and
+other engines, e.g. rank=1000/part-00000.parquet. As usual for that layout,
+the partition column is only stored in the directory names.
+"""
+
+import os
+import re
+import bz2
+import gzip
+import json
+import lzma
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .constants import DEFAULT_JOBS
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+PARTITION_COLUMNS = ('rank', 'tld')
+
+# Compression of text formats and the extension it adds
+TEXT_COMPRESSIONS = {'none': '', 'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz'}
+PARQUET_COMPRESSIONS = ('none', 'snappy', 'gzip', 'zstd', 'brotli', 'lz4')
+
+# Compression used when none is given
+DEFAULT_COMPRESSION = {'csv': 'none', 'jsonl': 'none', 'parquet': 'snappy'}
+
+# Partitioned exports start a new file once a partition has this many rows
+ROWS_PER_FILE = 1_000_000
+
+# Rows held back for partition files before all partitions are flushed
+MAX_BUFFERED_ROWS = 4_000_000
+
+# Partition of origins without a TLD (IP addresses, single-label hosts)
+DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+# Last label of the host, if it is not numeric (also valid for pyarrow's RE2)
+_TLD_RE = re.compile(r'\.(?P<tld>[A-Za-z0-9-]*[A-Za-z][A-Za-z0-9-]*)(?::\d+)?$')
+
+
+def _import_pyarrow():
+    """Import pyarrow on first use."""
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "The 'pyarrow' library is required for Parquet exports. "
+            "Install it with: pip install pyarrow"
+        )
+    return pyarrow
+
+
+def tld_of(origin: str) -> str:
+    """
+    Get the partition value of an origin's TLD.
+
+    Args:
+        origin: Origin (e.g., 'https://www.example.co.uk')
+
+    Returns:
+        Lowercase TLD (e.g., 'uk'), or DEFAULT_PARTITION if the host has none
+    """
+    match = _TLD_RE.search(origin)
+    return match.group('tld').lower() if match else DEFAULT_PARTITION
+
+
+def _chunk_body(data: bytes, has_header: bool, max_rank: Optional[int]) -> bytes:
+    """
+    Get the rows of a CSV chunk as 'origin,rank' lines.
+
+    Args:
+        data: Chunk contents (possibly only a prefix within max_rank)
+        has_header: Whether the data starts with a header row
+        max_rank: Drop rows with rank > max_rank, or None if all rows are within it
+
+    Returns:
+        Newline-terminated lines without header
+    """
+    if has_header:
+        data = data[data.find(b'\n') + 1:]
+    if data and not data.endswith(b'\n'):
+        data += b'\n'
+    if max_rank is not None:
+        data = b''.join(
+            line + b'\n' for line in data.splitlines()
+            if line and int(line.rsplit(b',', 1)[1]) <= max_rank
+        )
+    return data
+
+
+def _prefetch(func: Callable, items: Iterable, ahead: int) -> Iterator:
+    """
+    Map a function over items in a thread pool, up to `ahead` items in advance.
+
+    Yields:
+        Results in the order of the items
+    """
+    with ThreadPoolExecutor(max_workers=ahead) as executor:
+        pending: deque = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= ahead:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class _TextEncoder:
+    """Encodes rows as CSV or JSON Lines."""
+
+    def __init__(self, format: str, compression: str, partition_by: Optional[str]):
+        if compression not in TEXT_COMPRESSIONS:
+            raise ValueError(f"compression for {format} must be one of {list(TEXT_COMPRESSIONS)}, got {compression!r}")
+        self.format = format
+        self.compression = compression
+        self.partition_by = partition_by
+        self.extension = f".{format}{TEXT_COMPRESSIONS[compression]}"
+        # Rank partitions store only the origin
+        self.with_rank = partition_by != 'rank'
+
+    def _line(self, origin: bytes, rank: bytes) -> bytes:
+        if self.format == 'csv':
+            return origin + b',' + rank + b'\n' if self.with_rank else origin + b'\n'
+        row = {'origin': origin.decode('utf-8')}
+        if self.with_rank:
+            row['rank'] = int(rank)
+        return json.dumps(row, ensure_ascii=False).encode('utf-8') + b'\n'
+
+    def parse(self, body: bytes) -> Tuple[Any, int]:
+        """Encode chunk rows, split by partition if partitioned. Returns (data, rows)."""
+        rows = body.count(b'\n')
+        if self.partition_by is None:
+            if self.format == 'csv':
+                return body, rows
+            return b''.join(self._line(*line.rsplit(b',', 1)) for line in body.splitlines()), rows
+
+        parts: Dict[str, List[bytes]] = {}
+        for line in body.splitlines():
+            origin, rank = line.rsplit(b',', 1)
+            key = str(int(rank)) if self.partition_by == 'rank' else tld_of(origin.decode('utf-8'))
+            parts.setdefault(key, []).append(self._line(origin, rank))
+        return {key: (b''.join(lines), len(lines)) for key, lines in parts.items()}, rows
+
+    def _open(self, path: str):
+        opener = {'none': open, 'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}[self.compression]
+        f = opener(path, 'wb')
+        if self.format == 'csv':
+            f.write(b'origin,rank\n' if self.with_rank else b'origin\n')
+        return f
+
+    def open(self, path: str) -> '_TextEncoder':
+        """Open a single output file for append()."""
+        self._file = self._open(path)
+        return self
+
+    def append(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def write_file(self, path: str, parts: List[bytes]) -> None:
+        """Write a partition file."""
+        with self._open(path) as f:
+            for data in parts:
+                f.write(data)
+
+
+class _ParquetEncoder:
+    """Encodes rows as Parquet with pyarrow."""
+
+    def __init__(self, compression: str, partition_by: Optional[str]):
+        if compression not in PARQUET_COMPRESSIONS:
+            raise ValueError(f"compression for parquet must be one of {list(PARQUET_COMPRESSIONS)}, got {compression!r}")
+        self.pa = _import_pyarrow()
+        self.compression = compression
+        self.partition_by = partition_by
+        self.extension = '.parquet'
+        self.schema = self.pa.schema([('origin', self.pa.string()), ('rank', self.pa.int32())])
+
+    def _read(self, body: bytes):
+        pa = self.pa
+        return pa.csv.read_csv(
+            pa.py_buffer(body),
+            read_options=pa.csv.ReadOptions(column_names=['origin', 'rank'], use_threads=False),
+            convert_options=pa.csv.ConvertOptions(column_types=self.schema)
+        )
+
+    def parse(self, body: bytes) -> Tuple[Any, int]:
+        """Parse chunk rows into a table, split by partition if partitioned. Returns (data, rows)."""
+        pa = self.pa
+        table = self._read(body) if body else self.schema.empty_table()
+        if self.partition_by is None:
+            return table, table.num_rows
+
+        if self.partition_by == 'rank':
+            keys = table['rank']
+            table = table.select(['origin'])
+        else:
+            tlds = pa.compute.struct_field(pa.compute.extract_regex(table['origin'], _TLD_RE.pattern), [0])
+            keys = pa.compute.fill_null(pa.compute.utf8_lower(tlds), DEFAULT_PARTITION)
+
+        # Sort by partition, then slice each run of equal keys
+        order = pa.compute.sort_indices(keys)
+        keys = keys.take(order)
+        table = table.take(order)
+        parts = {}
+        offset = 0
+        for item in pa.compute.value_counts(keys):
+            count = item['counts'].as_py()
+            parts[str(item['values'].as_py())] = (table.slice(offset, count), count)
+            offset += count
+        return parts, sum(count for _, count in parts.values())
+
+    def open(self, path: str) -> '_ParquetEncoder':
+        """Open a single output file for append()."""
+        self._writer = self.pa.parquet.ParquetWriter(path, self.schema, compression=self.compression)
+        return self
+
+    def append(self, table) -> None:
+        if table.num_rows:
+            self._writer.write_table(table)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def write_file(self, path: str, parts: List[Any]) -> None:
+        """Write a partition file."""
+        table = self.pa.concat_tables(parts)
+        self.pa.parquet.write_table(table, path, compression=self.compression)
+
+
+class _PartitionedOutput:
+    """Buffers rows per partition and writes them as numbered part files."""
+
+    def __init__(self, directory: str, column: str, encoder):
+        self.directory = directory
+        self.column = column
+        self.encoder = encoder
+        self.buffers: Dict[str, List[Any]] = {}
+        self.buffered_rows: Dict[str, int] = {}
+        self.total_buffered = 0
+        self.files: Dict[str, int] = {}
+
+    def add(self, key: str, data: Any, rows: int) -> None:
+        self.buffers.setdefault(key, []).append(data)
+        self.buffered_rows[key] = self.buffered_rows.get(key, 0) + rows
+        self.total_buffered += rows
+        if self.buffered_rows[key] >= ROWS_PER_FILE:
+            self.flush(key)
+        elif self.total_buffered >= MAX_BUFFERED_ROWS:
+            self.flush_all()
+
+    def flush(self, key: str) -> None:
+        parts = self.buffers.pop(key, None)
+        self.total_buffered -= self.buffered_rows.pop(key, 0)
+        if not parts:
+            return
+        number = self.files.get(key, 0)
+        self.files[key] = number + 1
+
+        partition_dir = os.path.join(self.directory, f"{self.column}={key}")
+        os.makedirs(partition_dir, exist_ok=True)
+        self.encoder.write_file(os.path.join(partition_dir, f"part-{number:05d}{self.encoder.extension}"), parts)
+
+    def flush_all(self) -> None:
+        for key in list(self.buffers):
+            self.flush(key)
+
+
+def export_dataset(
+    dataset,
+    path: str,
+    format: str = 'csv',
+    compression: Optional[str] = None,
+    partition_by: Optional[str] = None,
+    jobs: int = DEFAULT_JOBS
+) -> int:
+    """
+    Export a dataset month (see CruxDataset.export).
+
+    Returns:
+        Number of rows exported
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {EXPORT_FORMATS}, got {format!r}")
+    if partition_by is not None and partition_by not in PARTITION_COLUMNS:
+        raise ValueError(f"partition_by must be one of {PARTITION_COLUMNS}, got {partition_by!r}")
+
+    compression = compression or DEFAULT_COMPRESSION[format]
+    if format == 'parquet':
+        encoder = _ParquetEncoder(compression, partition_by)
+    else:
+        encoder = _TextEncoder(format, compression, partition_by)
+
+    path = os.fspath(path)
+    if partition_by is not None and os.path.exists(path):
+        raise FileExistsError(f"Export directory {path} already exists")
+
+    max_rank = dataset.max_rank
+
+    def load(item: Tuple[int, Tuple[Dict[str, Any], Optional[int]]]) -> Tuple[Any, int]:
+        index, (chunk_info, end) = item
+        data = dataset._read_chunk(chunk_info['filename'], chunk_info.get('size'), end=end)
+        # Rows beyond max_rank are cut off by rank offsets; older manifests need a filter
+        needs_filter = (
+            max_rank is not None and end is None
+            and (chunk_info.get('max_rank') is None or chunk_info['max_rank'] > max_rank)
+        )
+        return encoder.parse(_chunk_body(data, index == 0, max_rank if needs_filter else None))
+
+    # Write to a temporary path and move it into place once complete
+    tmp_path = path + '.part'
+    if os.path.isdir(tmp_path):
+        shutil.rmtree(tmp_path)
+
+    total = 0
+    try:
+        batches = _prefetch(load, enumerate(dataset.chunk_extents()), max(1, jobs))
+        if partition_by is None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            encoder.open(tmp_path)
+            try:
+                for data, rows in batches:
+                    encoder.append(data)
+                    total += rows
+            finally:
+                encoder.close()
+        else:
+            output = _PartitionedOutput(tmp_path, partition_by, encoder)
+            for parts, rows in batches:
+                for key, (data, count) in parts.items():
+                    output.add(key, data, count)
+                total += rows
+            output.flush_all()
+            if not output.files:
+                os.makedirs(tmp_path, exist_ok=True)
+    except BaseException:
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    os.replace(tmp_path, path)
+    return total
@@ -0,0 +1,148 @@
+"""Cross-process file locks for a cache directory shared by several processes."""
+
+import os
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .exceptions import CacheError
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a lock file, held by one process (or thread) at a time.
+
+    Locks are tied to an open file, so the operating system releases them
+    when the holding process exits or crashes; a lock file left on disk is
+    never stale. Lock files stay on disk after use unless the holder removes
+    them with remove(); processes waiting on a removed file lock the path again.
+
+    Example:
+        >>> with FileLock('/tmp/crux/data/global/202510_1.csv.lock'):
+        ...     pass
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the lock.
+
+        Args:
+            path: Path of the lock file (created if needed)
+        """
+        self.path = path
+        self._fd: Optional[int] = None
+        self.wait_seconds = 0.0
+
+    def acquire(self) -> 'FileLock':
+        """
+        Block until the lock is acquired.
+
+        Returns:
+            The lock itself
+
+        Raises:
+            CacheError: If the lock file cannot be created
+        """
+        start = time.perf_counter()
+        self._acquire(blocking=True)
+        self.wait_seconds = time.perf_counter() - start
+        return self
+
+    def try_acquire(self) -> bool:
+        """
+        Acquire the lock if no other process (or thread) holds it, without waiting.
+
+        Returns:
+            True if the lock was acquired
+
+        Raises:
+            CacheError: If the lock file cannot be created
+        """
+        return self._acquire(blocking=False)
+
+    def _acquire(self, blocking: bool) -> bool:
+        while True:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            except OSError as e:
+                raise CacheError(f"Failed to create lock file {self.path}: {e}")
+
+            if not self._lock(fd, blocking):
+                os.close(fd)
+                return False
+
+            # The holder may have removed the lock file while this process waited on it
+            try:
+                if os.path.samestat(os.fstat(fd), os.stat(self.path)):
+                    self._fd = fd
+                    return True
+            except FileNotFoundError:
+                pass
+            self._unlock(fd)
+
+    @staticmethod
+    def _lock(fd: int, blocking: bool) -> bool:
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+        elif not blocking:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            except OSError:
+                return False
+        else:
+            # msvcrt.LK_LOCK gives up after 10 attempts, so retry until it succeeds
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        return True
+
+    @staticmethod
+    def _unlock(fd: int) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def release(self) -> None:
+        """Release the lock."""
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        self._unlock(fd)
+
+    def remove(self) -> None:
+        """
+        Remove the lock file and release the lock (once the file is no longer needed).
+
+        Only the holder may remove the lock file. Processes that were waiting
+        on it notice once they get it and lock a new file at the same path.
+        """
+        if self._fd is None:
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass  # Open in another process on a platform that forbids removal
+        self.release()
+
+    def __enter__(self) -> 'FileLock':
+        return self.acquire()
+
+    def __exit__(self, *exc) -> None:
+        self.release()
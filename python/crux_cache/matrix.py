@@ -0,0 +1,317 @@
+"""
+Origin × country rank matrix of one month.
+
+A RankMatrix holds the ranks of every origin in several datasets of the same
+month (e.g. global, us, de, jp). Origins are dictionary-encoded once in a
+packed buffer with a hash index, and every dataset is a column of one byte
+per origin (0 if the origin is not in the dataset, otherwise an index into
+the month's distinct rank values). Each dataset is read in a single pass
+while building, and the matrix can be saved and memory-mapped like a
+CruxTable.
+
+Queries such as "origins in the top 10k of DE but not of US" translate each
+column into a byte mask and combine the masks with integer bitwise
+operations, so they run at memory speed without a Python loop over origins.
+"""
+
+import re
+import json
+import struct
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .exceptions import CacheError
+from .table import CruxTable, _build_index, _map_sections, _probe_index, _write_sections
+
+MAGIC = b'CRUXMTX1'
+
+# magic, rows, buffer size, index slots, columns, offset item size, metadata size
+HEADER = struct.Struct('<8sQQQIII')
+
+_ROW_RE = re.compile(b'\x01')
+
+# Conditions of a query: dataset -> maximum rank, or None for any rank
+Conditions = Dict[str, Optional[int]]
+
+
+class RankMatrix:
+    """
+    Ranks of the origins of one month in several datasets.
+
+    Build one with CruxCache.load_matrix() or RankMatrix.from_tables(), or
+    open a saved matrix with RankMatrix.open().
+
+    Example:
+        >>> matrix = cache.load_matrix('202510', ['global', 'us', 'de', 'jp'])
+        >>> matrix.ranks('https://www.spiegel.de')
+        {'global': 10000, 'us': 500000, 'de': 1000, 'jp': None}
+        >>> # Origins in the top 10k of Germany but not of the US
+        >>> origins = list(matrix.select(include={'de': 10000}, exclude={'us': 10000}))
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytes, bytearray, memoryview],
+        offsets: Union[array, memoryview],
+        columns: Dict[str, Union[bytes, bytearray, memoryview]],
+        rank_values: List[int],
+        index: Union[array, memoryview],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize a matrix from its arrays (see from_tables and open).
+
+        Args:
+            buffer: Origins as UTF-8, each followed by a newline
+            offsets: Start of every origin in buffer, plus the end of the buffer
+            columns: Rank codes of every origin per dataset (0: not in the dataset,
+                     otherwise 1 + index into rank_values)
+            rank_values: Distinct ranks of all datasets, ascending
+            index: Hash index of the origins
+            metadata: Month and max_rank the matrix was built from
+        """
+        self._buffer = memoryview(buffer)
+        self._offsets = offsets
+        self._columns = columns
+        self.rank_values = list(rank_values)
+        self._index = index
+        self.metadata = metadata or {}
+        self._mmap = None
+
+    @property
+    def month(self) -> Optional[str]:
+        return self.metadata.get('month')
+
+    @property
+    def columns(self) -> List[str]:
+        """Datasets of the matrix."""
+        return list(self._columns)
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, CruxTable]) -> 'RankMatrix':
+        """
+        Build a matrix from the tables of the datasets of one month.
+
+        The largest table (usually global) provides the origin dictionary and
+        its hash index; origins of the other tables are looked up in it, and
+        those not in it are appended.
+
+        Args:
+            tables: Dataset -> table of the month, in column order
+
+        Returns:
+            RankMatrix
+        """
+        if not tables:
+            raise ValueError("At least one table is required")
+        base_name = max(tables, key=lambda name: len(tables[name]))
+        base = tables[base_name]
+        if not base.has_index:
+            base.build_index()
+
+        rank_values = sorted(set().union(*(table.rank_values for table in tables.values())))
+        if len(rank_values) > 255:
+            raise CacheError(f"Too many distinct ranks for a matrix ({len(rank_values)})")
+        rank_codes = {rank: code for code, rank in enumerate(rank_values, 1)}
+
+        buffer = bytearray(base._buffer)
+        offsets = array('Q', base._offsets)
+        added: Dict[bytes, int] = {}
+
+        columns: Dict[str, bytearray] = {}
+        for name, table in tables.items():
+            codes = [rank_codes[rank] for rank in table.rank_values]
+            if table is base:
+                translation = bytes(codes + [0] * (256 - len(codes)))
+                columns[name] = bytearray(bytes(base._codes).translate(translation))
+                continue
+
+            column = bytearray(len(offsets) - 1)
+            origins = table._buffer.tobytes().split(b'\n')
+            origins.pop()  # After the last newline
+            for origin, code in zip(origins, table._codes):
+                row = base._find_key(origin)
+                if row < 0:
+                    row = added.get(origin, -1)
+                    if row < 0:
+                        row = added[origin] = len(offsets) - 1
+                        buffer += origin + b'\n'
+                        offsets.append(len(buffer))
+                        column.append(0)
+                if not column[row]:
+                    column[row] = codes[code]
+            columns[name] = column
+
+        rows = len(offsets) - 1
+        for column in columns.values():
+            column.extend(bytes(rows - len(column)))
+        if len(buffer) < 2 ** 32:
+            offsets = array('I', offsets)
+
+        metadata = {
+            'month': base.month,
+            'max_rank': base.metadata.get('max_rank'),
+            'origins': {name: len(table) for name, table in tables.items()},
+        }
+        buffer_view = memoryview(buffer)
+        index = _build_index(buffer_view, offsets, rows)
+        return cls(buffer_view, offsets, columns, rank_values, index, metadata)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the matrix's arrays in bytes."""
+        return (
+            self._buffer.nbytes
+            + len(self._offsets) * self._offsets.itemsize
+            + len(self._index) * self._index.itemsize
+            + sum(len(column) for column in self._columns.values())
+        )
+
+    def _origin(self, row: int) -> str:
+        return self._buffer[self._offsets[row]:self._offsets[row + 1] - 1].tobytes().decode('utf-8')
+
+    def _find(self, origin: str) -> int:
+        return _probe_index(self._index, self._buffer, self._offsets, origin.encode('utf-8'))
+
+    def __contains__(self, origin: object) -> bool:
+        return isinstance(origin, str) and self._find(origin) >= 0
+
+    def _rank(self, code: int) -> Optional[int]:
+        return self.rank_values[code - 1] if code else None
+
+    def ranks(self, origin: str) -> Optional[Dict[str, Optional[int]]]:
+        """
+        Look up the ranks of an origin in every dataset.
+
+        Args:
+            origin: Origin (e.g., 'https://www.google.com')
+
+        Returns:
+            Dataset -> rank (None if the origin is not in the dataset), or None
+            if the origin is in none of the datasets
+        """
+        row = self._find(origin)
+        if row < 0:
+            return None
+        return {name: self._rank(column[row]) for name, column in self._columns.items()}
+
+    def __iter__(self) -> Iterator[Tuple[str, Tuple[Optional[int], ...]]]:
+        """Iterate over (origin, ranks in column order) rows."""
+        columns = list(self._columns.values())
+        for row in range(len(self)):
+            yield self._origin(row), tuple(self._rank(column[row]) for column in columns)
+
+    def _mask(self, name: str, max_rank: Optional[int], inside: bool) -> bytes:
+        """One byte per origin: 1 if the origin is (inside) or is not within max_rank in a dataset."""
+        if name not in self._columns:
+            raise KeyError(f"Dataset '{name}' is not in the matrix (columns: {', '.join(self._columns)})")
+        matches = [0] + [max_rank is None or rank <= max_rank for rank in self.rank_values]
+        translation = bytes(
+            int(code < len(matches) and matches[code] == inside) for code in range(256)
+        )
+        return bytes(self._columns[name]).translate(translation)
+
+    def _selection(self, include: Optional[Conditions], exclude: Optional[Conditions]) -> bytes:
+        """One byte per origin: 1 if it matches all conditions."""
+        masks = [self._mask(name, rank, True) for name, rank in (include or {}).items()]
+        masks += [self._mask(name, rank, False) for name, rank in (exclude or {}).items()]
+        if not masks:
+            return b'\x01' * len(self)
+
+        selected = int.from_bytes(masks[0], 'little')
+        for mask in masks[1:]:
+            selected &= int.from_bytes(mask, 'little')
+        return selected.to_bytes(len(self), 'little')
+
+    def select(
+        self,
+        include: Optional[Conditions] = None,
+        exclude: Optional[Conditions] = None
+    ) -> Iterator[str]:
+        """
+        Find origins within the top ranks of some datasets and not of others.
+
+        Args:
+            include: Dataset -> max rank; origins must have rank <= max rank in
+                     every one of them (None: any rank, i.e. be in the dataset)
+            exclude: Dataset -> max rank; origins must not have rank <= max rank
+                     in any of them (None: not be in the dataset at all)
+
+        Yields:
+            Matching origins (rows of the largest dataset first, in its order)
+
+        Raises:
+            KeyError: If a dataset is not a column of the matrix
+
+        Example:
+            >>> # Top 10k in Germany, but not in the US top 10k
+            >>> matrix.select(include={'de': 10000}, exclude={'us': 10000})
+        """
+        selection = self._selection(include, exclude)
+        for match in _ROW_RE.finditer(selection):
+            yield self._origin(match.start())
+
+    def count(self, include: Optional[Conditions] = None, exclude: Optional[Conditions] = None) -> int:
+        """Count the origins select() would yield."""
+        return self._selection(include, exclude).count(1)
+
+    def save(self, path: str) -> None:
+        """
+        Save the matrix to a file that open() maps into memory.
+
+        Args:
+            path: File to write
+        """
+        metadata = json.dumps({
+            **self.metadata,
+            'columns': self.columns,
+            'rank_values': self.rank_values,
+        }).encode('utf-8')
+        header = HEADER.pack(
+            MAGIC, len(self), self._buffer.nbytes, len(self._index),
+            len(self._columns), self._offsets.itemsize, len(metadata)
+        )
+        _write_sections(path, header, [
+            metadata,
+            self._offsets,
+            self._index,
+            *self._columns.values(),
+            self._buffer,
+        ])
+
+    @classmethod
+    def open(cls, path: str) -> 'RankMatrix':
+        """
+        Open a saved matrix without copying it into memory.
+
+        Args:
+            path: File written by save()
+
+        Returns:
+            RankMatrix backed by the mapped file
+
+        Raises:
+            CacheError: If the file is not a saved matrix
+        """
+        mapped, fields, section = _map_sections(path, HEADER, MAGIC)
+        _, rows, buffer_size, slots, _, offset_size, metadata_size = fields
+
+        metadata = json.loads(section(metadata_size).tobytes().decode('utf-8'))
+        offsets = section((rows + 1) * offset_size).cast('I' if offset_size == 4 else 'Q')
+        index = section(slots * 4).cast('I')
+        columns = {name: section(rows) for name in metadata.pop('columns')}
+        buffer = section(buffer_size)
+
+        rank_values = metadata.pop('rank_values')
+        matrix = cls(buffer, offsets, columns, rank_values, index, metadata)
+        matrix._mmap = mapped
+        return matrix
+
+    def __repr__(self) -> str:
+        return (
+            f"RankMatrix(month='{self.month}', columns={self.columns}, "
+            f"origins={len(self)}, nbytes={self.nbytes})"
+        )
@@ -0,0 +1,160 @@
+"""
+Mirror server for a cache directory or a checkout of the repository.
+
+Serves a directory containing data/ over HTTP, so that other hosts can use
+it as their data source instead of GitHub:
+
+    python -m crux_cache.mirror --root .crux --host 0.0.0.0 --port 8080
+
+and on the other hosts:
+
+    cache = CruxCache(source='http://mirror-host:8080')
+"""
+
+import os
+import re
+import sys
+import argparse
+import threading
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .constants import DEFAULT_CACHE_DIR, DEFAULT_MIRROR_PORT
+
+# Single open-ended byte range, as sent when resuming a download
+_RANGE_RE = re.compile(r'^bytes=(\d+)-$')
+
+
+class MirrorRequestHandler(SimpleHTTPRequestHandler):
+    """Request handler serving files below the mirror root, with resumable downloads."""
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_head(self):
+        """Serve 'Range: bytes=N-' requests with 206 Partial Content, everything else as usual."""
+        match = _RANGE_RE.match(self.headers.get('Range', ''))
+        path = self.translate_path(self.path)
+        if match is None or not os.path.isfile(path):
+            return super().send_head()
+
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        size = os.fstat(f.fileno()).st_size
+        start = int(match.group(1))
+        if start >= size:
+            f.close()
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+
+        f.seek(start)
+        self.send_response(HTTPStatus.PARTIAL_CONTENT)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Range', f'bytes {start}-{size - 1}/{size}')
+        self.send_header('Content-Length', str(size - start))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        return f
+
+
+class MirrorServer:
+    """
+    HTTP server for a directory containing data/.
+
+    Example:
+        >>> with MirrorServer('.crux') as server:
+        ...     cache = CruxCache(cache_dir='/tmp/other', source=server.base_url)
+    """
+
+    handler_class = MirrorRequestHandler
+
+    def __init__(self, root: str, host: str = '127.0.0.1', port: int = 0, verbose: bool = False):
+        """
+        Initialize the server.
+
+        Args:
+            root: Directory containing data/ (a cache directory or repository checkout)
+            host: Interface to bind to
+            port: Port to bind to (0 picks a free port)
+            verbose: Log every request to stderr
+        """
+        self.root = str(root)
+        self.host = host
+        self.port = port
+        self.verbose = verbose
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """URL to use as the data source of a CruxCache."""
+        return f"http://{self.host}:{self.port}"
+
+    def _bind(self) -> ThreadingHTTPServer:
+        handler = partial(self.handler_class, directory=self.root)
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.verbose = self.verbose
+        self.port = self._server.server_address[1]
+        return self._server
+
+    def start(self) -> 'MirrorServer':
+        """Start serving in a background thread."""
+        server = self._bind()
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the current thread until interrupted."""
+        server = self._bind()
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'MirrorServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv=None) -> int:
+    """Run a mirror server from the command line."""
+    parser = argparse.ArgumentParser(description="Serve a crux_cache cache directory to other hosts")
+    parser.add_argument('--root', default=DEFAULT_CACHE_DIR,
+                        help=f'Directory containing data/ (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind to (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_MIRROR_PORT,
+                        help=f'Port to bind to (default: {DEFAULT_MIRROR_PORT})')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args(argv)
+
+    server = MirrorServer(args.root, host=args.host, port=args.port, verbose=args.verbose)
+    print(f"Serving {args.root} on http://{args.host}:{args.port} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,504 @@
+"""Observer hooks, statistics and progress reporting for crux_cache."""
+
+import os
+import re
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+_MONTH_RE = re.compile(r'(\d{6})')
+
+
+def month_of(filename: str) -> Optional[str]:
+    """
+    Get the month a data file belongs to.
+
+    Args:
+        filename: Filename relative to the dataset directory (e.g., '202510_1.csv')
+
+    Returns:
+        Month in YYYYMM format, or None for files that do not belong to a month
+    """
+    match = _MONTH_RE.match(os.path.basename(filename))
+    return match.group(1) if match else None
+
+
+class CacheObserver:
+    """
+    Base class for observers of cache and iteration events.
+
+    All callbacks are no-ops; subclasses override the ones they need.
+    Callbacks are made once per file or per batch of rows, never per row.
+    """
+
+    def on_cache_hit(self, dataset_type: Optional[str], filename: str) -> None:
+        """Called when a file is served from the local cache."""
+
+    def on_cache_miss(self, dataset_type: Optional[str], filename: str) -> None:
+        """Called when a file has to be downloaded."""
+
+    def on_download(self, dataset_type: Optional[str], filename: str, size: int, seconds: float) -> None:
+        """Called after a file was downloaded."""
+
+    def on_not_modified(self, dataset_type: Optional[str], filename: str, seconds: float) -> None:
+        """Called after an expired file was revalidated as unchanged (e.g. HTTP 304)."""
+
+    def on_lock_wait(self, dataset_type: Optional[str], filename: str, seconds: float) -> None:
+        """Called after waiting for another process or thread that was fetching the same file."""
+
+    def on_retry(self, dataset_type: Optional[str], filename: str, attempt: int, error: Exception,
+                 delay: float) -> None:
+        """Called when a download attempt failed transiently and will be retried after delay seconds."""
+
+    def on_hedge(self, dataset_type: Optional[str], filename: str, won: bool) -> None:
+        """Called after a hedged duplicate request raced a slow download (won: the duplicate finished first)."""
+
+    def on_iteration_start(self, dataset_type: str, month: str, chunks: int) -> None:
+        """Called when iteration over a month starts."""
+
+    def on_chunk_read(self, dataset_type: str, month: str, filename: str, size: int, seconds: float) -> None:
+        """Called after a cached chunk was read from disk."""
+
+    def on_rows_parsed(self, dataset_type: str, month: str, rows: int, seconds: float) -> None:
+        """Called after a batch of rows was parsed."""
+
+    def on_iteration_end(self, dataset_type: str, month: str, rows: int, seconds: float) -> None:
+        """Called when iteration over a month finishes or is abandoned."""
+
+    def on_sync(self, dataset_type: str, month: str, files: int, size: int, seconds: float) -> None:
+        """Called after the files of a month were prefetched by a sync (files and bytes downloaded)."""
+
+    def on_sync_error(self, dataset_type: Optional[str], error: Exception) -> None:
+        """Called when a background sync failed; it is retried at the next poll."""
+
+    def span(self, name: str, **attributes: Any):
+        """
+        Open a tracing span.
+
+        Args:
+            name: Span name (e.g., 'crux.download')
+            **attributes: Span attributes
+
+        Returns:
+            Context manager covering the traced operation
+        """
+        return _NULL_SPAN
+
+
+class _NullSpan:
+    """Reusable context manager for observers that do not trace."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class ObserverGroup(CacheObserver):
+    """Dispatches events to several observers."""
+
+    def __init__(self, observers: Optional[List[CacheObserver]] = None):
+        """
+        Initialize the group.
+
+        Args:
+            observers: Observers to notify, in order
+        """
+        self.observers: List[CacheObserver] = list(observers or [])
+
+    def add(self, observer: CacheObserver) -> None:
+        """Add an observer."""
+        self.observers.append(observer)
+
+    def on_cache_hit(self, dataset_type, filename):
+        for observer in self.observers:
+            observer.on_cache_hit(dataset_type, filename)
+
+    def on_cache_miss(self, dataset_type, filename):
+        for observer in self.observers:
+            observer.on_cache_miss(dataset_type, filename)
+
+    def on_download(self, dataset_type, filename, size, seconds):
+        for observer in self.observers:
+            observer.on_download(dataset_type, filename, size, seconds)
+
+    def on_not_modified(self, dataset_type, filename, seconds):
+        for observer in self.observers:
+            observer.on_not_modified(dataset_type, filename, seconds)
+
+    def on_lock_wait(self, dataset_type, filename, seconds):
+        for observer in self.observers:
+            observer.on_lock_wait(dataset_type, filename, seconds)
+
+    def on_retry(self, dataset_type, filename, attempt, error, delay):
+        for observer in self.observers:
+            observer.on_retry(dataset_type, filename, attempt, error, delay)
+
+    def on_hedge(self, dataset_type, filename, won):
+        for observer in self.observers:
+            observer.on_hedge(dataset_type, filename, won)
+
+    def on_iteration_start(self, dataset_type, month, chunks):
+        for observer in self.observers:
+            observer.on_iteration_start(dataset_type, month, chunks)
+
+    def on_chunk_read(self, dataset_type, month, filename, size, seconds):
+        for observer in self.observers:
+            observer.on_chunk_read(dataset_type, month, filename, size, seconds)
+
+    def on_rows_parsed(self, dataset_type, month, rows, seconds):
+        for observer in self.observers:
+            observer.on_rows_parsed(dataset_type, month, rows, seconds)
+
+    def on_iteration_end(self, dataset_type, month, rows, seconds):
+        for observer in self.observers:
+            observer.on_iteration_end(dataset_type, month, rows, seconds)
+
+    def on_sync(self, dataset_type, month, files, size, seconds):
+        for observer in self.observers:
+            observer.on_sync(dataset_type, month, files, size, seconds)
+
+    def on_sync_error(self, dataset_type, error):
+        for observer in self.observers:
+            observer.on_sync_error(dataset_type, error)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        with ExitStack() as stack:
+            for observer in self.observers:
+                stack.enter_context(observer.span(name, **attributes))
+            yield
+
+
+class MonthStats:
+    """Counters for one dataset month (or for metadata files)."""
+
+    def __init__(self):
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_downloaded = 0
+        self.download_seconds = 0.0
+        self.download_latencies: List[float] = []
+        self.not_modified = 0
+        self.lock_waits = 0
+        self.lock_wait_seconds = 0.0
+        self.retries = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self.bytes_read = 0
+        self.read_seconds = 0.0
+        self.rows = 0
+        self.parse_seconds = 0.0
+        self.iterations = 0
+        self.iterate_seconds = 0.0
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        """Fraction of file requests served from the cache."""
+        requests = self.cache_hits + self.cache_misses
+        return self.cache_hits / requests if requests else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Summarize the counters.
+
+        other_seconds is the iteration time not spent downloading, waiting
+        for other processes' downloads, reading or parsing, i.e. mostly time
+        spent by the consumer of the rows.
+        """
+        latencies = sorted(self.download_latencies)
+        other = (self.iterate_seconds - self.download_seconds - self.lock_wait_seconds
+                 - self.read_seconds - self.parse_seconds)
+        return {
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'hit_ratio': self.hit_ratio,
+            'bytes_downloaded': self.bytes_downloaded,
+            'download_seconds': self.download_seconds,
+            'download_latency_p50': latencies[len(latencies) // 2] if latencies else None,
+            'download_latency_p99': latencies[int(len(latencies) * 0.99)] if latencies else None,
+            'download_latency_max': latencies[-1] if latencies else None,
+            'not_modified': self.not_modified,
+            'lock_waits': self.lock_waits,
+            'lock_wait_seconds': self.lock_wait_seconds,
+            'retries': self.retries,
+            'hedges': self.hedges,
+            'hedges_won': self.hedges_won,
+            'bytes_read': self.bytes_read,
+            'read_seconds': self.read_seconds,
+            'rows': self.rows,
+            'parse_seconds': self.parse_seconds,
+            'rows_per_s': self.rows / self.parse_seconds if self.parse_seconds else None,
+            'iterations': self.iterations,
+            'iterate_seconds': self.iterate_seconds,
+            'other_seconds': max(other, 0.0) if self.iterations else None,
+        }
+
+
+class CacheStats(CacheObserver):
+    """
+    Collects counters per (dataset, month).
+
+    Metadata files (datasets.json, manifest.json) are recorded under month None.
+
+    Example:
+        >>> cache = CruxCache()
+        >>> rows = sum(1 for _ in cache.get_dataset('global', max_rank=1000))
+        >>> cache.stats.summary()[('global', '202510')]['hit_ratio']
+    """
+
+    def __init__(self):
+        self.months: Dict[Tuple[Optional[str], Optional[str]], MonthStats] = {}
+
+    def _get(self, dataset_type: Optional[str], month: Optional[str]) -> MonthStats:
+        key = (dataset_type, month)
+        stats = self.months.get(key)
+        if stats is None:
+            stats = self.months[key] = MonthStats()
+        return stats
+
+    def on_cache_hit(self, dataset_type, filename):
+        self._get(dataset_type, month_of(filename)).cache_hits += 1
+
+    def on_cache_miss(self, dataset_type, filename):
+        self._get(dataset_type, month_of(filename)).cache_misses += 1
+
+    def on_download(self, dataset_type, filename, size, seconds):
+        stats = self._get(dataset_type, month_of(filename))
+        stats.bytes_downloaded += size
+        stats.download_seconds += seconds
+        stats.download_latencies.append(seconds)
+
+    def on_not_modified(self, dataset_type, filename, seconds):
+        stats = self._get(dataset_type, month_of(filename))
+        stats.not_modified += 1
+        stats.download_seconds += seconds
+        stats.download_latencies.append(seconds)
+
+    def on_lock_wait(self, dataset_type, filename, seconds):
+        stats = self._get(dataset_type, month_of(filename))
+        stats.lock_waits += 1
+        stats.lock_wait_seconds += seconds
+
+    def on_retry(self, dataset_type, filename, attempt, error, delay):
+        self._get(dataset_type, month_of(filename)).retries += 1
+
+    def on_hedge(self, dataset_type, filename, won):
+        stats = self._get(dataset_type, month_of(filename))
+        stats.hedges += 1
+        stats.hedges_won += won
+
+    def on_chunk_read(self, dataset_type, month, filename, size, seconds):
+        stats = self._get(dataset_type, month)
+        stats.bytes_read += size
+        stats.read_seconds += seconds
+
+    def on_rows_parsed(self, dataset_type, month, rows, seconds):
+        stats = self._get(dataset_type, month)
+        stats.rows += rows
+        stats.parse_seconds += seconds
+
+    def on_iteration_end(self, dataset_type, month, rows, seconds):
+        stats = self._get(dataset_type, month)
+        stats.iterations += 1
+        stats.iterate_seconds += seconds
+
+    def totals(self) -> MonthStats:
+        """Sum the counters over all datasets and months."""
+        total = MonthStats()
+        for stats in self.months.values():
+            for name, value in vars(stats).items():
+                if isinstance(value, list):
+                    getattr(total, name).extend(value)
+                else:
+                    setattr(total, name, getattr(total, name) + value)
+        return total
+
+    def summary(self) -> Dict[Tuple[Optional[str], Optional[str]], Dict[str, Any]]:
+        """
+        Summarize the counters.
+
+        Returns:
+            Dictionary mapping (dataset, month) to the counters of MonthStats.as_dict
+        """
+        return {key: stats.as_dict() for key, stats in self.months.items()}
+
+    def reset(self) -> None:
+        """Discard all counters."""
+        self.months.clear()
+
+
+class ProgressReporter(CacheObserver):
+    """
+    Prints download and iteration progress to a stream (stderr by default).
+
+    Example:
+        >>> cache = CruxCache(observers=[ProgressReporter()])
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: float = 0.5):
+        """
+        Initialize the reporter.
+
+        Args:
+            stream: Stream to write to (default: sys.stderr)
+            interval: Minimum seconds between progress lines
+        """
+        self.stream = stream
+        self.interval = interval
+        self._current: Optional[Tuple[str, str]] = None
+        self._chunks = 0
+        self._chunks_done = 0
+        self._rows = 0
+        self._bytes_downloaded = 0
+        self._started = 0.0
+        self._last_report = 0.0
+
+    def _write(self, text: str, end: str = '\r') -> None:
+        stream = self.stream or sys.stderr
+        stream.write(text + end)
+        stream.flush()
+
+    def _report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+
+        elapsed = now - self._started
+        rate = self._rows / elapsed if elapsed else 0.0
+        dataset_type, month = self._current or ('', '')
+        self._write(
+            f"{dataset_type} {month}: chunk {self._chunks_done}/{self._chunks}, "
+            f"{self._rows:,} rows ({rate:,.0f}/s), "
+            f"{self._bytes_downloaded / (1024 * 1024):.1f} MB downloaded"
+        )
+
+    def on_iteration_start(self, dataset_type, month, chunks):
+        self._current = (dataset_type, month)
+        self._chunks = chunks
+        self._chunks_done = 0
+        self._rows = 0
+        self._bytes_downloaded = 0
+        self._started = self._last_report = time.perf_counter()
+
+    def on_download(self, dataset_type, filename, size, seconds):
+        self._bytes_downloaded += size
+        if self._current is None:
+            self._write(f"Downloaded {filename} ({size / (1024 * 1024):.1f} MB in {seconds:.1f}s)", end='\n')
+
+    def on_chunk_read(self, dataset_type, month, filename, size, seconds):
+        self._chunks_done += 1
+        self._report()
+
+    def on_rows_parsed(self, dataset_type, month, rows, seconds):
+        # Rows of a base month used for delta reconstruction are not output rows
+        if self._current == (dataset_type, month):
+            self._rows += rows
+            self._report()
+
+    def on_iteration_end(self, dataset_type, month, rows, seconds):
+        if self._current == (dataset_type, month):
+            self._report(force=True)
+            self._write('', end='\n')
+            self._current = None
+
+    def on_sync(self, dataset_type, month, files, size, seconds):
+        if files:
+            self._write(f"Synced {dataset_type} {month}: {files} files, "
+                        f"{size / (1024 * 1024):.1f} MB in {seconds:.1f}s", end='\n')
+
+    def on_sync_error(self, dataset_type, error):
+        self._write(f"Sync of {dataset_type or 'datasets'} failed: {error}", end='\n')
+
+
+class SpanRecorder(CacheObserver):
+    """
+    Records tracing spans in memory.
+
+    Each finished span is stored as a dictionary with name, attributes,
+    start (perf_counter), seconds, depth and error.
+    """
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self._depth = 0
+
+    @contextmanager
+    def span(self, name, **attributes):
+        record = {
+            'name': name,
+            'attributes': attributes,
+            'start': time.perf_counter(),
+            'depth': self._depth,
+            'error': None,
+        }
+        self._depth += 1
+        try:
+            yield
+        except BaseException as e:
+            record['error'] = repr(e)
+            raise
+        finally:
+            self._depth -= 1
+            record['seconds'] = time.perf_counter() - record['start']
+            self.spans.append(record)
+
+
+class OpenTelemetryObserver(CacheObserver):
+    """
+    Emits tracing spans through OpenTelemetry.
+
+    Requires the 'opentelemetry-api' package.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        Initialize the observer.
+
+        Args:
+            tracer: OpenTelemetry tracer (default: tracer named 'crux_cache')
+        """
+        if tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError:
+                raise ImportError(
+                    "The 'opentelemetry-api' library is required for OpenTelemetryObserver. "
+                    "Install it with: pip install opentelemetry-api"
+                )
+            tracer = trace.get_tracer('crux_cache')
+        self.tracer = tracer
+
+    def span(self, name, **attributes):
+        return self.tracer.start_as_current_span(
+            name, attributes={k: v for k, v in attributes.items() if v is not None}
+        )
+
+
+def timed_batches(rows: Iterator, size: int = 4096) -> Iterator[Tuple[List, float]]:
+    """
+    Group rows into batches and measure the time spent producing each batch.
+
+    Args:
+        rows: Row iterator (e.g., a CSV parser)
+        size: Rows per batch
+
+    Yields:
+        Tuple of (batch of rows, seconds spent producing it)
+    """
+    perf_counter = time.perf_counter
+    while True:
+        start = perf_counter()
+        batch = list(islice(rows, size))
+        elapsed = perf_counter() - start
+        if not batch:
+            return
+        yield batch, elapsed
+
@@ -0,0 +1,395 @@
+"""
+SQL queries over cached months with DuckDB.
+
+CruxCache.query() exposes every month of every dataset as one table
+
+    crux(dataset VARCHAR, month VARCHAR, origin VARCHAR, rank INTEGER)
+
+that DuckDB reads directly from the cached CSV chunks. Before the query
+runs, constant predicates on dataset, month and rank in the WHERE clauses of
+the query are matched against the manifests, so only the chunks that can
+contain matching rows are downloaded and scanned:
+
+    SELECT month, count(*) FROM crux
+    WHERE dataset = 'global' AND month >= '202411' AND rank <= 1000000
+    GROUP BY month
+
+Predicates that cannot be evaluated against the manifest (functions, OR,
+subqueries, ...) do not restrict which chunks are read; they are still
+applied by DuckDB, so results are always exact.
+"""
+
+import json
+import operator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .cache import CacheManager
+from .constants import DEFAULT_JOBS
+
+TABLE_NAME = 'crux'
+
+# Comparison operators of DuckDB's serialized syntax tree
+_COMPARISONS = {
+    'COMPARE_EQUAL': '=',
+    'COMPARE_LESSTHAN': '<',
+    'COMPARE_LESSTHANOREQUALTO': '<=',
+    'COMPARE_GREATERTHAN': '>',
+    'COMPARE_GREATERTHANOREQUALTO': '>=',
+}
+
+# Operator with the column on the left of `constant <op> column`
+_FLIPPED = {'=': '=', '<': '>', '<=': '>=', '>': '<', '>=': '<='}
+
+_OPERATORS = {
+    '=': operator.eq,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# Columns whose predicates are matched against the manifest
+_PRUNED_COLUMNS = ('dataset', 'month', 'rank')
+
+
+def _import_duckdb():
+    """Import duckdb on first use."""
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError(
+            "The 'duckdb' library is required for CruxCache.query(). "
+            "Install it with: pip install duckdb"
+        )
+    return duckdb
+
+
+class TableScope:
+    """
+    Rows one reference to the crux table in a query can match.
+
+    Holds the constant predicates on dataset, month and rank of the WHERE
+    clause the table is referenced in. A scope without predicates matches
+    every row.
+    """
+
+    def __init__(self):
+        # Column name -> list of (operator, value); 'in' takes a list of values
+        self.predicates: Dict[str, List[Tuple[str, Any]]] = {column: [] for column in _PRUNED_COLUMNS}
+
+    def add(self, column: str, op: str, value: Any) -> None:
+        """Add a predicate `column <op> value` (op is '=', '<', '<=', '>', '>=' or 'in')."""
+        self.predicates[column].append((op, value))
+
+    def _matches(self, column: str, value: Any) -> bool:
+        for op, operand in self.predicates[column]:
+            if op == 'in':
+                if value not in operand:
+                    return False
+            elif not _OPERATORS[op](value, operand):
+                return False
+        return True
+
+    def matches_dataset(self, dataset: str) -> bool:
+        """Check whether rows of a dataset can match."""
+        return self._matches('dataset', dataset)
+
+    def matches_month(self, dataset: str, month: str) -> bool:
+        """Check whether rows of a dataset month can match."""
+        return self._matches('dataset', dataset) and self._matches('month', month)
+
+    def rank_bounds(self) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Get the range of ranks that can match.
+
+        Returns:
+            Tuple of (lowest, highest) matching rank, None where unbounded
+        """
+        low: Optional[int] = None
+        high: Optional[int] = None
+        for op, operand in self.predicates['rank']:
+            if op == 'in':
+                bounds = [(min(operand), max(operand))] if operand else [(1, 0)]
+            else:
+                bounds = {
+                    '=': [(operand, operand)],
+                    '<': [(None, operand - 1)],
+                    '<=': [(None, operand)],
+                    '>': [(operand + 1, None)],
+                    '>=': [(operand, None)],
+                }[op]
+            for lower, upper in bounds:
+                if lower is not None:
+                    low = lower if low is None else max(low, lower)
+                if upper is not None:
+                    high = upper if high is None else min(high, upper)
+        return low, high
+
+    def matches_chunk(self, chunk_info: Dict[str, Any]) -> bool:
+        """
+        Check whether a chunk can contain matching ranks.
+
+        Chunks without rank statistics always match.
+        """
+        low, high = self.rank_bounds()
+        if low is not None and high is not None and low > high:
+            return False
+        min_rank = chunk_info.get('min_rank')
+        max_rank = chunk_info.get('max_rank')
+        if high is not None and min_rank is not None and min_rank > high:
+            return False
+        if low is not None and max_rank is not None and max_rank < low:
+            return False
+        return True
+
+
+def _walk(node: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every object of a serialized syntax tree."""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value)
+
+
+def _is_table(node: Dict[str, Any]) -> bool:
+    return node.get('type') == 'BASE_TABLE' and node.get('table_name', '').lower() == TABLE_NAME
+
+
+def _table_refs(from_table: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Get the references to the crux table joined in a FROM clause (not in subqueries)."""
+    if not from_table:
+        return []
+    if _is_table(from_table):
+        return [from_table]
+    if from_table.get('type') == 'JOIN':
+        return _table_refs(from_table.get('left')) + _table_refs(from_table.get('right'))
+    return []
+
+
+def _conjuncts(expression: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Split a WHERE clause into the expressions combined with AND."""
+    if not expression:
+        return []
+    if expression.get('type') == 'CONJUNCTION_AND':
+        return [part for child in expression['children'] for part in _conjuncts(child)]
+    return [expression]
+
+
+def _column(expression: Dict[str, Any], qualifiers: Set[str], unqualified: bool) -> Optional[str]:
+    """Get the pruned column an expression refers to, if any."""
+    if expression.get('class') != 'COLUMN_REF':
+        return None
+    names = [name.lower() for name in expression['column_names']]
+    if len(names) == 1 and unqualified:
+        column = names[0]
+    elif len(names) == 2 and names[0] in qualifiers:
+        column = names[1]
+    else:
+        return None
+    return column if column in _PRUNED_COLUMNS else None
+
+
+def _constant(expression: Dict[str, Any], column: str) -> Any:
+    """
+    Get the value of a constant expression as the type of a column.
+
+    Raises:
+        ValueError: If the expression is not a usable constant
+    """
+    if expression.get('class') != 'CONSTANT' or expression['value'].get('is_null'):
+        raise ValueError("not a constant")
+    value = expression['value']['value']
+    return int(value) if column == 'rank' else str(value)
+
+
+def _add_predicate(scope: TableScope, expression: Dict[str, Any], qualifiers: Set[str], unqualified: bool) -> None:
+    """Add a WHERE clause conjunct to a scope if it is a constant predicate on a pruned column."""
+    kind = expression.get('type')
+    try:
+        if kind in _COMPARISONS:
+            op = _COMPARISONS[kind]
+            column = _column(expression['left'], qualifiers, unqualified)
+            if column is not None:
+                scope.add(column, op, _constant(expression['right'], column))
+                return
+            column = _column(expression['right'], qualifiers, unqualified)
+            if column is not None:
+                scope.add(column, _FLIPPED[op], _constant(expression['left'], column))
+
+        elif kind == 'COMPARE_IN':
+            column = _column(expression['children'][0], qualifiers, unqualified)
+            if column is not None:
+                scope.add(column, 'in', [_constant(child, column) for child in expression['children'][1:]])
+
+        elif kind == 'COMPARE_BETWEEN':
+            column = _column(expression['input'], qualifiers, unqualified)
+            if column is not None:
+                lower = _constant(expression['lower'], column)
+                upper = _constant(expression['upper'], column)
+                scope.add(column, '>=', lower)
+                scope.add(column, '<=', upper)
+    except (ValueError, TypeError, KeyError):
+        pass  # Not a constant predicate; DuckDB still applies it
+
+
+def table_scopes(connection, sql: str) -> List[TableScope]:
+    """
+    Find the rows each reference to the crux table in a query can match.
+
+    Args:
+        connection: DuckDB connection used to parse the query
+        sql: SELECT query
+
+    Returns:
+        One scope per reference to the crux table
+
+    Raises:
+        ValueError: If the query is not a SELECT query
+    """
+    tree = json.loads(connection.execute("SELECT json_serialize_sql(?)", [sql]).fetchone()[0])
+    if tree.get('error'):
+        # Surface syntax errors as DuckDB reports them
+        connection.extract_statements(sql)
+        raise ValueError(f"Only SELECT queries are supported: {tree.get('error_message')}")
+
+    scopes = []
+    covered = set()
+    for node in _walk(tree['statements']):
+        if node.get('type') != 'SELECT_NODE':
+            continue
+        refs = _table_refs(node.get('from_table'))
+        for ref in refs:
+            scope = TableScope()
+            qualifiers = {(ref.get('alias') or ref['table_name']).lower()}
+            # Unqualified columns can only be attributed when the table is the only one
+            unqualified = len(refs) == 1 and node['from_table'] is ref
+            for expression in _conjuncts(node.get('where_clause')):
+                _add_predicate(scope, expression, qualifiers, unqualified)
+            scopes.append(scope)
+            covered.add(id(ref))
+
+    # References in other positions (e.g. a subquery in FROM) match everything
+    for node in _walk(tree['statements']):
+        if _is_table(node) and id(node) not in covered:
+            scopes.append(TableScope())
+
+    return scopes
+
+
+def plan_chunks(cache_manager: CacheManager, scopes: List[TableScope]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+    """
+    Select the chunks a query has to read.
+
+    Args:
+        cache_manager: Cache manager to read metadata from
+        scopes: Scopes of the references to the crux table
+
+    Returns:
+        Dictionary mapping (dataset, month) to the chunk entries to read
+    """
+    plan: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    if not scopes:
+        return plan
+
+    datasets = [ds['id'] for ds in cache_manager.get_datasets_metadata().get('datasets', [])]
+    for dataset in datasets:
+        dataset_scopes = [scope for scope in scopes if scope.matches_dataset(dataset)]
+        if not dataset_scopes:
+            continue
+
+        manifest = cache_manager.get_manifest(dataset)
+        for month, month_data in sorted(manifest.get('months', {}).items()):
+            month_scopes = [scope for scope in dataset_scopes if scope.matches_month(dataset, month)]
+            chunks = [
+                chunk_info for chunk_info in month_data.get('chunks', [])
+                if any(scope.matches_chunk(chunk_info) for scope in month_scopes)
+            ]
+            if chunks:
+                plan[(dataset, month)] = chunks
+    return plan
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _read_csv(paths: List[str], header: bool) -> str:
+    """SQL reading CSV chunks as (origin, rank)."""
+    return (
+        f"read_csv([{', '.join(_sql_string(path) for path in paths)}], "
+        f"header={'true' if header else 'false'}, auto_detect=false, delim=',', quote='\"', "
+        f"columns={{'origin': 'VARCHAR', 'rank': 'INTEGER'}})"
+    )
+
+
+def create_view(connection, files: Dict[Tuple[str, str], List[Tuple[str, bool]]]) -> None:
+    """
+    Create the crux view over chunk files.
+
+    Args:
+        connection: DuckDB connection
+        files: Dictionary mapping (dataset, month) to (path, has_header) of its chunks
+    """
+    selects = []
+    for (dataset, month), chunk_files in sorted(files.items()):
+        # Only the first chunk of a month has a header row
+        for header in (True, False):
+            paths = [path for path, has_header in chunk_files if has_header == header]
+            if paths:
+                selects.append(
+                    f"SELECT {_sql_string(dataset)} AS dataset, {_sql_string(month)} AS month, "
+                    f"origin, \"rank\" FROM {_read_csv(paths, header)}"
+                )
+
+    if not selects:
+        selects.append(
+            "SELECT NULL::VARCHAR AS dataset, NULL::VARCHAR AS month, "
+            "NULL::VARCHAR AS origin, NULL::INTEGER AS \"rank\" WHERE false"
+        )
+
+    connection.execute(f"CREATE OR REPLACE TEMP VIEW {TABLE_NAME} AS\n" + "\nUNION ALL\n".join(selects))
+
+
+def query(cache_manager: CacheManager, sql: str, connection=None, jobs: int = DEFAULT_JOBS):
+    """
+    Run a SQL query over the crux table (see module docstring).
+
+    Args:
+        cache_manager: Cache manager to read metadata and chunks from
+        sql: SELECT query
+        connection: DuckDB connection to run the query on (default: a new
+                    in-memory database). The crux view is created as a
+                    temporary view on it.
+        jobs: Parallel chunk downloads
+
+    Returns:
+        DuckDB relation with the result (e.g. .fetchall(), .df(), .arrow())
+    """
+    duckdb = _import_duckdb()
+    if connection is None:
+        connection = duckdb.connect()
+
+    plan = plan_chunks(cache_manager, table_scopes(connection, sql))
+
+    observer = cache_manager.observer
+    with observer.span('crux.query', months=len(plan), chunks=sum(len(c) for c in plan.values())):
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                key: [
+                    (executor.submit(cache_manager.get_data_file, key[0], c['filename'], c.get('size')),
+                     c.get('chunk') == 1)
+                    for c in chunks
+                ]
+                for key, chunks in plan.items()
+            }
+            files = {
+                key: [(future.result(), has_header) for future, has_header in chunk_futures]
+                for key, chunk_futures in futures.items()
+            }
+
+    create_view(connection, files)
+    return connection.sql(sql)
@@ -0,0 +1,251 @@
+"""
+Months published once and shared by all processes on a host.
+
+A pre-fork web server that calls load_month() in every worker holds one copy
+of the month per worker. publish() instead builds the month's indexed
+CruxTable once as a derived artifact and records it in a small pointer file,
+resident/<dataset>.json in the cache directory. Workers attach with a
+ResidentMonth, which maps the table read-only: every process shares the same
+page cache pages, so resident memory stays flat however many workers run.
+
+Publishing a new month (or republishing one rewritten upstream) replaces the
+pointer atomically and increases its version. Attached processes check the
+pointer at most once per check interval and swap to the new table on their
+next lookup; iterations already running finish on the table they started
+with. Published tables are never evicted from derived/.
+"""
+
+import os
+import json
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Set, Tuple
+
+from .constants import DEFAULT_RESIDENT_CHECK_INTERVAL, RESIDENT_DIR
+from .derived import LOCK_SUFFIX, PART_SUFFIX, TableBuilder
+from .exceptions import CacheError
+from .locks import FileLock
+
+if TYPE_CHECKING:
+    from .client import CruxCache
+    from .table import CruxTable
+
+
+def _pointer_path(cache_dir: str, dataset_type: str) -> str:
+    return os.path.join(cache_dir, RESIDENT_DIR, f"{dataset_type}.json")
+
+
+def _read_pointer(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        raise CacheError(f"Failed to read {path}: {e}")
+
+
+def publish(
+    cache: 'CruxCache',
+    dataset_type: str,
+    month: Optional[str] = None,
+    max_rank: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build a month's indexed table (if needed) and make it the published month of its dataset.
+
+    Args:
+        cache: Client whose cache directory holds the table
+        dataset_type: Dataset type (e.g., 'global', 'us')
+        month: Month in YYYYMM format. If None, uses the latest month.
+        max_rank: Only include origins with rank <= max_rank
+
+    Returns:
+        Pointer record: 'dataset_type', 'month', 'max_rank', 'path' of the table,
+        'version' (increased whenever the published table changes) and 'published'
+        (Unix time)
+
+    Raises:
+        DatasetNotFoundError: If the dataset type does not exist
+        MonthNotFoundError: If the specified month is not available
+        CacheError: If the table or the pointer cannot be written
+    """
+    dataset = cache.get_dataset(dataset_type, month=month, max_rank=max_rank)
+    builder = TableBuilder(index=True)
+    cache.artifacts.get(builder, dataset)
+    path = cache.artifacts.path(builder, dataset)
+
+    pointer_path = _pointer_path(cache.cache_manager.cache_dir, dataset_type)
+    with FileLock(pointer_path + LOCK_SUFFIX):
+        current = _read_pointer(pointer_path)
+        if current is not None and current.get('path') == path:
+            return current
+
+        pointer = {
+            'dataset_type': dataset_type,
+            'month': dataset.month,
+            'max_rank': max_rank,
+            'path': path,
+            'version': (current or {}).get('version', 0) + 1,
+            'published': time.time(),
+        }
+        part_path = pointer_path + PART_SUFFIX
+        try:
+            with open(part_path, 'w', encoding='utf-8') as f:
+                json.dump(pointer, f, indent=2)
+            os.replace(part_path, pointer_path)
+        except OSError as e:
+            raise CacheError(f"Failed to write {pointer_path}: {e}")
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    return pointer
+
+
+def published(cache_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the pointer records of all published months in a cache directory.
+
+    Args:
+        cache_dir: Cache directory
+
+    Returns:
+        Dictionary mapping dataset types to their pointer record (see publish)
+    """
+    directory = os.path.join(cache_dir, RESIDENT_DIR)
+    if not os.path.isdir(directory):
+        return {}
+    pointers = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.json'):
+            pointer = _read_pointer(os.path.join(directory, filename))
+            if pointer is not None:
+                pointers[pointer['dataset_type']] = pointer
+    return pointers
+
+
+def published_paths(cache_dir: str) -> Set[str]:
+    """Paths of the tables of all published months (kept when derived artifacts are pruned)."""
+    try:
+        return {pointer['path'] for pointer in published(cache_dir).values()}
+    except CacheError:
+        return set()
+
+
+class ResidentMonth:
+    """
+    Read-only view of the published month of a dataset, shared between processes.
+
+    Lookups go to the memory-mapped table of the month currently published
+    with CruxCache.publish_month(); when a newer version is published, the
+    view swaps to it within check_interval seconds.
+
+    Example:
+        >>> # Once, e.g. in the server's master process or a cron job
+        >>> cache.publish_month('global')
+        >>> # In every worker
+        >>> resident = cache.attach_month('global')
+        >>> resident.rank('https://www.google.com')
+        1000
+    """
+
+    def __init__(self, cache_dir: str, dataset_type: str, check_interval: float = DEFAULT_RESIDENT_CHECK_INTERVAL):
+        """
+        Initialize the view; the table is mapped on first use.
+
+        Args:
+            cache_dir: Cache directory the month is published in
+            dataset_type: Dataset type (e.g., 'global', 'us')
+            check_interval: Seconds between checks for a newly published version
+                            (0: check at every lookup)
+        """
+        self.cache_dir = cache_dir
+        self.dataset_type = dataset_type
+        self.check_interval = check_interval
+        self.pointer: Optional[Dict[str, Any]] = None
+        self._pointer_path = _pointer_path(cache_dir, dataset_type)
+        self._pointer_stat: Optional[Tuple[int, int, int]] = None
+        self._table: Optional['CruxTable'] = None
+        self._next_check = 0.0
+
+    def refresh(self) -> bool:
+        """
+        Check for a newly published version now and swap to it.
+
+        Returns:
+            True if the view swapped to another table
+
+        Raises:
+            CacheError: If no month is published for the dataset, or its table is missing
+        """
+        from .table import CruxTable
+
+        self._next_check = time.monotonic() + self.check_interval
+        try:
+            stat = os.stat(self._pointer_path)
+        except FileNotFoundError:
+            if self._table is not None:
+                return False  # Unpublished: keep serving the last version
+            raise CacheError(f"No month is published for {self.dataset_type} in {self.cache_dir}")
+        stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stat_key == self._pointer_stat:
+            return False
+
+        pointer = _read_pointer(self._pointer_path)
+        self._pointer_stat = stat_key
+        if pointer is None or (self.pointer is not None and pointer['version'] == self.pointer['version']):
+            return False
+
+        try:
+            table = CruxTable.open(pointer['path'])
+        except FileNotFoundError:
+            if self._table is not None:
+                return False
+            raise CacheError(
+                f"Table of the published {self.dataset_type} month {pointer['month']} is missing; publish it again"
+            )
+        # The previous table stays mapped until iterations still using it finish
+        self._table = table
+        self.pointer = pointer
+        return True
+
+    @property
+    def table(self) -> 'CruxTable':
+        """Table of the currently published month."""
+        if self._table is None or time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._table
+
+    @property
+    def month(self) -> str:
+        return self.table.month
+
+    @property
+    def version(self) -> int:
+        self.table  # Attach or refresh
+        return self.pointer['version']
+
+    def rank(self, origin: str) -> Optional[int]:
+        """Get the rank of an origin in the published month, or None if it is not in it."""
+        return self.table.rank(origin)
+
+    def get(self, origin: str, default: Any = None) -> Any:
+        """Get the rank of an origin, or default if it is not in the month."""
+        return self.table.get(origin, default)
+
+    def __contains__(self, origin: object) -> bool:
+        return origin in self.table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        """Iterate over the (origin, rank) rows of the month published when iteration starts."""
+        return iter(self.table)
+
+    def __repr__(self) -> str:
+        if self.pointer is None:
+            return f"ResidentMonth(dataset_type='{self.dataset_type}', cache_dir='{self.cache_dir}')"
+        return (
+            f"ResidentMonth(dataset_type='{self.dataset_type}', month='{self.pointer['month']}', "
+            f"version={self.pointer['version']})"
+        )
@@ -0,0 +1,80 @@
+"""Retry policy for downloads."""
+
+import random
+import threading
+from typing import Optional
+
+from .constants import DEFAULT_RETRY_ATTEMPTS, DEFAULT_RETRY_BACKOFF, DEFAULT_RETRY_MAX_BACKOFF
+
+
+class RetryPolicy:
+    """
+    How the cache retries and hedges downloads.
+
+    Transient failures (connection errors, stalled transfers, HTTP 429 and 5xx)
+    are retried with exponential backoff and full jitter: before retry n, the
+    cache sleeps a random time between 0 and min(max_backoff, backoff * 2^(n-1))
+    seconds. Interrupted data files resume where they stopped.
+
+    With hedge_after, a data file still downloading after that many seconds
+    gets a second, duplicate request; whichever finishes first is used and
+    the other is cancelled. This bounds the time one stuck connection adds to
+    a month download.
+
+    Example:
+        >>> cache = CruxCache(retry=RetryPolicy(attempts=6, hedge_after=20))
+        >>> cache = CruxCache(retry=RetryPolicy.none())  # single attempt, fail fast
+    """
+
+    def __init__(
+        self,
+        attempts: int = DEFAULT_RETRY_ATTEMPTS,
+        backoff: float = DEFAULT_RETRY_BACKOFF,
+        max_backoff: float = DEFAULT_RETRY_MAX_BACKOFF,
+        hedge_after: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            attempts: Attempts per file, including the first (1 disables retries)
+            backoff: Maximum sleep in seconds before the first retry
+            max_backoff: Cap of the maximum sleep in seconds
+            hedge_after: Seconds after which a data file download still running gets a
+                         hedged duplicate request (None: no hedging)
+            seed: Seed of the jitter, for reproducible delays
+        """
+        if attempts < 1:
+            raise ValueError(f"attempts must be at least 1, got {attempts}")
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def none(cls) -> 'RetryPolicy':
+        """Policy making a single attempt per file without hedging."""
+        return cls(attempts=1)
+
+    def delay(self, retry: int) -> float:
+        """
+        Get the sleep before a retry.
+
+        Args:
+            retry: Number of the retry (1 for the first)
+
+        Returns:
+            Seconds to sleep
+        """
+        cap = min(self.max_backoff, self.backoff * 2 ** (retry - 1))
+        with self._lock:
+            return self._random.uniform(0, cap)
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryPolicy(attempts={self.attempts}, backoff={self.backoff}, "
+            f"max_backoff={self.max_backoff}, hedge_after={self.hedge_after})"
+        )
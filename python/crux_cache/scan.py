@@ -0,0 +1,348 @@
+"""
+Several aggregations over one pass of a dataset month.
+
+Running each report as its own `for origin, rank in dataset` loop parses the
+month once per report. scan() parses it once and feeds every batch of rows
+to all reducers (counters, group-bys, collectors, writers), so N reports cost
+one parse plus N cheap reductions.
+
+Mergeable reducers (fork() and merge()) also run in parallel: with
+workers > 1, each chunk is parsed in a worker process that feeds forks of
+the reducers, and the forks are merged back in chunk order. Order-dependent
+reducers such as WriteCSV keep the scan in one process.
+"""
+
+import csv
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import IO, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .binfmt import BinaryChunk
+from .dataset import CruxDataset, open_csv_chunk, parse_csv_chunk
+from .delta import resolve_chain
+from .export import tld_of
+
+Row = Tuple[str, int]
+Predicate = Callable[[str, int], bool]
+
+# Rows per batch fed to the reducers in worker processes
+BATCH_ROWS = 4096
+
+
+def _rank(origin: str, rank: int) -> int:
+    return rank
+
+
+def _tld(origin: str, rank: int) -> str:
+    return tld_of(origin)
+
+
+def _scheme(origin: str, rank: int) -> str:
+    return origin.split('://', 1)[0]
+
+
+# Named keys of CountBy
+KEYS: Dict[str, Callable[[str, int], Any]] = {'rank': _rank, 'tld': _tld, 'scheme': _scheme}
+
+
+class Reducer(ABC):
+    """
+    Consumer of the rows of a scan.
+
+    update() receives batches of (origin, rank) rows in dataset order and
+    result() returns the reducer's output after the scan. close() is called
+    once the scan ends, also when it fails.
+    """
+
+    @abstractmethod
+    def update(self, batch: List[Row]) -> None:
+        """Consume a batch of rows."""
+
+    @abstractmethod
+    def result(self) -> Any:
+        """Get the output of the reducer."""
+
+    def close(self) -> None:
+        """Release resources held by the reducer (e.g. open files)."""
+
+
+class MergeableReducer(Reducer):
+    """
+    Reducer that can be split and merged, so it can run in worker processes.
+
+    Mergeable reducers must be picklable, so predicates and key functions have
+    to be module-level functions rather than lambdas.
+    """
+
+    @abstractmethod
+    def fork(self) -> 'MergeableReducer':
+        """Get an empty reducer with the same configuration, to consume one chunk."""
+
+    @abstractmethod
+    def merge(self, other: 'MergeableReducer') -> None:
+        """Add the state of a fork that consumed the rows following the ones consumed so far."""
+
+
+class Count(MergeableReducer):
+    """Counts the rows (matching a predicate)."""
+
+    def __init__(self, where: Optional[Predicate] = None):
+        """
+        Args:
+            where: Only count rows for which where(origin, rank) is true
+        """
+        self.where = where
+        self.count = 0
+
+    def update(self, batch):
+        if self.where is None:
+            self.count += len(batch)
+        else:
+            where = self.where
+            self.count += sum(1 for origin, rank in batch if where(origin, rank))
+
+    def result(self):
+        return self.count
+
+    def fork(self):
+        return Count(self.where)
+
+    def merge(self, other):
+        self.count += other.count
+
+
+class CountBy(MergeableReducer):
+    """Counts the rows (matching a predicate) per key."""
+
+    def __init__(self, key: Union[str, Callable[[str, int], Any]], where: Optional[Predicate] = None):
+        """
+        Args:
+            key: 'rank', 'tld', 'scheme' or a function key(origin, rank)
+            where: Only count rows for which where(origin, rank) is true
+        """
+        if isinstance(key, str) and key not in KEYS:
+            raise ValueError(f"key must be one of {list(KEYS)} or a function, got {key!r}")
+        self.key = key
+        self.where = where
+        self.counts: Counter = Counter()
+
+    def update(self, batch):
+        key = KEYS.get(self.key, self.key) if isinstance(self.key, str) else self.key
+        where = self.where
+        self.counts.update(key(origin, rank) for origin, rank in batch if where is None or where(origin, rank))
+
+    def result(self):
+        return dict(self.counts)
+
+    def fork(self):
+        return CountBy(self.key, self.where)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+
+
+class Collect(MergeableReducer):
+    """Collects the rows (matching a predicate) in dataset order."""
+
+    def __init__(self, where: Optional[Predicate] = None, limit: Optional[int] = None):
+        """
+        Args:
+            where: Only collect rows for which where(origin, rank) is true
+            limit: Stop after this many rows
+        """
+        self.where = where
+        self.limit = limit
+        self.rows: List[Row] = []
+
+    def update(self, batch):
+        if self.limit is not None and len(self.rows) >= self.limit:
+            return
+        where = self.where
+        self.rows.extend(row for row in batch if where is None or where(*row))
+        if self.limit is not None:
+            del self.rows[self.limit:]
+
+    def result(self):
+        return self.rows
+
+    def fork(self):
+        return Collect(self.where, self.limit)
+
+    def merge(self, other):
+        self.update(other.rows)
+
+
+class WriteCSV(Reducer):
+    """Writes the rows (matching a predicate) as 'origin,rank' lines; keeps the scan in one process."""
+
+    def __init__(self, file: Union[str, IO[str]], where: Optional[Predicate] = None, header: bool = True):
+        """
+        Args:
+            file: Path or text file object to write to
+            where: Only write rows for which where(origin, rank) is true
+            header: Write an 'origin,rank' header first
+        """
+        self.file = file
+        self.where = where
+        self.rows = 0
+        # Opened here, so a scan without rows still writes the header
+        self._handle: Optional[IO[str]] = None
+        if isinstance(file, str):
+            self._handle = open(file, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._handle or file, lineterminator='\n')
+        if header:
+            self._writer.writerow(['origin', 'rank'])
+
+    def update(self, batch):
+        rows = batch if self.where is None else [row for row in batch if self.where(*row)]
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def result(self):
+        """Get the number of rows written."""
+        return self.rows
+
+    def close(self):
+        """Close the file if it was opened from a path."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+Reducers = Union[Dict[str, Reducer], Sequence[Reducer]]
+
+
+def _scan_chunk(
+    path: str,
+    end: Optional[int],
+    skip_header: bool,
+    binary: bool,
+    max_rank: Optional[int],
+    reducers: List[MergeableReducer]
+) -> Tuple[List[MergeableReducer], int, float]:
+    """
+    Feed the rows of one chunk to reducers (in a worker process).
+
+    Returns:
+        Tuple of (reducers, rows, seconds spent reading, parsing and reducing)
+    """
+    start = time.perf_counter()
+    stream = None
+    if binary:
+        chunk = BinaryChunk(path)
+        rows = chunk.iter_rows(0, chunk.count_up_to(max_rank))
+    else:
+        stream, _ = open_csv_chunk(path, end)
+        rows = parse_csv_chunk(stream, skip_header, max_rank)
+
+    count = 0
+    try:
+        while True:
+            batch = list(islice(rows, BATCH_ROWS))
+            if not batch:
+                break
+            count += len(batch)
+            for reducer in reducers:
+                reducer.update(batch)
+    finally:
+        if stream is not None:
+            stream.close()
+    return reducers, count, time.perf_counter() - start
+
+
+def _scan_parallel(dataset: CruxDataset, reducers: List[MergeableReducer], workers: int) -> int:
+    """Feed forks of the reducers chunk by chunk in worker processes and merge them in order."""
+    cache_manager = dataset.cache_manager
+    observer = cache_manager.observer
+    rows = 0
+
+    def merge(parts: List[MergeableReducer], count: int, seconds: float) -> None:
+        nonlocal rows
+        for reducer, part in zip(reducers, parts):
+            reducer.merge(part)
+        rows += count
+        observer.on_rows_parsed(dataset.dataset_type, dataset.month, count, seconds)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque = deque()
+        try:
+            for chunk_idx, chunk_info in dataset._planned_chunks():
+                binary = dataset.data_format == 'binary' and 'binary' in chunk_info
+                source = chunk_info['binary'] if binary else chunk_info
+                # Chunks are downloaded here while the workers parse earlier ones
+                path = cache_manager.get_data_file(dataset.dataset_type, source['filename'], source.get('size'))
+                pending.append(executor.submit(
+                    _scan_chunk, path, None if binary else dataset._prefix_end(chunk_info),
+                    chunk_idx == 0, binary, dataset.max_rank, [reducer.fork() for reducer in reducers]
+                ))
+                if len(pending) >= 2 * workers:
+                    merge(*pending.popleft().result())
+            while pending:
+                merge(*pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+    return rows
+
+
+def scan(dataset: CruxDataset, reducers: Reducers, workers: int = 1) -> Union[Dict[str, Any], List[Any]]:
+    """
+    Feed all reducers from a single pass over a dataset month.
+
+    Args:
+        dataset: Month to scan (its max_rank, data_format and use_deltas apply)
+        reducers: Reducers by name, or a list of reducers
+        workers: Processes parsing chunks in parallel. Applies when all reducers are
+                 MergeableReducers and the month is read from its chunks (not reconstructed
+                 from deltas); otherwise the scan runs in this process.
+
+    Returns:
+        Results of the reducers, by name or in list order
+
+    Example:
+        >>> results = scan(cache.get_dataset('global'), {
+        ...     'total': Count(),
+        ...     'per_tld': CountBy('tld'),
+        ...     'per_rank': CountBy('rank'),
+        ...     'top_http': Collect(where=is_http, limit=100),
+        ... }, workers=4)
+    """
+    named = isinstance(reducers, dict)
+    items = list(reducers.values()) if named else list(reducers)
+
+    try:
+        parallel = workers > 1 and all(isinstance(reducer, MergeableReducer) for reducer in items)
+        if parallel and dataset.use_deltas:
+            # Months rebuilt from a base month plus deltas are a single stream
+            _, chain = resolve_chain(dataset.manifest, dataset.month, dataset._is_month_cached)
+            parallel = not chain
+
+        observer = dataset.cache_manager.observer
+        observer.on_iteration_start(dataset.dataset_type, dataset.month, sum(1 for _ in dataset._planned_chunks()))
+        start = time.perf_counter()
+        rows = 0
+        try:
+            if parallel:
+                rows = _scan_parallel(dataset, items, workers)
+            else:
+                for batch in dataset._iter_batches():
+                    rows += len(batch)
+                    for reducer in items:
+                        reducer.update(batch)
+        finally:
+            observer.on_iteration_end(dataset.dataset_type, dataset.month, rows, time.perf_counter() - start)
+
+        results = [reducer.result() for reducer in items]
+    finally:
+        for reducer in items:
+            reducer.close()
+    return dict(zip(reducers, results)) if named else results
+
+
+def is_http(origin: str, rank: int) -> bool:
+    """Predicate matching origins served over plain HTTP (an example for where=)."""
+    return origin.startswith('http://')
+
@@ -0,0 +1,266 @@
+"""Storage backends the cache reads data files from."""
+
+import os
+import time
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from .constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_MIN_THROUGHPUT, DEFAULT_STALL_SECONDS, GITHUB_RAW_BASE_URL
+from .exceptions import DownloadError, TransientDownloadError
+
+# HTTP statuses worth retrying
+TRANSIENT_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class StorageBackend(ABC):
+    """
+    Source of the data/ tree (datasets.json, manifests and chunk files).
+
+    Paths are relative to the repository root, e.g. 'data/global/202510_1.csv'.
+    """
+
+    #: Human readable location, used in error messages and spans
+    location = ""
+
+    def local_path(self, relative_path: str) -> Optional[str]:
+        """
+        Get a path the file can be read from in place, without copying.
+
+        Args:
+            relative_path: Relative path in the repository
+
+        Returns:
+            Local path, or None if the file has to be fetched into the cache
+
+        Raises:
+            DownloadError: If the backend is local and the file does not exist
+        """
+        return None
+
+    @abstractmethod
+    def fetch(
+        self,
+        relative_path: str,
+        destination: str,
+        validators: Optional[Dict[str, str]] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Copy a file into the cache.
+
+        Args:
+            relative_path: Relative path in the repository
+            destination: Local path to save the file
+            validators: Validators of the cached copy ('etag', 'last_modified'), if any.
+                        Backends that support conditional requests skip unchanged files.
+                        Without validators, an existing partial destination file may be
+                        resumed.
+            cancel: Event set to abort the transfer (with TransientDownloadError), e.g.
+                    when a hedged duplicate request finished first
+
+        Returns:
+            Dictionary with 'size' (bytes fetched) and the new validators ('etag',
+            'last_modified') if known, or None if the cached copy is still current
+
+        Raises:
+            TransientDownloadError: If the transfer failed in a way worth retrying
+            DownloadError: If the file cannot be fetched
+        """
+
+    def url(self, relative_path: str) -> str:
+        """Full URL of a file, for error messages and spans."""
+        return f"{self.location}/{relative_path}"
+
+
+def _import_requests():
+    """
+    Import requests on first use.
+
+    Importing requests (and urllib3, ssl, ...) takes longer than the rest of
+    the package, and is not needed for cached or local data.
+    """
+    try:
+        import requests
+    except ImportError:
+        raise ImportError(
+            "The 'requests' library is required. Install it with: pip install requests"
+        )
+    return requests
+
+
+class HTTPStorage(StorageBackend):
+    """
+    Downloads files over HTTP(S), from GitHub or a mirror of it.
+
+    Instead of a fixed timeout for the whole transfer, a download is
+    considered stalled when its throughput over stall_seconds falls below
+    min_throughput (or no data arrives for stall_seconds), so large files on
+    slow but healthy connections complete while stuck connections are
+    abandoned quickly and retried by the cache.
+    """
+
+    def __init__(
+        self,
+        base_url: str = GITHUB_RAW_BASE_URL,
+        timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        stall_seconds: float = DEFAULT_STALL_SECONDS,
+        min_throughput: float = DEFAULT_MIN_THROUGHPUT
+    ):
+        """
+        Initialize the backend.
+
+        Args:
+            base_url: URL of the repository root (the directory containing data/)
+            timeout: Connection timeout in seconds
+            stall_seconds: Window over which throughput is measured, and the longest
+                           wait for data
+            min_throughput: Bytes per second below which a transfer counts as stalled
+        """
+        self.base_url = base_url.rstrip('/')
+        self.location = self.base_url
+        self.timeout = timeout
+        self.stall_seconds = stall_seconds
+        self.min_throughput = min_throughput
+
+    def fetch(self, relative_path, destination, validators=None, cancel=None):
+        requests = _import_requests()
+        url = self.url(relative_path)
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        # Resume an interrupted download of an immutable file
+        offset = 0
+        if not validators and os.path.exists(destination):
+            offset = os.path.getsize(destination)
+            if offset:
+                headers['Range'] = f'bytes={offset}-'
+
+        size = 0
+        response = None
+        try:
+            # Ensure parent directory exists
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+            # Download with streaming to handle large files
+            response = requests.get(url, stream=True, timeout=(self.timeout, self.stall_seconds), headers=headers)
+            if response.status_code == 304 and validators:
+                return None
+            if response.status_code == 416 and offset:
+                # The partial file is already complete (or longer than the file)
+                return {'size': 0, 'etag': None, 'last_modified': None}
+            if response.status_code in TRANSIENT_STATUSES:
+                raise TransientDownloadError(f"Failed to download {url}: HTTP {response.status_code}")
+            response.raise_for_status()
+
+            # Servers without range support send the whole file
+            resumed = offset and response.status_code == 206
+
+            # Write to file, measuring throughput over windows of stall_seconds
+            window_start = time.monotonic()
+            window_bytes = 0
+            with open(destination, 'ab' if resumed else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    if cancel is not None and cancel.is_set():
+                        raise TransientDownloadError(f"Download of {url} cancelled")
+                    if chunk:
+                        f.write(chunk)
+                        size += len(chunk)
+                        window_bytes += len(chunk)
+
+                    elapsed = time.monotonic() - window_start
+                    if elapsed >= self.stall_seconds:
+                        if window_bytes / elapsed < self.min_throughput:
+                            raise TransientDownloadError(
+                                f"Download of {url} stalled ({window_bytes / elapsed / 1024:.1f} KB/s "
+                                f"over {elapsed:.1f}s)"
+                            )
+                        window_start += elapsed
+                        window_bytes = 0
+        except DownloadError:
+            raise
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            raise TransientDownloadError(f"Failed to download {url}: {e}")
+        except requests.RequestException as e:
+            raise DownloadError(f"Failed to download {url}: {e}")
+        except Exception as e:
+            raise DownloadError(f"Failed to save file to {destination}: {e}")
+        finally:
+            if response is not None:
+                response.close()
+        return {
+            'size': size,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+
+    def __repr__(self) -> str:
+        return f"HTTPStorage('{self.base_url}')"
+
+
+class LocalStorage(StorageBackend):
+    """
+    Reads files in place from a local checkout of the repository.
+
+    Useful for a copy of data/ on a shared filesystem: chunks are never
+    copied into the cache directory, and the client works fully offline.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the backend.
+
+        Args:
+            root: Directory containing data/
+
+        Raises:
+            DownloadError: If the directory does not exist
+        """
+        self.root = os.path.abspath(root)
+        self.location = self.root
+        if not os.path.isdir(self.root):
+            raise DownloadError(f"Data source directory {self.root} does not exist")
+
+    def local_path(self, relative_path: str) -> Optional[str]:
+        path = os.path.join(self.root, relative_path)
+        if not os.path.isfile(path):
+            raise DownloadError(f"File {relative_path} not found in {self.root}")
+        return path
+
+    def fetch(self, relative_path, destination, validators=None, cancel=None):
+        # Files are always read in place (see local_path)
+        raise DownloadError(f"LocalStorage does not copy files ({relative_path})")
+
+    def url(self, relative_path: str) -> str:
+        return os.path.join(self.root, relative_path)
+
+    def __repr__(self) -> str:
+        return f"LocalStorage('{self.root}')"
+
+
+def storage_from_source(source: Optional[str]) -> StorageBackend:
+    """
+    Create the storage backend for a data source.
+
+    Args:
+        source: HTTP(S) base URL of GitHub or a mirror, file:// URL or local
+                directory containing data/. None uses GitHub.
+
+    Returns:
+        Storage backend
+    """
+    if source is None:
+        return HTTPStorage()
+
+    parsed = urlparse(source)
+    if parsed.scheme in ('http', 'https'):
+        return HTTPStorage(source)
+    if parsed.scheme == 'file':
+        return LocalStorage(url2pathname(parsed.path))
+    return LocalStorage(source)
@@ -0,0 +1,251 @@
+"""
+Reverse-hostname index of one dataset month.
+
+Months are sorted by rank, then origin, so finding every origin under a
+domain (e.g. *.example.co.uk) means scanning the whole month. A SuffixIndex
+sorts the origins by their hostname with the labels reversed
+('https://shop.example.co.uk' -> 'uk.co.example.shop.'), which puts a domain
+and all its subdomains in one contiguous range. by_suffix() finds the range
+with two binary searches and reads only its rows.
+
+Entries are stored as '<reversed host>\\t<origin>' in one packed buffer with
+an offsets array and a rank code per entry, like a CruxTable, and an index
+can be saved and memory-mapped the same way.
+"""
+
+import json
+import struct
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, chain
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .table import CruxTable, _map_sections, _write_sections
+
+MAGIC = b'CRUXSFX1'
+
+# magic, entries, buffer size, distinct ranks, offset item size, metadata size
+HEADER = struct.Struct('<8sQQIII')
+
+# Separates the reversed host from the origin in an entry; sorts before every hostname character
+_SEPARATOR = b'\t'
+
+# Sorts after every byte of a UTF-8 encoded origin
+_AFTER_ORIGINS = b'\xff'
+
+
+def reverse_host(origin: bytes) -> bytes:
+    """
+    Get the hostname of a UTF-8 encoded origin with its labels reversed.
+
+    Args:
+        origin: Origin (e.g., b'https://shop.example.co.uk:8443')
+
+    Returns:
+        Reversed labels followed by a dot (e.g., b'uk.co.example.shop.')
+    """
+    host = origin.split(b'://', 1)[-1]
+    if host.startswith(b'['):
+        # IPv6 literal: a single label
+        return host[:host.find(b']') + 1] + b'.'
+    host = host.split(b':', 1)[0].rstrip(b'.')
+    return b'.'.join(reversed(host.split(b'.'))) + b'.'
+
+
+def _suffix_key(suffix: str) -> Tuple[bytes, bool]:
+    """Get the reversed form of a domain suffix and whether the domain itself is excluded ('*.')."""
+    suffix = suffix.strip().lower()
+    if '://' in suffix:
+        suffix = suffix.split('://', 1)[1]
+    subdomains_only = suffix.startswith('*.')
+    suffix = suffix.lstrip('*').strip('.')
+    if not suffix:
+        raise ValueError("Empty domain suffix")
+    return reverse_host(suffix.encode('utf-8')), subdomains_only
+
+
+class SuffixIndex:
+    """
+    Origins of one dataset month sorted by reversed hostname.
+
+    Build one with CruxCache.load_suffix_index() or SuffixIndex.from_table(),
+    or open a saved index with SuffixIndex.open().
+
+    Example:
+        >>> index = cache.load_suffix_index('global', persist=True)
+        >>> for origin, rank in index.by_suffix('example.co.uk', max_rank=100000):
+        ...     print(origin, rank)
+        >>> index.count('*.blogspot.com')
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytes, bytearray, memoryview],
+        offsets: Union[array, memoryview],
+        codes: Union[bytes, bytearray, memoryview],
+        rank_values: List[int],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize an index from its arrays (see from_table and open).
+
+        Args:
+            buffer: Entries '<reversed host>\\t<origin>' as UTF-8 in ascending order,
+                    each followed by a newline
+            offsets: Start of every entry in buffer, plus the end of the buffer
+            codes: Index into rank_values for every entry
+            rank_values: Distinct ranks, ascending
+            metadata: Dataset, month and max_rank the index was built from
+        """
+        self._buffer = memoryview(buffer)
+        self._offsets = offsets
+        self._codes = codes
+        self.rank_values = list(rank_values)
+        self.metadata = metadata or {}
+        self._mmap = None
+
+    @property
+    def dataset_type(self) -> Optional[str]:
+        return self.metadata.get('dataset_type')
+
+    @property
+    def month(self) -> Optional[str]:
+        return self.metadata.get('month')
+
+    @classmethod
+    def from_table(cls, table: CruxTable) -> 'SuffixIndex':
+        """
+        Build an index from the table of a month.
+
+        Args:
+            table: Table of the month
+
+        Returns:
+            SuffixIndex
+        """
+        origins = table._buffer.tobytes().split(b'\n')
+        origins.pop()  # After the last newline
+        entries = [reverse_host(origin) + _SEPARATOR + origin for origin in origins]
+        del origins
+
+        order = sorted(range(len(entries)), key=entries.__getitem__)
+        buffer = b''.join(chain.from_iterable((entries[row], b'\n') for row in order))
+        codes = bytes(table._codes[row] for row in order)
+
+        offsets = array('I' if len(buffer) < 2 ** 32 else 'Q', [0])
+        offsets.extend(accumulate(len(entries[row]) + 1 for row in order))
+
+        metadata = {key: table.metadata.get(key) for key in ('dataset_type', 'month', 'max_rank')}
+        return cls(buffer, offsets, codes, table.rank_values, metadata)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the index's arrays in bytes."""
+        return self._buffer.nbytes + len(self._offsets) * self._offsets.itemsize + len(self._codes)
+
+    def _entry(self, row: int) -> bytes:
+        return self._buffer[self._offsets[row]:self._offsets[row + 1] - 1].tobytes()
+
+    def _bisect(self, key: bytes) -> int:
+        """First entry >= key."""
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self._entry(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _range(self, suffix: str) -> Tuple[int, int]:
+        """Entries whose hostname ends with a domain suffix, as (first, last + 1)."""
+        key, subdomains_only = _suffix_key(suffix)
+        # Entries of the domain itself ('<key>\t...') come first; '*.' skips them
+        start = self._bisect(key + _SEPARATOR + _AFTER_ORIGINS if subdomains_only else key)
+        end = self._bisect(key[:-1] + bytes([key[-1] + 1]))
+        return start, end
+
+    def _max_code(self, max_rank: Optional[int]) -> int:
+        return len(self.rank_values) if max_rank is None else bisect_right(self.rank_values, max_rank)
+
+    def by_suffix(self, suffix: str, max_rank: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+        """
+        Find the origins of a domain and its subdomains.
+
+        Args:
+            suffix: Domain (e.g., 'example.co.uk' for example.co.uk and all its
+                    subdomains, '*.example.co.uk' for the subdomains only)
+            max_rank: Only origins with rank <= max_rank
+
+        Yields:
+            (origin, rank) tuples, ordered by reversed hostname (so each subdomain's
+            origins are adjacent)
+
+        Example:
+            >>> sorted(index.by_suffix('google.com', max_rank=1000), key=lambda row: row[1])
+        """
+        start, end = self._range(suffix)
+        max_code = self._max_code(max_rank)
+        for row in range(start, end):
+            code = self._codes[row]
+            if code < max_code:
+                origin = self._entry(row).split(_SEPARATOR, 1)[1]
+                yield origin.decode('utf-8'), self.rank_values[code]
+
+    def count(self, suffix: str, max_rank: Optional[int] = None) -> int:
+        """Count the origins by_suffix() would yield."""
+        start, end = self._range(suffix)
+        max_code = self._max_code(max_rank)
+        if max_code == len(self.rank_values):
+            return end - start
+        return sum(1 for code in self._codes[start:end] if code < max_code)
+
+    def save(self, path: str) -> None:
+        """
+        Save the index to a file that open() maps into memory.
+
+        Args:
+            path: File to write
+        """
+        metadata = json.dumps({**self.metadata, 'rank_values': self.rank_values}).encode('utf-8')
+        header = HEADER.pack(
+            MAGIC, len(self), self._buffer.nbytes, len(self.rank_values),
+            self._offsets.itemsize, len(metadata)
+        )
+        _write_sections(path, header, [metadata, self._offsets, self._codes, self._buffer])
+
+    @classmethod
+    def open(cls, path: str) -> 'SuffixIndex':
+        """
+        Open a saved index without copying it into memory.
+
+        Args:
+            path: File written by save()
+
+        Returns:
+            SuffixIndex backed by the mapped file
+
+        Raises:
+            CacheError: If the file is not a saved index
+        """
+        mapped, fields, section = _map_sections(path, HEADER, MAGIC)
+        _, rows, buffer_size, _, offset_size, metadata_size = fields
+
+        metadata = json.loads(section(metadata_size).tobytes().decode('utf-8'))
+        offsets = section((rows + 1) * offset_size).cast('I' if offset_size == 4 else 'Q')
+        codes = section(rows)
+        buffer = section(buffer_size)
+
+        rank_values = metadata.pop('rank_values')
+        index = cls(buffer, offsets, codes, rank_values, metadata)
+        index._mmap = mapped
+        return index
+
+    def __repr__(self) -> str:
+        return (
+            f"SuffixIndex(dataset_type='{self.dataset_type}', month='{self.month}', "
+            f"origins={len(self)}, nbytes={self.nbytes})"
+        )
@@ -0,0 +1,314 @@
+"""
+Prefetching of dataset months into the cache.
+
+sync() downloads the files a client will read for the selected months (CSV
+chunks, plus binary encodings with data_format='binary' and delta files with
+use_deltas=True) in parallel, skipping files that are already cached with
+the size listed in the manifest. A SyncDaemon repeats this in a background
+thread whenever datasets.json changes. It revalidates datasets.json with a
+conditional request at every poll, so an unchanged repository costs one
+small request, and only datasets whose entry changed are synced.
+"""
+
+import re
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .constants import DEFAULT_JOBS, DEFAULT_SYNC_INTERVAL
+from .dataset import CruxDataset
+from .exceptions import MonthNotFoundError
+
+if TYPE_CHECKING:
+    from .client import CruxCache
+
+# 'latest', 'all', 'YYYYMM', a range 'YYYYMM-YYYYMM' (either end optional) or an iterable of months
+MonthSelection = Union[str, Iterable[str]]
+
+_RANGE_RE = re.compile(r'^(\d{6})?-(\d{6})?$')
+
+# Fields of a datasets.json entry that change when a month is added or rewritten
+_SIGNATURE_FIELDS = ('latest_month', 'total_months', 'total_size', 'latest_origins')
+
+
+def select_months(available: Iterable[str], months: MonthSelection) -> List[str]:
+    """
+    Resolve a month selection against the months of a dataset.
+
+    Args:
+        available: Months of the dataset in YYYYMM format
+        months: 'latest', 'all', a month 'YYYYMM', an inclusive range
+                'YYYYMM-YYYYMM' (e.g. '202401-' for all months since 2024-01),
+                or an iterable of months
+
+    Returns:
+        Selected months, sorted
+
+    Raises:
+        MonthNotFoundError: If an explicitly selected month is not available
+    """
+    available = sorted(available)
+    if isinstance(months, str):
+        if months == 'latest':
+            return available[-1:]
+        if months == 'all':
+            return available
+        match = _RANGE_RE.match(months)
+        if match:
+            first, last = match.group(1) or '000000', match.group(2) or '999999'
+            return [month for month in available if first <= month <= last]
+        months = [months]
+
+    selected = sorted(set(months))
+    missing = [month for month in selected if month not in available]
+    if missing:
+        raise MonthNotFoundError(
+            f"Months not available: {', '.join(missing)}. "
+            f"Available months: {', '.join(available)}"
+        )
+    return selected
+
+
+def month_files(dataset: CruxDataset) -> List[Tuple[str, Optional[int]]]:
+    """
+    List the files reading a dataset month needs.
+
+    Args:
+        dataset: Dataset month (its max_rank, data_format and use_deltas apply)
+
+    Returns:
+        List of (filename, size from the manifest)
+    """
+    files = []
+    for chunk_info, _ in dataset.chunk_extents():
+        files.append((chunk_info['filename'], chunk_info.get('size')))
+        if dataset.data_format == 'binary' and 'binary' in chunk_info:
+            files.append((chunk_info['binary']['filename'], chunk_info['binary'].get('size')))
+
+    delta = dataset.month_data.get('delta')
+    if dataset.use_deltas and delta:
+        files.append((delta['filename'], delta.get('size')))
+    return files
+
+
+class _Throttle:
+    """Paces the start of downloads to an average number of bytes per second."""
+
+    def __init__(self, bytes_per_second: float):
+        self.bytes_per_second = bytes_per_second
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, size: int) -> None:
+        """Wait until a download of size bytes fits in the bandwidth budget."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + size / self.bytes_per_second
+        if start > now:
+            time.sleep(start - now)
+
+
+def sync(
+    cache: 'CruxCache',
+    dataset_types: Iterable[str],
+    months: MonthSelection = 'latest',
+    max_rank: Optional[int] = None,
+    max_parallel: int = DEFAULT_JOBS,
+    bandwidth_limit: Optional[float] = None,
+    revalidate: bool = False
+) -> Dict[str, Any]:
+    """
+    Download the files of the selected months into the cache.
+
+    Args:
+        cache: Client whose cache is filled (its data_format and use_deltas apply)
+        dataset_types: Datasets to sync
+        months: Months to sync per dataset (see select_months)
+        max_rank: Only sync the chunks holding origins with rank <= max_rank
+        max_parallel: Parallel downloads
+        bandwidth_limit: Average download rate limit in bytes per second (None: unlimited).
+                         Downloads are paced per file, so the limit holds on average over
+                         several files.
+        revalidate: Revalidate the manifests even if their TTL has not expired
+
+    Returns:
+        Dictionary with 'months' (dataset -> synced months), 'files' and 'bytes'
+        downloaded, 'cached' (files that were already cached) and 'seconds'
+
+    Raises:
+        DatasetNotFoundError: If a dataset type does not exist
+        MonthNotFoundError: If an explicitly selected month is not available
+        DownloadError: If a file cannot be downloaded
+    """
+    cache_manager = cache.cache_manager
+    throttle = _Throttle(bandwidth_limit) if bandwidth_limit else None
+    report: Dict[str, Any] = {'months': {}, 'files': 0, 'bytes': 0, 'cached': 0}
+
+    def fetch(dataset_type: str, filename: str, size: Optional[int]) -> None:
+        if throttle is not None:
+            throttle.wait(size or 0)
+        cache_manager.get_data_file(dataset_type, filename, size)
+
+    start = time.perf_counter()
+    planned: List[Tuple[str, str, List[Tuple[Future, Optional[int]]]]] = []
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        try:
+            for dataset_type in dataset_types:
+                manifest = cache_manager.get_manifest(dataset_type, revalidate=revalidate)
+                selected = select_months(manifest.get('months', {}), months)
+                report['months'][dataset_type] = selected
+
+                for month in selected:
+                    dataset = cache.get_dataset(dataset_type, month=month, max_rank=max_rank)
+                    futures = []
+                    for filename, size in month_files(dataset):
+                        if cache_manager.is_cached(dataset_type, filename, size):
+                            report['cached'] += 1
+                        else:
+                            futures.append((executor.submit(fetch, dataset_type, filename, size), size))
+                    planned.append((dataset_type, month, futures))
+
+            # Months are reported in order as soon as all their files are downloaded
+            for dataset_type, month, futures in planned:
+                for future, _ in futures:
+                    future.result()
+                size = sum(size or 0 for _, size in futures)
+                report['files'] += len(futures)
+                report['bytes'] += size
+                cache_manager.observer.on_sync(
+                    dataset_type, month, len(futures), size, time.perf_counter() - start
+                )
+        except BaseException:
+            for _, _, futures in planned:
+                for future, _ in futures:
+                    future.cancel()
+            raise
+
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+class SyncDaemon:
+    """
+    Keeps the cache warm by syncing datasets whenever they change.
+
+    Example:
+        >>> daemon = cache.start_sync(['global', 'us'], months='latest')
+        >>> ...  # get_dataset() calls find new months already downloaded
+        >>> daemon.stop()
+    """
+
+    def __init__(
+        self,
+        cache: 'CruxCache',
+        dataset_types: Optional[List[str]] = None,
+        months: MonthSelection = 'latest',
+        interval: float = DEFAULT_SYNC_INTERVAL,
+        publish: bool = False,
+        **sync_options: Any
+    ):
+        """
+        Initialize the daemon.
+
+        Args:
+            cache: Client whose cache is kept warm
+            dataset_types: Datasets to sync (default: all datasets, including new ones)
+            months: Months to sync per dataset (see select_months)
+            interval: Seconds between polls of datasets.json
+            publish: Publish the latest synced month of every changed dataset
+                     (see CruxCache.publish_month), so attached processes swap to it
+            **sync_options: max_rank, max_parallel and bandwidth_limit for sync()
+        """
+        self.cache = cache
+        self.dataset_types = dataset_types
+        self.months = months
+        self.interval = interval
+        self.publish = publish
+        self.sync_options = sync_options
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[Exception] = None
+
+        # datasets.json entry of every dataset when it was last synced
+        self._synced: Dict[str, Tuple[Any, ...]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """
+        Sync the datasets whose entry in datasets.json changed since the last poll.
+
+        Returns:
+            Report of sync(), or None if nothing changed
+
+        Raises:
+            CruxCacheError: If fetching metadata or a file fails; the datasets are
+                            synced again at the next poll
+        """
+        metadata = self.cache.cache_manager.get_datasets_metadata(revalidate=True)
+        entries = {ds['id']: ds for ds in metadata.get('datasets', [])}
+        dataset_types = self.dataset_types or sorted(entries)
+
+        signatures = {
+            dataset_type: tuple(entries.get(dataset_type, {}).get(field) for field in _SIGNATURE_FIELDS)
+            for dataset_type in dataset_types
+        }
+        changed = [dt for dt in dataset_types if self._synced.get(dt) != signatures[dt]]
+        if not changed:
+            return None
+
+        report = sync(self.cache, changed, self.months, revalidate=True, **self.sync_options)
+        if self.publish:
+            for dataset_type in changed:
+                if report['months'].get(dataset_type):
+                    self.cache.publish_month(dataset_type, report['months'][dataset_type][-1],
+                                             max_rank=self.sync_options.get('max_rank'))
+        self._synced.update((dt, signatures[dt]) for dt in changed)
+        self.last_report = report
+        return report
+
+    def run_forever(self) -> None:
+        """Poll until stop() is called, reporting failures to the cache's observers."""
+        while not self._stop.is_set():
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as e:
+                # Also disk errors and failures of publish_month(): the daemon must keep polling
+                self.last_error = e
+                self.cache.cache_manager.observer.on_sync_error(None, e)
+            self._stop.wait(self.interval)
+
+    def start(self) -> 'SyncDaemon':
+        """Start polling in a background thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name='crux-sync', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop polling.
+
+        Args:
+            timeout: Seconds to wait for a running sync to finish (None: wait until it does)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def __enter__(self) -> 'SyncDaemon':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def __repr__(self) -> str:
+        datasets = ', '.join(self.dataset_types) if self.dataset_types else 'all'
+        return f"SyncDaemon(datasets={datasets}, months={self.months!r}, interval={self.interval}s)"
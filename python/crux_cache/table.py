@@ -0,0 +1,486 @@
+"""
+Compact in-memory table of one dataset month.
+
+A CruxTable stores all origins of a month in one contiguous buffer with an
+array of start offsets, and ranks as one byte per row (an index into the
+month's distinct rank values). Rows keep the order of the dataset (by rank,
+then origin), so origins can be found by binary search within their rank
+bucket; an optional open-addressing hash index makes lookups O(1).
+
+Tables can be saved to a single file and opened with mmap, so several
+processes share one copy of a month through the page cache instead of
+each unpickling their own.
+"""
+
+import os
+import json
+import mmap
+import zlib
+import struct
+from array import array
+from itertools import accumulate, chain
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .exceptions import CacheError
+
+MAGIC = b'CRUXTBL1'
+
+# magic, rows, buffer size, index slots, distinct ranks, offset item size, metadata size
+HEADER = struct.Struct('<8sQQQIII')
+
+# Maximum load factor of the hash index
+INDEX_LOAD_FACTOR = 0.7
+
+# Rows decoded at a time while iterating
+ITER_BLOCK_ROWS = 65536
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _index_slots(rows: int) -> int:
+    """Smallest power of two keeping the index below its maximum load factor."""
+    slots = 1
+    while slots * INDEX_LOAD_FACTOR < rows:
+        slots *= 2
+    return slots
+
+
+class CruxTable:
+    """
+    Compact table of the (origin, rank) rows of one dataset month.
+
+    Build one with CruxCache.load_month() or CruxTable.from_dataset(), or open
+    a saved table with CruxTable.open().
+
+    Example:
+        >>> table = cache.load_month('global', '202510', index=True)
+        >>> table.rank('https://www.google.com')
+        1000
+        >>> 'https://www.google.com' in table
+        True
+        >>> table.save('global-202510.table')
+        >>> shared = CruxTable.open('global-202510.table')  # mmap, shared between processes
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytes, bytearray, memoryview],
+        offsets: Union[array, memoryview],
+        codes: Union[array, memoryview],
+        rank_values: List[int],
+        index: Optional[Union[array, memoryview]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize a table from its arrays (see from_dataset and open).
+
+        Args:
+            buffer: Origins as UTF-8, each followed by a newline
+            offsets: Start of every origin in buffer, plus the end of the buffer
+            codes: Index into rank_values for every row
+            rank_values: Distinct ranks, ascending
+            index: Open-addressing hash index (row + 1 per slot, 0 if empty), if built
+            metadata: Dataset, month and max_rank the table was built from
+        """
+        self._buffer = memoryview(buffer)
+        self._offsets = offsets
+        self._codes = codes
+        self.rank_values = list(rank_values)
+        self._index = index
+        self.metadata = metadata or {}
+        self._mmap: Optional[mmap.mmap] = None
+
+        # First row of each rank bucket (codes are ascending, as rows are sorted by rank)
+        self._bucket_starts = []
+        row = 0
+        for code in range(len(self.rank_values)):
+            self._bucket_starts.append(row)
+            row = self._bisect_codes(code + 1, row)
+        self._bucket_starts.append(len(self))
+
+    @property
+    def dataset_type(self) -> Optional[str]:
+        return self.metadata.get('dataset_type')
+
+    @property
+    def month(self) -> Optional[str]:
+        return self.metadata.get('month')
+
+    def _bisect_codes(self, code: int, low: int) -> int:
+        """First row at or after low with a code >= code."""
+        high = len(self._codes)
+        while low < high:
+            mid = (low + high) // 2
+            if self._codes[mid] < code:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    @classmethod
+    def from_dataset(cls, dataset, index: bool = False) -> 'CruxTable':
+        """
+        Build a table from the CSV chunks of a dataset month.
+
+        Rank buckets are located with the rank offsets in the manifest, so each
+        bucket is converted with a few bytes operations instead of parsing rows.
+
+        Args:
+            dataset: CruxDataset to build the table from (its max_rank applies)
+            index: Build the hash index for O(1) lookups
+
+        Returns:
+            CruxTable
+        """
+        buffer = bytearray()
+        offsets = array('Q')
+        codes = array('B')
+        runs: List[Tuple[int, int]] = []
+        last: Dict[int, bytes] = {}
+        is_sorted = True
+
+        def append(rank: int, origins: bytes) -> None:
+            """Append newline-terminated origins of one rank."""
+            nonlocal is_sorted
+            parts = origins.split(b'\n')
+            parts.pop()  # After the last newline
+            if not parts:
+                return
+            # Sorting already sorted runs is linear
+            if is_sorted and (parts != sorted(parts) or last.get(rank, b'') > parts[0]):
+                is_sorted = False
+            last[rank] = parts[-1]
+            starts = accumulate(chain([len(buffer)], (len(part) + 1 for part in parts)))
+            offsets.extend(list(starts)[:-1])
+            buffer.extend(origins)
+            runs.append((rank, len(parts)))
+
+        for chunk_idx, (chunk_info, end) in enumerate(dataset.chunk_extents()):
+            data = dataset._read_chunk(chunk_info['filename'], chunk_info.get('size'), end=end)
+            if data and not data.endswith(b'\n'):
+                data += b'\n'
+
+            for rank, segment in _rank_segments(data, chunk_info, chunk_idx == 0, dataset.max_rank):
+                origins = segment.replace(b',' + str(rank).encode('ascii') + b'\n', b'\n')
+                if b',' in origins:
+                    # Statistics do not match the rows; fall back to parsing them
+                    for line in segment.splitlines():
+                        origin, line_rank = line.rsplit(b',', 1)
+                        append(int(line_rank), origin + b'\n')
+                else:
+                    append(rank, origins)
+
+        offsets.append(len(buffer))
+
+        rank_values = sorted(last)
+        rank_codes = {rank: code for code, rank in enumerate(rank_values)}
+        if len(rank_values) > 256:
+            raise CacheError(f"Too many distinct ranks for a table ({len(rank_values)})")
+        if any(a > b for (a, _), (b, _) in zip(runs, runs[1:])):
+            raise CacheError(f"Rows of {dataset.dataset_type}/{dataset.month} are not sorted by rank")
+        for rank, count in runs:
+            codes.extend(array('B', [rank_codes[rank]]) * count)
+
+        # Offsets fit in 32 bits for any realistic month
+        if len(buffer) < 2 ** 32:
+            offsets = array('I', offsets)
+
+        table = cls(buffer, offsets, codes, rank_values, metadata={
+            'dataset_type': dataset.dataset_type,
+            'month': dataset.month,
+            'max_rank': dataset.max_rank,
+            'sorted': is_sorted,
+        })
+        if index:
+            table.build_index()
+        return table
+
+    def build_index(self) -> None:
+        """Build the hash index for O(1) lookups (about 4-8 bytes per row)."""
+        self._index = _build_index(self._buffer, self._offsets, len(self))
+
+    @property
+    def has_index(self) -> bool:
+        return self._index is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the table's arrays in bytes."""
+        size = self._buffer.nbytes + len(self._offsets) * self._offsets.itemsize + len(self._codes)
+        if self._index is not None:
+            size += len(self._index) * self._index.itemsize
+        return size
+
+    def _origin_bytes(self, row: int) -> memoryview:
+        return self._buffer[self._offsets[row]:self._offsets[row + 1] - 1]
+
+    def _find(self, origin: str) -> int:
+        """Get the row of an origin, or -1."""
+        return self._find_key(origin.encode('utf-8'))
+
+    def _find_key(self, key: bytes) -> int:
+        """Get the row of a UTF-8 encoded origin, or -1."""
+        if self._index is not None:
+            return _probe_index(self._index, self._buffer, self._offsets, key)
+
+        if not self.metadata.get('sorted', True):
+            for row in range(len(self)):
+                if self._origin_bytes(row) == key:
+                    return row
+            return -1
+
+        for code in range(len(self.rank_values)):
+            low, high = self._bucket_starts[code], self._bucket_starts[code + 1]
+            while low < high:
+                mid = (low + high) // 2
+                if self._origin_bytes(mid).tobytes() < key:
+                    low = mid + 1
+                else:
+                    high = mid
+            if low < self._bucket_starts[code + 1] and self._origin_bytes(low) == key:
+                return low
+        return -1
+
+    def rank(self, origin: str) -> Optional[int]:
+        """
+        Look up the rank of an origin.
+
+        Args:
+            origin: Origin (e.g., 'https://www.google.com')
+
+        Returns:
+            Rank, or None if the origin is not in the table
+        """
+        row = self._find(origin)
+        return self.rank_values[self._codes[row]] if row >= 0 else None
+
+    def get(self, origin: str, default: Any = None) -> Any:
+        """Look up the rank of an origin, returning default if it is not in the table."""
+        rank = self.rank(origin)
+        return default if rank is None else rank
+
+    def __contains__(self, origin: object) -> bool:
+        return isinstance(origin, str) and self._find(origin) >= 0
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, row: int) -> Tuple[str, int]:
+        """Get the (origin, rank) row at a position."""
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(f"row index {row} out of range")
+        return self._origin_bytes(row).tobytes().decode('utf-8'), self.rank_values[self._codes[row]]
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        """Iterate over (origin, rank) rows in dataset order."""
+        for start in range(0, len(self), ITER_BLOCK_ROWS):
+            stop = min(start + ITER_BLOCK_ROWS, len(self))
+            block = self._buffer[self._offsets[start]:self._offsets[stop]].tobytes().decode('utf-8')
+            origins = block.split('\n')
+            for origin, code in zip(origins, self._codes[start:stop]):
+                yield origin, self.rank_values[code]
+
+    def save(self, path: str) -> None:
+        """
+        Save the table to a file that open() maps into memory.
+
+        Args:
+            path: File to write
+        """
+        metadata = json.dumps({**self.metadata, 'rank_values': self.rank_values}).encode('utf-8')
+        header = HEADER.pack(
+            MAGIC, len(self), self._buffer.nbytes,
+            len(self._index) if self._index is not None else 0,
+            len(self.rank_values), self._offsets.itemsize, len(metadata)
+        )
+        _write_sections(path, header, [
+            metadata,
+            self._offsets,
+            self._codes,
+            self._index if self._index is not None else b'',
+            self._buffer,
+        ])
+
+    @classmethod
+    def open(cls, path: str) -> 'CruxTable':
+        """
+        Open a saved table without copying it into memory.
+
+        The file is mapped read-only, so processes opening the same file share
+        its pages.
+
+        Args:
+            path: File written by save()
+
+        Returns:
+            CruxTable backed by the mapped file
+
+        Raises:
+            CacheError: If the file is not a saved table
+        """
+        mapped, fields, section = _map_sections(path, HEADER, MAGIC)
+        _, rows, buffer_size, slots, _, offset_size, metadata_size = fields
+
+        metadata = json.loads(section(metadata_size).tobytes().decode('utf-8'))
+        offsets = section((rows + 1) * offset_size).cast('I' if offset_size == 4 else 'Q')
+        codes = section(rows)
+        index = section(slots * 4).cast('I') if slots else None
+        buffer = section(buffer_size)
+
+        rank_values = metadata.pop('rank_values')
+        table = cls(buffer, offsets, codes, rank_values, index=index, metadata=metadata)
+        table._mmap = mapped
+        return table
+
+    def __repr__(self) -> str:
+        index = ", index" if self._index is not None else ""
+        return (
+            f"CruxTable(dataset_type='{self.dataset_type}', month='{self.month}', "
+            f"rows={len(self)}, nbytes={self.nbytes}{index})"
+        )
+
+
+def _build_index(buffer: memoryview, offsets: Union[array, memoryview], rows: int) -> array:
+    """
+    Build an open-addressing hash index over newline-terminated strings.
+
+    Args:
+        buffer: Strings, each followed by a newline
+        offsets: Start of every string in buffer, plus the end of the buffer
+        rows: Number of strings
+
+    Returns:
+        Slots holding row + 1, or 0 if empty (a power of two in size)
+    """
+    slots = _index_slots(rows)
+    mask = slots - 1
+    index = array('I', bytes(4 * slots))
+    for row in range(rows):
+        slot = zlib.crc32(buffer[offsets[row]:offsets[row + 1] - 1]) & mask
+        while index[slot]:
+            slot = (slot + 1) & mask
+        index[slot] = row + 1
+    return index
+
+
+def _probe_index(
+    index: Union[array, memoryview],
+    buffer: memoryview,
+    offsets: Union[array, memoryview],
+    key: bytes
+) -> int:
+    """Get the row of a string in a hash index built by _build_index(), or -1."""
+    mask = len(index) - 1
+    slot = zlib.crc32(key) & mask
+    while True:
+        row = index[slot] - 1
+        if row < 0:
+            return -1
+        if buffer[offsets[row]:offsets[row + 1] - 1] == key:
+            return row
+        slot = (slot + 1) & mask
+
+
+def _write_sections(path: str, header: bytes, sections: List[Any]) -> None:
+    """Write a header and 8-byte aligned sections to a file, replacing it atomically."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for section in sections:
+            data = memoryview(section).cast('B')
+            f.write(data)
+            f.write(bytes(_aligned(data.nbytes) - data.nbytes))
+    os.replace(tmp_path, path)
+
+
+def _map_sections(path: str, header: struct.Struct, magic: bytes) -> Tuple[mmap.mmap, tuple, Any]:
+    """
+    Map a file written by _write_sections() read-only.
+
+    Args:
+        path: File to map
+        header: Header layout, starting with the magic
+        magic: Expected magic
+
+    Returns:
+        Tuple of (mapping, header fields, function returning the next section
+        of a given size as a memoryview)
+
+    Raises:
+        CacheError: If the file does not start with a valid header
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        fields = header.unpack_from(mapped, 0)
+    except struct.error as e:
+        mapped.close()
+        raise CacheError(f"Invalid file {path}: {e}")
+    if fields[0] != magic:
+        mapped.close()
+        raise CacheError(f"Invalid file {path}: bad magic {fields[0]!r}")
+
+    view = memoryview(mapped)
+    position = header.size
+
+    def section(size: int) -> memoryview:
+        nonlocal position
+        data = view[position:position + size]
+        position += _aligned(size)
+        return data
+
+    return mapped, fields, section
+
+
+def _rank_segments(
+    data: bytes,
+    chunk_info: Dict[str, Any],
+    has_header: bool,
+    max_rank: Optional[int]
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Split CSV chunk data into runs of lines with the same rank.
+
+    Uses the rank offsets of the manifest if present, otherwise parses the lines.
+
+    Args:
+        data: Chunk contents from the start of the file, newline-terminated
+        chunk_info: Chunk entry from the manifest
+        has_header: Whether the data starts with a header row
+        max_rank: Skip rows with rank > max_rank
+
+    Yields:
+        Tuple of (rank, newline-terminated 'origin,rank' lines)
+    """
+    offsets = chunk_info.get('rank_offsets')
+    if offsets:
+        buckets = sorted((offset, int(rank)) for rank, offset in offsets.items())
+        for i, (start, rank) in enumerate(buckets):
+            if start >= len(data) or (max_rank is not None and rank > max_rank):
+                break
+            end = buckets[i + 1][0] if i + 1 < len(buckets) else len(data)
+            yield rank, data[start:end]
+        return
+
+    if has_header:
+        data = data[data.find(b'\n') + 1:]
+    run_rank = None
+    run: List[bytes] = []
+    for line in data.splitlines():
+        if not line:
+            continue
+        rank = int(line.rsplit(b',', 1)[1])
+        if max_rank is not None and rank > max_rank:
+            continue
+        if rank != run_rank and run:
+            yield run_rank, b'\n'.join(run) + b'\n'
+            run = []
+        run_rank = rank
+        run.append(line)
+    if run:
+        yield run_rank, b'\n'.join(run) + b'\n'
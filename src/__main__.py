@@ -6,14 +6,56 @@ import argparse
 from pathlib import Path
 from datetime import datetime
 
-from .collector import CruxCollector
-from .processor import ChunkProcessor
 from .manifest import ManifestGenerator, update_datasets_manifest
-from .utils import get_existing_months
-
-
-def main():
-    """Main CLI function."""
+from .delta import (
+    compute_delta,
+    is_keyframe,
+    load_month_dataframe,
+    previous_month,
+    write_delta,
+)
+from .utils import StageTimer, get_existing_months
+
+
+def write_month_delta(collector, manifest_gen, data_dir, year, month, df, previous):
+    """
+    Write the delta of a month relative to the previous calendar month.
+
+    The previous month is taken from the last processed month if it matches,
+    then from its CSV chunks on disk, and only fetched from BigQuery again if
+    it is published in the manifest (clients ignore deltas against other
+    bases). Otherwise the month is written as a keyframe, without delta.
+    """
+    base_year, base_month = previous_month(year, month)
+    base = f"{base_year}{base_month:02d}"
+
+    if previous and previous[:2] == (base_year, base_month):
+        base_df = previous[2]
+    else:
+        base_df = load_month_dataframe(data_dir, base_year, base_month)
+        if base_df is None and manifest_gen.has_month(base):
+            print(f"  Fetching {base_year}-{base_month:02d} as delta base...")
+            base_df = collector.fetch_month_data(base_year, base_month)
+
+    if base_df is None or base_df.empty:
+        print(f"  No data for delta base {base}, writing {year}-{month:02d} as a keyframe")
+        return
+
+    delta = write_delta(data_dir, f"{year}{month:02d}", base, compute_delta(base_df, df))
+    manifest_gen.record_delta(f"{year}{month:02d}", delta)
+    print(f"  ✓ Delta vs {base}: +{delta['added']:,} -{delta['removed']:,} "
+          f"~{delta['changed']:,} ({delta['size'] / (1024 * 1024):.2f} MB)")
+
+
+def main(argv=None, backend=None, timer=None):
+    """
+    Main CLI function.
+
+    Args:
+        argv: Command line arguments (default: sys.argv)
+        backend: Query backend to use instead of BigQuery (e.g. a FakeBackend for benchmarks)
+        timer: StageTimer collecting time per stage (fetch, chunk, delta, manifest)
+    """
     parser = argparse.ArgumentParser(
         description="Download and process Chrome User Experience Report datasets",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -77,7 +119,20 @@ def main():
         help='Fully regenerate manifest from scratch instead of incremental update (use with --manifest-only)'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--deltas',
+        action='store_true',
+        help='Also write delta files (changes relative to the previous month) for non-keyframe months'
+    )
+
+    parser.add_argument(
+        '--binary',
+        action='store_true',
+        help='Also write a compact binary encoding (YYYYMM_N.bin) next to each CSV chunk'
+    )
+
+    args = parser.parse_args(argv)
+    timer = timer or StageTimer()
 
     # Validate arguments
     if args.dataset_type == 'country' and not args.country_code:
@@ -109,25 +164,33 @@ def main():
             print("Fully regenerating manifest from scratch...")
         else:
             print("Updating manifest incrementally...")
-        generator = ManifestGenerator(data_dir, dataset_name)
-        generator.update(incremental=not args.regenerate)
+        with timer.stage('manifest'):
+            generator = ManifestGenerator(data_dir, dataset_name)
+            generator.update(incremental=not args.regenerate)
 
-        # Also update the master datasets manifest
-        print()
-        data_root = data_dir.parent
-        update_datasets_manifest(data_root)
+            # Also update the master datasets manifest
+            print()
+            data_root = data_dir.parent
+            update_datasets_manifest(data_root)
 
         print("\n✓ Done!")
         return 0
 
+    # The collection pipeline needs pandas and the BigQuery client, which are
+    # slow to import, so they are only loaded past the manifest-only path
+    from .collector import CruxCollector
+    from .processor import ChunkProcessor
+    from .staging import MonthStaging
+
     # Initialize components
     try:
         collector = CruxCollector(
             credentials_path=args.credentials,
             dataset_type=args.dataset_type,
-            country_code=args.country_code
+            country_code=args.country_code,
+            backend=backend
         )
-        processor = ChunkProcessor(output_dir=data_dir)
+        processor = ChunkProcessor(output_dir=data_dir, write_binary=args.binary)
         manifest_gen = ManifestGenerator(data_dir, dataset_name)
     except Exception as e:
         print(f"✗ Initialization error: {e}")
@@ -135,10 +198,11 @@ def main():
 
     # Determine which months to download
     print("Querying available months from BigQuery...")
-    available_months = collector.get_available_months(
-        start_year=args.start_year,
-        start_month=args.start_month
-    )
+    with timer.stage('fetch'):
+        available_months = collector.get_available_months(
+            start_year=args.start_year,
+            start_month=args.start_month
+        )
 
     if not available_months:
         print("✗ No months found in BigQuery")
@@ -146,10 +210,19 @@ def main():
 
     print(f"  Found {len(available_months)} available months")
 
+    # Months published by an interrupted run only need their manifest entry
+    published = []
+    for staging in MonthStaging.pending(data_dir):
+        if staging.is_published():
+            manifest_gen.record_chunks(staging.yyyymm, staging.load_checkpoint()['chunks'])
+            published.append(staging)
+            print(f"  Recovered published month {staging.yyyymm} from checkpoint")
+
     # Check for existing data
     to_download = available_months
     if args.incremental:
         existing = get_existing_months(data_dir)
+        existing.update((s.year, s.month) for s in published)
         to_download = [m for m in available_months if m not in existing]
         print(f"  Already have {len(existing)} months")
         print(f"  Will download {len(to_download)} new months")
@@ -158,27 +231,50 @@ def main():
         print("\n✓ All data is up to date!")
         # Update manifest and exit
         manifest_gen.update()
+        for staging in published:
+            staging.cleanup()
         return 0
 
     print(f"\n{'Downloading' if args.incremental else 'Processing'} {len(to_download)} months:")
     print()
 
     # Download and process each month
-    changes_made = False
+    changes_made = bool(published)
+    previous = None  # (year, month, df) of the last processed month
     for year, month in to_download:
         try:
-            # Fetch data from BigQuery
-            df = collector.fetch_month_data(year, month)
+            staging = processor.staging(year, month)
+
+            with timer.stage('fetch'):
+                # Reuse a staged query result from an interrupted run
+                df = staging.load_result()
+                if df is not None:
+                    print(f"Resuming {year}-{month:02d} from staged query result ({len(df):,} origins)")
+                else:
+                    # Fetch data from BigQuery
+                    df = collector.fetch_month_data(year, month)
+
+                    if not df.empty:
+                        staging.save_result(df)
 
             if df.empty:
                 print(f"  ⚠ No data for {year}-{month:02d}, skipping")
                 continue
 
             # Chunk and save
-            chunks = processor.save_dataframe_chunked(df, year, month)
+            with timer.stage('chunk'):
+                chunks = processor.save_dataframe_chunked(df, year, month)
+            published.append(staging)
 
             if chunks:
+                # Hand write-time statistics to the manifest generator
+                manifest_gen.record_chunks(f"{year}{month:02d}", chunks)
                 changes_made = True
+
+                if args.deltas and not is_keyframe(year, month):
+                    with timer.stage('delta'):
+                        write_month_delta(collector, manifest_gen, data_dir, year, month, df, previous)
+                previous = (year, month, df)
                 print()
 
         except Exception as e:
@@ -187,14 +283,20 @@ def main():
 
     # Generate/update manifest (incremental by default)
     print("=" * 60)
-    manifest_gen.update(incremental=True)
+    with timer.stage('manifest'):
+        manifest_gen.update(incremental=True)
 
-    # Also update the master datasets manifest
-    print()
-    data_root = data_dir.parent
-    update_datasets_manifest(data_root)
+        # Published months are now in the manifest, drop their staging areas
+        for staging in published:
+            staging.cleanup()
+
+        # Also update the master datasets manifest
+        print()
+        data_root = data_dir.parent
+        update_datasets_manifest(data_root)
 
     print("\n" + "=" * 60)
+    print(f"Stage timings: {timer.summary()}")
     if changes_made:
         print("✓ Data update completed successfully!")
         return 0
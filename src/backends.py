@@ -0,0 +1,190 @@
+"""
+Query backends for the CrUX collector.
+
+The collector builds BigQuery SQL and hands it to a backend. BigQueryBackend
+runs it against Google BigQuery; FakeBackend answers the collector's queries
+with synthetic result sets so the full pipeline can run without credentials.
+"""
+import os
+import re
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Rows per rank bucket in the global dataset of 2025-10 (~18.4M origins)
+GLOBAL_BUCKETS = [
+    (1000, 1000),
+    (5000, 4000),
+    (10000, 5000),
+    (50000, 40000),
+    (100000, 50000),
+    (500000, 400000),
+    (1000000, 500000),
+    (5000000, 4000000),
+    (10000000, 5000000),
+    (50000000, 8438315),
+]
+
+
+def bucket_sizes(rows: int) -> List[Tuple[int, int]]:
+    """
+    Scale the global bucket proportions to a number of rows.
+
+    Args:
+        rows: Total number of rows
+
+    Returns:
+        List of (rank, count) with counts summing to rows
+    """
+    total = sum(count for _, count in GLOBAL_BUCKETS)
+    sizes = []
+    cumulative = 0
+    assigned = 0
+    for rank, count in GLOBAL_BUCKETS:
+        cumulative += count
+        target = round(rows * cumulative / total)
+        sizes.append((rank, target - assigned))
+        assigned = target
+    return [(rank, count) for rank, count in sizes if count > 0]
+
+
+class QueryBackend(ABC):
+    """Interface for backends that run the collector's SQL queries."""
+
+    @abstractmethod
+    def query(self, sql: str) -> pd.DataFrame:
+        """
+        Run a query.
+
+        Args:
+            sql: BigQuery SQL
+
+        Returns:
+            Query result as a DataFrame
+        """
+
+
+class BigQueryBackend(QueryBackend):
+    """Runs queries against Google BigQuery."""
+
+    def __init__(self, credentials_path: Optional[str] = None):
+        """
+        Initialize the backend with authentication.
+
+        Args:
+            credentials_path: Path to service account JSON file.
+                            If None, attempts to use environment variable or default credentials.
+        """
+        from google.cloud import bigquery
+
+        self.credentials = self._load_credentials(credentials_path)
+        self.client = bigquery.Client(credentials=self.credentials)
+
+    def _load_credentials(self, credentials_path: Optional[str]):
+        """Load Google Cloud credentials from various sources."""
+        from google.oauth2 import service_account
+
+        # Priority 1: Explicit path
+        if credentials_path and os.path.exists(credentials_path):
+            return service_account.Credentials.from_service_account_file(credentials_path)
+
+        # Priority 2: Environment variable with JSON content
+        creds_json = os.environ.get('GOOGLE_CREDENTIALS')
+        if creds_json:
+            try:
+                creds_data = json.loads(creds_json)
+                return service_account.Credentials.from_service_account_info(creds_data)
+            except json.JSONDecodeError:
+                pass
+
+        # Priority 3: Default application credentials
+        return None
+
+    def query(self, sql: str) -> pd.DataFrame:
+        """Run a query on BigQuery and return the result as a DataFrame."""
+        return self.client.query(sql).to_dataframe()
+
+
+class FakeBackend(QueryBackend):
+    """
+    Local stand-in for BigQuery serving synthetic result sets.
+
+    Understands the two queries the collector issues: listing available
+    months and fetching all origins of a month. Month results are sorted by
+    rank then origin, with rank buckets in the proportions of the global
+    dataset and a slowly changing population of origins between months.
+    """
+
+    _SUBDOMAINS = np.array(['www.', '', 'm.', 'shop.', 'blog.', 'www.', '', 'www.'], dtype=object)
+    _TLDS = np.array(['com', 'org', 'net', 'de', 'co.uk', 'ru', 'jp', 'com.br', 'fr',
+                      'xn--p1ai', 'com', 'com', 'io', 'in', 'pl', 'com'], dtype=object)
+
+    def __init__(self, rows: int = 100_000, months: Optional[Iterable[str]] = None, seed: int = 0):
+        """
+        Initialize the fake backend.
+
+        Args:
+            rows: Origins per month
+            months: Available months in YYYYMM format (default: 2025-01 to 2025-03)
+            seed: Random seed
+        """
+        self.rows = rows
+        self.months = sorted(months or ['202501', '202502', '202503'])
+        self.seed = seed
+        self.query_seconds = 0.0
+
+    def query(self, sql: str) -> pd.DataFrame:
+        """Answer a collector query with synthetic data."""
+        start = time.perf_counter()
+        try:
+            if re.search(r'SELECT\s+DISTINCT\s+yyyymm', sql):
+                match = re.search(r'yyyymm\s*>=\s*(\d{6})', sql)
+                min_month = match.group(1) if match else '000000'
+                months = [int(m) for m in self.months if m >= min_month]
+                return pd.DataFrame({'yyyymm': pd.Series(months, dtype='int64')})
+
+            match = re.search(r'yyyymm\s*=\s*(\d{6})', sql)
+            if not match:
+                raise ValueError(f"FakeBackend does not understand query: {sql.strip()[:200]}")
+            if match.group(1) not in self.months:
+                return pd.DataFrame({'origin': pd.Series([], dtype=object),
+                                     'rank': pd.Series([], dtype='int64')})
+            return self.month_data(match.group(1))
+        finally:
+            self.query_seconds += time.perf_counter() - start
+
+    def month_data(self, yyyymm: str) -> pd.DataFrame:
+        """
+        Generate the origins of one month.
+
+        Args:
+            yyyymm: Month in YYYYMM format
+
+        Returns:
+            DataFrame with columns origin, rank sorted by rank then origin
+        """
+        rng = np.random.default_rng(self.seed * 1_000_000 + int(yyyymm))
+
+        # Each month draws from a shared population, so months overlap like real data
+        population = int(self.rows * 1.2)
+        ids = rng.choice(population, size=self.rows, replace=False)
+        scores = ids + rng.normal(0, population * 0.02, self.rows)
+        ids = ids[np.argsort(scores, kind='stable')]
+
+        sizes = bucket_sizes(self.rows)
+        ranks = np.repeat([rank for rank, _ in sizes], [count for _, count in sizes])
+
+        names = pd.Series(ids).astype(str)
+        origins = (
+            'https://'
+            + pd.Series(self._SUBDOMAINS[ids % len(self._SUBDOMAINS)])
+            + 'site' + names + '.'
+            + pd.Series(self._TLDS[(ids // 7) % len(self._TLDS)])
+        )
+
+        df = pd.DataFrame({'origin': origins.values, 'rank': ranks.astype('int64')})
+        return df.sort_values(['rank', 'origin'], kind='stable').reset_index(drop=True)
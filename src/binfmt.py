@@ -0,0 +1,121 @@
+"""
+Compact binary encoding of CSV chunks.
+
+Every CSV chunk can be accompanied by a binary file with the same rows
+(YYYYMM_N.bin). Rows are sorted by rank, so ranks are stored as runs of
+(rank, count), and origins are stored front-coded in blocks: each origin
+only stores the length of the prefix it shares with the previous origin and
+the remaining suffix. Front coding restarts at every block, and an index of
+block offsets allows decoding any row without reading the blocks before it.
+
+Layout (all integers little-endian):
+
+    header      magic 'CRUXBIN1', flags u32, rows u32, runs u32,
+                block_size u32, blocks u32
+    runs        runs x (rank u32, count u32)
+    index       (blocks + 1) x u64 offsets of each block, relative to the
+                end of the index
+    blocks      per block, zlib-compressed if flags & FLAG_ZLIB:
+                prefix lengths (n x u8), suffix lengths (n x u16) and the
+                UTF-8 encoded suffixes; lengths count code points
+
+The client package contains the matching reader (crux_cache.binfmt).
+"""
+import sys
+import zlib
+import struct
+from array import array
+from typing import List, Sequence
+
+MAGIC = b'CRUXBIN1'
+FLAG_ZLIB = 0x1
+
+HEADER = struct.Struct('<8sIIIII')
+RUN = struct.Struct('<II')
+
+# Rows per front-coded block
+BLOCK_SIZE = 1024
+
+MAX_PREFIX = 0xFF
+MAX_SUFFIX = 0xFFFF
+
+
+def _shared_prefix(a: str, b: str) -> int:
+    """Length of the common prefix of two strings, capped at MAX_PREFIX."""
+    limit = min(len(a), len(b), MAX_PREFIX)
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _encode_block(origins: Sequence[str]) -> bytes:
+    """Front-code one block of origins."""
+    prefix_lengths = bytearray()
+    suffix_lengths = array('H')
+    suffixes = []
+
+    previous = ''
+    for origin in origins:
+        shared = _shared_prefix(previous, origin)
+        suffix = origin[shared:]
+        if len(suffix) > MAX_SUFFIX:
+            raise ValueError(f"Origin too long for binary format: {origin[:80]}...")
+
+        prefix_lengths.append(shared)
+        suffix_lengths.append(len(suffix))
+        suffixes.append(suffix)
+        previous = origin
+
+    if sys.byteorder == 'big':
+        suffix_lengths.byteswap()
+
+    return bytes(prefix_lengths) + suffix_lengths.tobytes() + ''.join(suffixes).encode('utf-8')
+
+
+def encode_chunk(
+    origins: Sequence[str],
+    ranks: Sequence[int],
+    block_size: int = BLOCK_SIZE,
+    compress: bool = True
+) -> bytes:
+    """
+    Encode rows of a chunk into the binary format.
+
+    Args:
+        origins: Origins in row order
+        ranks: Ranks in row order (sorted ascending)
+        block_size: Number of rows per front-coded block
+        compress: Whether to zlib-compress each block
+
+    Returns:
+        Encoded chunk
+    """
+    if len(origins) != len(ranks):
+        raise ValueError("origins and ranks must have the same length")
+
+    # Run-length encode the rank column
+    runs: List[List[int]] = []
+    for rank in ranks:
+        if runs and runs[-1][0] == rank:
+            runs[-1][1] += 1
+        else:
+            runs.append([int(rank), 1])
+
+    blocks = []
+    for start in range(0, len(origins), block_size):
+        block = _encode_block(origins[start:start + block_size])
+        blocks.append(zlib.compress(block, 6) if compress else block)
+
+    offsets = [0]
+    for block in blocks:
+        offsets.append(offsets[-1] + len(block))
+
+    parts = [
+        HEADER.pack(MAGIC, FLAG_ZLIB if compress else 0, len(origins), len(runs),
+                    block_size, len(blocks)),
+        b''.join(RUN.pack(rank, count) for rank, count in runs),
+        struct.pack(f'<{len(offsets)}Q', *offsets),
+    ]
+    parts.extend(blocks)
+    return b''.join(parts)
@@ -1,14 +1,12 @@
 """
 BigQuery data collector for Chrome User Experience Report dataset.
 """
-import os
-import json
-from datetime import datetime
 from typing import Optional
-from google.cloud import bigquery
-from google.oauth2 import service_account
+
 import pandas as pd
 
+from .backends import BigQueryBackend, QueryBackend
+
 
 class CruxCollector:
     """Handles data collection from Google BigQuery CrUX dataset."""
@@ -16,7 +14,13 @@ class CruxCollector:
     PROJECT_ID = "chrome-ux-report"
     DATASET_ID = "experimental"
 
-    def __init__(self, credentials_path: Optional[str] = None, dataset_type: str = "global", country_code: Optional[str] = None):
+    def __init__(
+        self,
+        credentials_path: Optional[str] = None,
+        dataset_type: str = "global",
+        country_code: Optional[str] = None,
+        backend: Optional[QueryBackend] = None
+    ):
         """
         Initialize the collector with authentication.
 
@@ -25,32 +29,14 @@ class CruxCollector:
                             If None, attempts to use environment variable or default credentials.
             dataset_type: Type of dataset - "global" or "country"
             country_code: Two-letter country code (required if dataset_type is "country")
+            backend: Query backend to use instead of BigQuery (e.g. FakeBackend)
         """
-        self.credentials = self._load_credentials(credentials_path)
-        self.client = bigquery.Client(credentials=self.credentials)
-        self.dataset_type = dataset_type
-        self.country_code = country_code.lower() if country_code else None
-
         if dataset_type == "country" and not country_code:
             raise ValueError("country_code is required when dataset_type is 'country'")
 
-    def _load_credentials(self, credentials_path: Optional[str]) -> Optional[service_account.Credentials]:
-        """Load Google Cloud credentials from various sources."""
-        # Priority 1: Explicit path
-        if credentials_path and os.path.exists(credentials_path):
-            return service_account.Credentials.from_service_account_file(credentials_path)
-
-        # Priority 2: Environment variable with JSON content
-        creds_json = os.environ.get('GOOGLE_CREDENTIALS')
-        if creds_json:
-            try:
-                creds_data = json.loads(creds_json)
-                return service_account.Credentials.from_service_account_info(creds_data)
-            except json.JSONDecodeError:
-                pass
-
-        # Priority 3: Default application credentials
-        return None
+        self.backend = backend or BigQueryBackend(credentials_path)
+        self.dataset_type = dataset_type
+        self.country_code = country_code.lower() if country_code else None
 
     def fetch_month_data(self, year: int, month: int) -> pd.DataFrame:
         """
@@ -88,7 +74,7 @@ class CruxCollector:
         print(f"Fetching {dataset_label} data for {year}-{month:02d} (yyyymm={yyyymm})...")
 
         try:
-            df = self.client.query(query).to_dataframe()
+            df = self.backend.query(query)
             print(f"  → Retrieved {len(df):,} origins")
             return df
         except Exception as e:
@@ -120,7 +106,7 @@ class CruxCollector:
         """
 
         try:
-            result = self.client.query(query).to_dataframe()
+            result = self.backend.query(query)
             months = []
             for yyyymm in result['yyyymm']:
                 year = yyyymm // 100
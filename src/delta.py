@@ -0,0 +1,229 @@
+"""
+Delta-encoded monthly snapshots.
+
+A delta describes month N relative to the previous calendar month as the
+origins that were added, removed or moved to a different rank bucket. Every
+KEYFRAME_INTERVAL months no delta is written, so clients reconstructing a
+month never have to apply more than KEYFRAME_INTERVAL - 1 deltas on top of a
+full snapshot. Full CSV chunks are still written for every month.
+
+Delta files are gzip-compressed CSV with columns op, origin, rank, where op
+is '+' (added), '-' (removed, with the old rank) or '~' (rank changed, with
+the new rank). Added and changed rows are sorted by rank, then origin.
+"""
+import os
+import json
+import gzip
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+# pandas is imported where it is used, so that manifest generation (which
+# reads delta statistics) does not pay for importing it
+if TYPE_CHECKING:
+    import pandas as pd
+
+# A month without a delta is written every KEYFRAME_INTERVAL months
+KEYFRAME_INTERVAL = 6
+
+DELTA_DIRNAME = "deltas"
+DELTA_HEADER = ["op", "origin", "rank"]
+
+
+def is_keyframe(year: int, month: int) -> bool:
+    """
+    Check whether a month is a keyframe (stored without a delta).
+
+    Args:
+        year: Year
+        month: Month (1-12)
+
+    Returns:
+        True if no delta should be written for this month
+    """
+    return (year * 12 + month - 1) % KEYFRAME_INTERVAL == 0
+
+
+def previous_month(year: int, month: int) -> Tuple[int, int]:
+    """
+    Get the calendar month before the given month.
+
+    Args:
+        year: Year
+        month: Month (1-12)
+
+    Returns:
+        Tuple of (year, month)
+    """
+    if month == 1:
+        return year - 1, 12
+    return year, month - 1
+
+
+def delta_filename(yyyymm: str) -> str:
+    """Get the path of a month's delta file relative to the dataset directory."""
+    return f"{DELTA_DIRNAME}/{yyyymm}.csv.gz"
+
+
+def compute_delta(previous: 'pd.DataFrame', current: 'pd.DataFrame') -> 'pd.DataFrame':
+    """
+    Compute the delta between two months.
+
+    Args:
+        previous: DataFrame (origin, rank) of the previous month
+        current: DataFrame (origin, rank) of the current month
+
+    Returns:
+        DataFrame with columns op, origin, rank
+    """
+    import pandas as pd
+
+    merged = previous.merge(
+        current, on='origin', how='outer', suffixes=('_old', '_new'), indicator=True
+    )
+
+    removed = merged[merged['_merge'] == 'left_only']
+    added = merged[merged['_merge'] == 'right_only']
+    both = merged[merged['_merge'] == 'both']
+    changed = both[both['rank_old'] != both['rank_new']]
+
+    removed = pd.DataFrame({'op': '-', 'origin': removed['origin'], 'rank': removed['rank_old']})
+    inserted = pd.concat([
+        pd.DataFrame({'op': '+', 'origin': added['origin'], 'rank': added['rank_new']}),
+        pd.DataFrame({'op': '~', 'origin': changed['origin'], 'rank': changed['rank_new']}),
+    ])
+    inserted = inserted.sort_values(['rank', 'origin'], kind='stable')
+
+    delta = pd.concat([removed.sort_values('origin'), inserted], ignore_index=True)
+    delta['rank'] = delta['rank'].astype('int64')
+    return delta[DELTA_HEADER]
+
+
+def delta_counts(delta: 'pd.DataFrame') -> Dict[str, int]:
+    """
+    Count the operations in a delta.
+
+    Args:
+        delta: DataFrame with columns op, origin, rank
+
+    Returns:
+        Dict with added, removed and changed counts
+    """
+    ops = delta['op'].value_counts()
+    return {
+        'added': int(ops.get('+', 0)),
+        'removed': int(ops.get('-', 0)),
+        'changed': int(ops.get('~', 0)),
+    }
+
+
+def write_delta(data_dir: Path, yyyymm: str, base: str, delta: 'pd.DataFrame') -> Dict:
+    """
+    Write a delta file for a month.
+
+    Args:
+        data_dir: Dataset directory
+        yyyymm: Month the delta produces
+        base: Month the delta is applied to
+        delta: DataFrame with columns op, origin, rank
+
+    Returns:
+        Delta metadata for the manifest
+    """
+    filename = delta_filename(yyyymm)
+    path = Path(data_dir) / filename
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    with gzip.open(tmp_path, 'wb') as f:
+        f.write(delta.to_csv(index=False, lineterminator='\n').encode('utf-8'))
+    os.replace(tmp_path, path)
+
+    return {
+        'base': base,
+        'filename': filename,
+        'size': path.stat().st_size,
+        **delta_counts(delta)
+    }
+
+
+def read_delta_stats(path: Path, yyyymm: str) -> Dict:
+    """
+    Read metadata for a delta file on disk.
+
+    Args:
+        path: Path to the delta file
+        yyyymm: Month the delta produces
+
+    Returns:
+        Delta metadata for the manifest
+    """
+    counts = {'+': 0, '-': 0, '~': 0}
+    with gzip.open(path, 'rb') as f:
+        next(f, None)  # Skip header
+        for line in f:
+            op = line[:1].decode('ascii')
+            if op in counts:
+                counts[op] += 1
+
+    year, month = previous_month(int(yyyymm[:4]), int(yyyymm[4:6]))
+    return {
+        'base': f"{year}{month:02d}",
+        'filename': delta_filename(yyyymm),
+        'size': path.stat().st_size,
+        'added': counts['+'],
+        'removed': counts['-'],
+        'changed': counts['~'],
+    }
+
+
+def load_month_dataframe(data_dir: Path, year: int, month: int) -> Optional['pd.DataFrame']:
+    """
+    Load a month from its CSV chunks in the data directory.
+
+    Args:
+        data_dir: Dataset directory
+        year: Year
+        month: Month (1-12)
+
+    Returns:
+        DataFrame (origin, rank), or None if the month is not fully on disk
+    """
+    data_dir = Path(data_dir)
+    yyyymm = f"{year}{month:02d}"
+
+    chunk_files = {}
+    for csv_file in data_dir.glob(f"{yyyymm}_*.csv"):
+        try:
+            chunk_files[int(csv_file.stem.split('_')[1])] = csv_file
+        except (ValueError, IndexError):
+            continue
+
+    if not chunk_files:
+        return None
+
+    # Compare against the manifest to detect sparse checkouts
+    manifest_path = data_dir / "manifest.json"
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, 'r') as f:
+                month_info = json.load(f).get('months', {}).get(yyyymm)
+            if month_info and month_info.get('total_chunks') != len(chunk_files):
+                return None
+        except (json.JSONDecodeError, IOError):
+            pass
+
+    if sorted(chunk_files) != list(range(1, len(chunk_files) + 1)):
+        return None
+
+    import pandas as pd
+
+    frames = [
+        pd.read_csv(
+            chunk_files[num],
+            header=0 if num == 1 else None,
+            names=['origin', 'rank'],
+            keep_default_na=False
+        )
+        for num in sorted(chunk_files)
+    ]
+    return pd.concat(frames, ignore_index=True)
@@ -5,6 +5,9 @@ import json
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from .delta import DELTA_DIRNAME, read_delta_stats
+from .stats import chunk_manifest_fields, month_stats, read_chunk_stats
+
 
 class ManifestGenerator:
     """Generates and manages the manifest.json file."""
@@ -20,10 +23,79 @@ class ManifestGenerator:
         self.data_dir = Path(data_dir)
         self.manifest_path = self.data_dir / "manifest.json"
         self.dataset_name = dataset_name
+        self.recorded_chunks: Dict[str, Dict[str, Dict]] = {}
+        self.recorded_deltas: Dict[str, Dict] = {}
+
+    def record_chunks(self, yyyymm: str, chunks: List[Dict]) -> None:
+        """
+        Record chunk metadata and statistics produced at write time.
+
+        Recorded months are merged into the manifest as-is instead of being
+        re-read from disk by scan_chunks.
+
+        Args:
+            yyyymm: Month in YYYYMM format
+            chunks: Chunk metadata as returned by ChunkProcessor
+        """
+        self.recorded_chunks[yyyymm] = {c['filename']: c for c in chunks}
+
+    def record_delta(self, yyyymm: str, delta: Dict) -> None:
+        """
+        Record metadata of a delta file produced at write time.
+
+        Args:
+            yyyymm: Month in YYYYMM format
+            delta: Delta metadata as returned by delta.write_delta
+        """
+        self.recorded_deltas[yyyymm] = delta
+
+    def has_month(self, yyyymm: str) -> bool:
+        """
+        Check whether a month is recorded in this run or listed in the existing manifest.
+
+        Args:
+            yyyymm: Month in YYYYMM format
+        """
+        if yyyymm in self.recorded_chunks:
+            return True
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return yyyymm in json.load(f).get('months', {})
+        except (json.JSONDecodeError, IOError):
+            return False
+
+    def scan_deltas(self) -> Dict[str, Dict]:
+        """
+        Scan the deltas directory for delta files.
+
+        Returns:
+            Dictionary mapping YYYYMM to delta metadata
+        """
+        deltas = {}
+        delta_dir = self.data_dir / DELTA_DIRNAME
+
+        for delta_file in sorted(delta_dir.glob("*.csv.gz")):
+            yyyymm = delta_file.name.split('.')[0]
+            if len(yyyymm) != 6 or not yyyymm.isdigit():
+                continue
+
+            delta = self.recorded_deltas.get(yyyymm)
+            if delta is None:
+                try:
+                    delta = read_delta_stats(delta_file, yyyymm)
+                except (OSError, EOFError) as e:
+                    print(f"  ⚠ Skipping delta {delta_file.name}: {e}")
+                    continue
+            deltas[yyyymm] = delta
+
+        return deltas
 
     def scan_chunks(self) -> Dict[str, List[Dict]]:
         """
-        Scan the data directory for all CSV chunks and count origins.
+        Scan the data directory for all CSV chunks and collect their statistics.
+
+        Chunks recorded with record_chunks are taken from memory; any other
+        chunk is read once to compute its statistics.
 
         Returns:
             Dictionary mapping YYYYMM to list of chunk metadata
@@ -47,32 +119,81 @@ class ManifestGenerator:
                 if yyyymm not in months:
                     months[yyyymm] = []
 
-                # Get file stats
-                stats = csv_file.stat()
-
-                # Count actual rows (excluding header only for chunk 1)
-                with open(csv_file, 'r') as f:
-                    total_lines = sum(1 for _ in f)
-                    # Only chunk 1 has a header, so only subtract 1 for chunk 1
-                    row_count = total_lines - 1 if chunk_num == 1 else total_lines
+                # Use statistics recorded at write time, otherwise read the chunk
+                # (only chunk 1 has a header)
+                stats = self.recorded_chunks.get(yyyymm, {}).get(filename)
+                if stats is None:
+                    stats = read_chunk_stats(csv_file, has_header=(chunk_num == 1))
 
-                months[yyyymm].append({
+                chunk_entry = {
                     'chunk': chunk_num,
                     'filename': filename,
-                    'size': stats.st_size,
-                    'origins': row_count
-                })
+                    'size': csv_file.stat().st_size,
+                    'origins': stats['rows'],
+                    **chunk_manifest_fields(stats),
+                    'tlds': stats.get('tlds', {})
+                }
+
+                # Binary encoding of the same rows, if present
+                bin_file = csv_file.with_suffix('.bin')
+                if bin_file.exists():
+                    chunk_entry['binary'] = {
+                        'filename': bin_file.name,
+                        'size': bin_file.stat().st_size
+                    }
+
+                months[yyyymm].append(chunk_entry)
 
             except (ValueError, IndexError):
                 # Skip malformed filenames
                 continue
 
-        # Sort chunks within each month
+        # Sort chunks within each month and record the rows each chunk holds,
+        # so that clients can map a row index to a chunk without reading data
         for yyyymm in months:
             months[yyyymm].sort(key=lambda x: x['chunk'])
 
+            start_row = 0
+            for expected, chunk_entry in enumerate(months[yyyymm], start=1):
+                if chunk_entry['chunk'] != expected:
+                    break  # Earlier chunks are missing (sparse checkout)
+                chunk_entry['start_row'] = start_row
+                chunk_entry['end_row'] = start_row + chunk_entry['origins']
+                start_row = chunk_entry['end_row']
+
         return months
 
+    @staticmethod
+    def build_month_entry(yyyymm: str, chunks: List[Dict], delta: Optional[Dict] = None) -> Dict:
+        """
+        Build the manifest entry for one month from its scanned chunks.
+
+        Args:
+            yyyymm: Month in YYYYMM format
+            chunks: Chunk metadata from scan_chunks
+            delta: Optional delta metadata from scan_deltas
+
+        Returns:
+            Month entry with per-chunk and per-month statistics
+        """
+        # TLD counts are only kept at month level
+        chunk_entries = [{k: v for k, v in c.items() if k != 'tlds'} for c in chunks]
+
+        entry = {
+            'year': int(yyyymm[:4]),
+            'month': int(yyyymm[4:6]),
+            'chunks': chunk_entries,
+            'total_chunks': len(chunks),
+            'total_size': sum(c['size'] for c in chunks),
+            'origins': sum(c['origins'] for c in chunks),
+            **month_stats(chunks)
+        }
+
+        if delta:
+            entry['delta'] = delta
+
+        return entry
+
     def generate(self) -> Dict:
         """
         Generate complete manifest with all metadata.
@@ -83,6 +204,7 @@ class ManifestGenerator:
         print("Generating manifest...")
 
         months_data = self.scan_chunks()
+        deltas = self.scan_deltas()
 
         # Build manifest structure
         manifest = {
@@ -94,25 +216,16 @@ class ManifestGenerator:
         total_size = 0
 
         for yyyymm, chunks in sorted(months_data.items()):
-            year = int(yyyymm[:4])
-            month = int(yyyymm[4:6])
+            month_entry = self.build_month_entry(yyyymm, chunks, deltas.get(yyyymm))
+            manifest['months'][yyyymm] = month_entry
 
-            month_size = sum(c['size'] for c in chunks)
+            year = month_entry['year']
+            month = month_entry['month']
+            month_size = month_entry['total_size']
+            month_origins = month_entry['origins']
             total_size += month_size
-
-            # Count actual origins from all chunks
-            month_origins = sum(c['origins'] for c in chunks)
             total_origins += month_origins
 
-            manifest['months'][yyyymm] = {
-                'year': year,
-                'month': month,
-                'chunks': chunks,
-                'total_chunks': len(chunks),
-                'total_size': month_size,
-                'origins': month_origins
-            }
-
             size_mb = month_size / (1024 * 1024)
             print(f"  {year}-{month:02d}: {len(chunks)} chunks, {size_mb:.1f} MB, {month_origins:,} origins")
 
@@ -184,6 +297,7 @@ class ManifestGenerator:
 
         # Scan for new data
         new_months_data = self.scan_chunks()
+        new_deltas = self.scan_deltas()
 
         # Merge with existing data
         manifest = {
@@ -203,20 +317,10 @@ class ManifestGenerator:
                 # New month - add it
                 added_months.append(yyyymm)
 
-            year = int(yyyymm[:4])
-            month = int(yyyymm[4:6])
-
-            month_size = sum(c['size'] for c in chunks)
-            month_origins = sum(c['origins'] for c in chunks)
+            # Keep a known delta if its file is not part of a sparse checkout
+            delta = new_deltas.get(yyyymm) or manifest['months'].get(yyyymm, {}).get('delta')
 
-            manifest['months'][yyyymm] = {
-                'year': year,
-                'month': month,
-                'chunks': chunks,
-                'total_chunks': len(chunks),
-                'total_size': month_size,
-                'origins': month_origins
-            }
+            manifest['months'][yyyymm] = self.build_month_entry(yyyymm, chunks, delta)
 
         # Update summary statistics based on all months (existing + new)
         all_months = manifest['months']
@@ -4,7 +4,11 @@ CSV chunking processor for splitting large datasets into manageable files.
 import os
 import pandas as pd
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+
+from .binfmt import encode_chunk
+from .staging import MonthStaging
+from .stats import chunk_stats
 
 
 class ChunkProcessor:
@@ -13,27 +17,54 @@ class ChunkProcessor:
     # Target chunk size: 25MB
     CHUNK_SIZE_BYTES = 25 * 1024 * 1024  # 25 MB
 
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, write_binary: bool = False):
         """
         Initialize processor with output directory.
 
         Args:
             output_dir: Directory where chunks will be saved
+            write_binary: Also write a binary encoding (YYYYMM_N.bin) of each chunk
         """
         self.output_dir = Path(output_dir)
+        self.write_binary = write_binary
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def chunk_dataframe(self, df: pd.DataFrame, year: int, month: int) -> List[dict]:
+    def staging(self, year: int, month: int) -> MonthStaging:
+        """
+        Get the staging area for a month in the output directory.
+
+        Args:
+            year: Year of the month
+            month: Month (1-12)
+
+        Returns:
+            MonthStaging instance
+        """
+        return MonthStaging(self.output_dir, year, month)
+
+    def chunk_dataframe(
+        self,
+        df: pd.DataFrame,
+        year: int,
+        month: int,
+        staging: Optional[MonthStaging] = None
+    ) -> List[dict]:
         """
         Split a DataFrame into multiple CSV chunks.
 
+        With a staging area, chunks are written to the staging directory and
+        progress is checkpointed after every chunk; chunks finished by an
+        earlier, interrupted run are reused instead of being rewritten.
+
         Args:
             df: DataFrame to split
             year: Year for filename
             month: Month for filename
+            staging: Optional staging area to write chunks to
 
         Returns:
-            List of dicts with chunk metadata (filename, size, rows)
+            List of dicts with chunk metadata (filename, size, rows) and
+            statistics computed while writing (see stats.chunk_stats)
         """
         print(f"Chunking data for {year}{month:02d}...")
 
@@ -55,28 +86,61 @@ class ChunkProcessor:
         chunks_metadata = []
         total_rows = len(df)
         chunk_num = 1
+        output_dir = self.output_dir
+
+        if staging is not None:
+            output_dir = staging.path
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+            # Resume after the last chunk finished by an interrupted run
+            chunks_metadata = staging.completed_chunks(rows_per_chunk)
+            if chunks_metadata:
+                print(f"  ↻ Resuming after chunk {len(chunks_metadata)} from checkpoint")
 
         for start_idx in range(0, total_rows, rows_per_chunk):
+            if chunk_num <= len(chunks_metadata):
+                chunk_num += 1
+                continue
+
             end_idx = min(start_idx + rows_per_chunk, total_rows)
             chunk_df = df.iloc[start_idx:end_idx]
 
             # Generate filename
             filename = f"{year}{month:02d}_{chunk_num}.csv"
-            filepath = self.output_dir / filename
+            filepath = output_dir / filename
+
+            # Render chunk (only first chunk gets header)
+            has_header = chunk_num == 1
+            data = chunk_df.to_csv(index=False, header=has_header, lineterminator='\n').encode('utf-8')
 
-            # Write chunk (only first chunk gets header)
-            chunk_df.to_csv(filepath, index=False, header=(chunk_num == 1))
+            # Write chunk
+            with open(filepath, 'wb') as f:
+                f.write(data)
 
-            # Get file size
-            file_size = filepath.stat().st_size
+            file_size = len(data)
 
-            chunks_metadata.append({
+            chunk_metadata = {
+                'chunk': chunk_num,
                 'filename': filename,
                 'size': file_size,
                 'rows': len(chunk_df),
                 'start_row': start_idx,
-                'end_row': end_idx
-            })
+                'end_row': end_idx,
+                **chunk_stats(data, has_header=has_header)
+            }
+
+            # Write binary encoding next to the CSV chunk
+            if self.write_binary:
+                bin_filename = f"{year}{month:02d}_{chunk_num}.bin"
+                bin_data = encode_chunk(chunk_df['origin'].tolist(), chunk_df['rank'].tolist())
+                with open(output_dir / bin_filename, 'wb') as f:
+                    f.write(bin_data)
+                chunk_metadata['binary'] = {'filename': bin_filename, 'size': len(bin_data)}
+
+            chunks_metadata.append(chunk_metadata)
+
+            if staging is not None:
+                staging.record_chunk(rows_per_chunk, chunks_metadata)
 
             size_mb = file_size / (1024 * 1024)
             print(f"  ✓ Chunk {chunk_num}: {filename} ({size_mb:.2f} MB, {len(chunk_df):,} rows)")
@@ -93,6 +157,10 @@ class ChunkProcessor:
         """
         Save a DataFrame as chunked CSV files.
 
+        Chunks are written to the month's staging area and only published to
+        the output directory once all of them have been written, so an
+        interrupted run never leaves a partial month behind.
+
         Args:
             df: DataFrame to save
             year: Year for naming
@@ -101,4 +169,7 @@ class ChunkProcessor:
         Returns:
             List of chunk metadata
         """
-        return self.chunk_dataframe(df, year, month)
+        staging = self.staging(year, month)
+        chunks = self.chunk_dataframe(df, year, month, staging=staging)
+        staging.publish(chunks)
+        return chunks
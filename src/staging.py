@@ -0,0 +1,229 @@
+"""
+Staging area for transactional, resumable ingestion of a month.
+
+Chunks of a month are written to data_dir/.staging/YYYYMM/ together with a
+checkpoint file recording progress. The query result is kept next to them so
+that an interrupted month can resume from the last finished chunk without
+querying BigQuery again. Once every chunk is written, the month is published
+by moving the chunks into the data directory.
+"""
+import os
+import json
+import shutil
+from pathlib import Path
+from typing import List, Dict, Optional
+
+import pandas as pd
+
+
+class MonthStaging:
+    """Manages the staging directory and checkpoint for one month."""
+
+    STAGING_DIRNAME = ".staging"
+
+    # Checkpoint states
+    FETCHED = "fetched"
+    PUBLISHED = "published"
+
+    def __init__(self, data_dir: Path, year: int, month: int):
+        """
+        Initialize staging for a month.
+
+        Args:
+            data_dir: Dataset directory the month is published to
+            year: Year of the month
+            month: Month (1-12)
+        """
+        self.data_dir = Path(data_dir)
+        self.year = year
+        self.month = month
+        self.yyyymm = f"{year}{month:02d}"
+        self.path = self.data_dir / self.STAGING_DIRNAME / self.yyyymm
+        self.checkpoint_path = self.path / "checkpoint.json"
+        self.result_path = self.path / "result.parquet"
+
+    @classmethod
+    def pending(cls, data_dir: Path) -> List['MonthStaging']:
+        """
+        List months with a staging directory in a data directory.
+
+        Args:
+            data_dir: Dataset directory to scan
+
+        Returns:
+            List of MonthStaging instances, sorted by month
+        """
+        staging_root = Path(data_dir) / cls.STAGING_DIRNAME
+        if not staging_root.is_dir():
+            return []
+
+        staged = []
+        for month_dir in sorted(staging_root.iterdir()):
+            name = month_dir.name
+            if month_dir.is_dir() and len(name) == 6 and name.isdigit():
+                staged.append(cls(data_dir, int(name[:4]), int(name[4:])))
+        return staged
+
+    def load_checkpoint(self) -> Optional[Dict]:
+        """
+        Load the checkpoint for this month.
+
+        Returns:
+            Checkpoint dictionary, or None if there is no usable checkpoint
+        """
+        if not self.checkpoint_path.exists():
+            return None
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return None
+
+    def save_checkpoint(self, checkpoint: Dict) -> None:
+        """
+        Atomically write the checkpoint for this month.
+
+        Args:
+            checkpoint: Checkpoint dictionary to save
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def save_result(self, df: pd.DataFrame) -> None:
+        """
+        Persist the query result so the month can resume without re-querying.
+
+        Args:
+            df: DataFrame returned by the collector
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.result_path.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.result_path)
+        self.save_checkpoint({
+            'yyyymm': self.yyyymm,
+            'state': self.FETCHED,
+            'total_rows': len(df),
+            'chunks': []
+        })
+
+    def load_result(self) -> Optional[pd.DataFrame]:
+        """
+        Load a previously persisted query result.
+
+        Returns:
+            DataFrame, or None if no complete result was staged
+        """
+        if self.load_checkpoint() is None or not self.result_path.exists():
+            return None
+        return pd.read_parquet(self.result_path)
+
+    def completed_chunks(self, rows_per_chunk: int) -> List[Dict]:
+        """
+        Get the chunks that were fully written before an interruption.
+
+        Chunks are only reused if the checkpoint was written with the same
+        rows_per_chunk and the staged files still have the recorded sizes.
+
+        Args:
+            rows_per_chunk: Rows per chunk of the current run
+
+        Returns:
+            List of chunk metadata for finished chunks, in order
+        """
+        checkpoint = self.load_checkpoint() or {}
+        if checkpoint.get('rows_per_chunk') != rows_per_chunk:
+            return []
+
+        completed = []
+        for chunk in checkpoint.get('chunks', []):
+            if not all(
+                (self.path / name).exists() and (self.path / name).stat().st_size == size
+                for name, size in self._chunk_files(chunk)
+            ):
+                break
+            completed.append(chunk)
+        return completed
+
+    @staticmethod
+    def _chunk_files(chunk: Dict) -> List[tuple]:
+        """List (filename, size) of all files written for a chunk."""
+        files = [(chunk['filename'], chunk['size'])]
+        if 'binary' in chunk:
+            files.append((chunk['binary']['filename'], chunk['binary']['size']))
+        return files
+
+    def record_chunk(self, rows_per_chunk: int, chunks: List[Dict]) -> None:
+        """
+        Record progress after a chunk has been written.
+
+        Args:
+            rows_per_chunk: Rows per chunk used for this month
+            chunks: Metadata of all chunks written so far
+        """
+        checkpoint = self.load_checkpoint() or {'yyyymm': self.yyyymm}
+        checkpoint.update({
+            'rows_per_chunk': rows_per_chunk,
+            'chunks': chunks
+        })
+        self.save_checkpoint(checkpoint)
+
+    def publish(self, chunks: List[Dict]) -> None:
+        """
+        Move staged chunks into the data directory.
+
+        Every chunk is moved with an atomic rename, and chunks of a previous
+        version of the month that are no longer part of it are removed. The
+        checkpoint is marked as published so that a rerun only has to update
+        the manifest.
+
+        Args:
+            chunks: Metadata of all chunks of the month
+        """
+        for chunk in chunks:
+            for filename, _ in self._chunk_files(chunk):
+                staged_file = self.path / filename
+                if staged_file.exists():
+                    os.replace(staged_file, self.data_dir / filename)
+
+            # A binary encoding of an earlier version no longer matches the CSV
+            if 'binary' not in chunk:
+                stale_binary = self.data_dir / Path(chunk['filename']).with_suffix('.bin')
+                if stale_binary.exists():
+                    stale_binary.unlink()
+
+        # Remove leftover chunks from an earlier, longer version of this month
+        for pattern in (f"{self.yyyymm}_*.csv", f"{self.yyyymm}_*.bin"):
+            for chunk_file in self.data_dir.glob(pattern):
+                try:
+                    chunk_num = int(chunk_file.stem.split('_')[1])
+                except (ValueError, IndexError):
+                    continue
+                if chunk_num > len(chunks):
+                    chunk_file.unlink()
+
+        checkpoint = self.load_checkpoint() or {'yyyymm': self.yyyymm}
+        checkpoint.update({'state': self.PUBLISHED, 'chunks': chunks})
+        self.save_checkpoint(checkpoint)
+
+        # The query result is no longer needed once the chunks are published
+        if self.result_path.exists():
+            self.result_path.unlink()
+
+    def is_published(self) -> bool:
+        """Check whether the month was published but not yet cleaned up."""
+        checkpoint = self.load_checkpoint()
+        return bool(checkpoint) and checkpoint.get('state') == self.PUBLISHED
+
+    def cleanup(self) -> None:
+        """Remove the staging directory for this month."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+        # Remove the staging root once it is empty
+        try:
+            self.path.parent.rmdir()
+        except OSError:
+            pass
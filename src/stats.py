@@ -0,0 +1,155 @@
+"""
+Per-chunk and per-month statistics for CrUX CSV chunks.
+
+Statistics are computed from the exact bytes of a chunk file, so the byte
+offsets recorded here can be used directly for ranged reads. Rows are
+expected to be sorted by rank (then origin), as returned by the collector
+query, which lets rank buckets be located with a handful of byte searches
+instead of parsing every line.
+"""
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Number of most common TLDs kept in the per-month summary
+TOP_TLDS = 50
+
+_SCHEME_PATTERN = re.compile(rb'^([A-Za-z][A-Za-z0-9+.-]*)://', re.MULTILINE)
+_TLD_PATTERN = re.compile(rb'\.([^.,:/\n]+)(?::\d+)?,')
+
+
+def chunk_stats(data: bytes, has_header: bool = False) -> Dict:
+    """
+    Compute statistics for the contents of a single CSV chunk.
+
+    Args:
+        data: Raw bytes of the chunk file
+        has_header: Whether the first line is a CSV header
+
+    Returns:
+        Dict with row count, rank histogram, min/max rank, first/last origin,
+        scheme counts, TLD counts and the byte offset of each rank bucket
+    """
+    if data and not data.endswith(b'\n'):
+        data += b'\n'
+
+    start = data.find(b'\n') + 1 if has_header else 0
+    end = len(data)
+
+    ranks = {}
+    rank_offsets = {}
+    pos = start
+
+    # Rows are sorted by rank, so each bucket is one contiguous run of lines
+    while pos < end:
+        line_end = data.index(b'\n', pos)
+        if line_end == pos:
+            pos += 1  # Skip blank lines
+            continue
+
+        rank_bytes = data[data.rindex(b',', pos, line_end) + 1:line_end]
+        last_row = data.rindex(b',' + rank_bytes + b'\n', pos)
+        bucket_end = data.index(b'\n', last_row + 1) + 1
+
+        key = str(int(rank_bytes))
+        ranks[key] = ranks.get(key, 0) + data.count(b'\n', pos, bucket_end)
+        rank_offsets.setdefault(key, pos)
+        pos = bucket_end
+
+    body = data[start:]
+    rows = sum(ranks.values())
+
+    first_origin = None
+    last_origin = None
+    if rows:
+        first_line = body[:body.index(b'\n')]
+        last_line = body[body.rstrip(b'\n').rfind(b'\n') + 1:].rstrip(b'\n')
+        first_origin = first_line.rsplit(b',', 1)[0].decode('utf-8')
+        last_origin = last_line.rsplit(b',', 1)[0].decode('utf-8')
+
+    schemes = Counter(m.decode('ascii').lower() for m in _SCHEME_PATTERN.findall(body))
+    tlds = Counter(m.decode('utf-8', 'replace').lower() for m in _TLD_PATTERN.findall(body))
+
+    rank_values = [int(r) for r in ranks]
+
+    return {
+        'rows': rows,
+        'min_rank': min(rank_values) if rank_values else None,
+        'max_rank': max(rank_values) if rank_values else None,
+        'first_origin': first_origin,
+        'last_origin': last_origin,
+        'ranks': ranks,
+        'rank_offsets': rank_offsets,
+        'schemes': dict(schemes.most_common()),
+        'tlds': dict(tlds.most_common()),
+    }
+
+
+def month_stats(chunks: List[Dict]) -> Dict:
+    """
+    Merge per-chunk statistics into statistics for a whole month.
+
+    Args:
+        chunks: Chunk statistics in chunk order
+
+    Returns:
+        Dict with the merged rank histogram, min/max rank, first/last origin,
+        scheme counts and the most common TLDs
+    """
+    ranks = Counter()
+    schemes = Counter()
+    tlds = Counter()
+
+    for chunk in chunks:
+        ranks.update(chunk.get('ranks', {}))
+        schemes.update(chunk.get('schemes', {}))
+        tlds.update(chunk.get('tlds', {}))
+
+    non_empty = [c for c in chunks if c.get('min_rank') is not None]
+
+    return {
+        'ranks': {r: ranks[r] for r in sorted(ranks, key=int)},
+        'min_rank': min(c['min_rank'] for c in non_empty) if non_empty else None,
+        'max_rank': max(c['max_rank'] for c in non_empty) if non_empty else None,
+        'first_origin': non_empty[0]['first_origin'] if non_empty else None,
+        'last_origin': non_empty[-1]['last_origin'] if non_empty else None,
+        'schemes': dict(schemes.most_common()),
+        'tlds': dict(tlds.most_common(TOP_TLDS)),
+    }
+
+
+def read_chunk_stats(path, has_header: bool) -> Dict:
+    """
+    Compute statistics for a chunk file on disk.
+
+    Args:
+        path: Path to the CSV chunk
+        has_header: Whether the chunk starts with a CSV header
+
+    Returns:
+        Chunk statistics (see chunk_stats)
+    """
+    with open(path, 'rb') as f:
+        return chunk_stats(f.read(), has_header=has_header)
+
+
+def chunk_manifest_fields(stats: Optional[Dict]) -> Dict:
+    """
+    Select the statistics that are stored on each manifest chunk entry.
+
+    TLD counts are only kept at month level to keep manifest.json small.
+
+    Args:
+        stats: Chunk statistics (see chunk_stats)
+
+    Returns:
+        Dict of fields to merge into the chunk entry
+    """
+    if not stats:
+        return {}
+    return {
+        key: stats[key]
+        for key in ('min_rank', 'max_rank', 'first_origin', 'last_origin',
+                    'ranks', 'rank_offsets', 'schemes')
+        if key in stats
+    }
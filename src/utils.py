@@ -2,7 +2,10 @@
 Utility functions for file management.
 """
 import json
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict
 
 
 def get_existing_months(data_dir: Path) -> set[tuple[int, int]]:
@@ -46,3 +49,29 @@ def get_existing_months(data_dir: Path) -> set[tuple[int, int]]:
             continue
 
     return existing
+
+
+class StageTimer:
+    """Accumulates wall time per named pipeline stage."""
+
+    def __init__(self):
+        """Initialize with no recorded stages."""
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a block and add it to the named stage.
+
+        Args:
+            name: Stage name (e.g. 'fetch', 'chunk', 'manifest')
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def summary(self) -> str:
+        """Format the recorded stages for printing."""
+        return ', '.join(f"{name} {seconds:.1f}s" for name, seconds in self.timings.items()) or 'none'